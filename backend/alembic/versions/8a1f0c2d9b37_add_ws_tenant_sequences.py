@@ -0,0 +1,31 @@
+"""add ws tenant sequences
+
+Revision ID: 8a1f0c2d9b37
+Revises: 7112406cd5e5
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a1f0c2d9b37'
+down_revision: Union[str, Sequence[str], None] = '7112406cd5e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ws_tenant_sequences',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('last_seq', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tenant_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ws_tenant_sequences')
@@ -0,0 +1,45 @@
+"""add tenant counters and job runs
+
+Revision ID: 9c3e5a7b1d42
+Revises: 8a1f0c2d9b37
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5a7b1d42'
+down_revision: Union[str, Sequence[str], None] = '8a1f0c2d9b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are created on first dashboard read or by the reconciliation job
+    op.create_table('tenant_counters',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('visitors_total', sa.Integer(), nullable=False),
+        sa.Column('visitors_active', sa.Integer(), nullable=False),
+        sa.Column('visitors_pending', sa.Integer(), nullable=False),
+        sa.Column('incidents_open', sa.Integer(), nullable=False),
+        sa.Column('bills_pending', sa.Integer(), nullable=False),
+        sa.Column('tickets_open', sa.Integer(), nullable=False),
+        sa.Column('reconciled_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tenant_id')
+    )
+    # When each periodic job last started (app.jobs.scheduler)
+    op.create_table('job_runs',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_runs')
+    op.drop_table('tenant_counters')
@@ -0,0 +1,106 @@
+"""add tenant-scoped composite indexes
+
+Revision ID: a4d2e8f6c1b3
+Revises: 9c3e5a7b1d42
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2e8f6c1b3'
+down_revision: Union[str, Sequence[str], None] = '9c3e5a7b1d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, columns) matching the filters and keyset sort keys in app/crud.
+# benchmarks/bench_indexes.py reads this list too.
+INDEXES = [
+    ('users', ['tenant_id', 'role']),
+    ('properties', ['tenant_id', 'id']),
+    ('blacklist', ['tenant_id', 'id']),
+    ('patrol_logs', ['tenant_id', 'timestamp', 'id']),
+    ('notifications', ['user_id', 'created_at', 'id']),
+    ('notifications', ['user_id', 'is_read']),
+    ('marketplace_items', ['tenant_id', 'status', 'created_at', 'id']),
+    ('visitors', ['tenant_id', 'id']),
+    ('visitors', ['tenant_id', 'status']),
+    ('visitors', ['host_id', 'id']),
+    ('fee_definitions', ['tenant_id', 'id']),
+    ('bills', ['tenant_id', 'created_at', 'id']),
+    ('bills', ['resident_id', 'created_at', 'id']),
+    ('bills', ['tenant_id', 'status']),
+    ('payments', ['tenant_id', 'created_at', 'id']),
+    ('payments', ['user_id', 'created_at', 'id']),
+    ('payments', ['bill_id']),
+    ('incidents', ['tenant_id', 'created_at', 'id']),
+    ('incidents', ['reporter_id', 'created_at', 'id']),
+    ('incidents', ['tenant_id', 'status']),
+    ('notices', ['tenant_id', 'created_at', 'id']),
+    ('tickets', ['tenant_id', 'created_at', 'id']),
+    ('tickets', ['created_by_id', 'created_at', 'id']),
+    ('tickets', ['assigned_to_id', 'created_at', 'id']),
+    ('tickets', ['tenant_id', 'status']),
+    ('amenities', ['tenant_id', 'id']),
+    ('bookings', ['tenant_id', 'start_time', 'id']),
+    ('bookings', ['user_id', 'start_time', 'id']),
+    ('bookings', ['amenity_id', 'start_time']),
+    ('staff', ['tenant_id', 'status']),
+    ('staff', ['employer_id']),
+    ('staff_attendance', ['staff_id', 'check_in']),
+    ('access_logs', ['user_id', 'timestamp', 'id']),
+    ('vehicles', ['tenant_id', 'id']),
+    ('vehicles', ['user_id']),
+    ('parcels', ['tenant_id', 'created_at', 'id']),
+    ('parcels', ['recipient_id', 'created_at', 'id']),
+    ('polls', ['tenant_id', 'created_at', 'id']),
+    ('poll_options', ['poll_id']),
+    ('poll_votes', ['poll_id', 'user_id']),
+    ('community_documents', ['tenant_id', 'created_at', 'id']),
+]
+
+
+def index_name(table: str, columns: Sequence[str]) -> str:
+    return f"ix_{table}_{'_'.join(columns)}"
+
+
+def _drop_invalid_indexes() -> None:
+    # An interrupted concurrent build leaves an INVALID index behind, which
+    # IF NOT EXISTS would then skip; drop those so a rerun rebuilds them
+    names = [index_name(table, columns) for table, columns in INDEXES]
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid AND c.relname = ANY(:names)"
+        ),
+        {"names": names},
+    ).scalars().all()
+    for name in invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and doesn't
+    # block writes to tables that are already large
+    with op.get_context().autocommit_block():
+        if not context.is_offline_mode():
+            _drop_invalid_indexes()
+        for table, columns in INDEXES:
+            op.create_index(
+                index_name(table, columns), table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, columns in reversed(INDEXES):
+            op.drop_index(
+                index_name(table, columns), table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
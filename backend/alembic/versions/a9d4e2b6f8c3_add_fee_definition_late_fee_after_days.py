@@ -0,0 +1,26 @@
+"""add fee definition late_fee_after_days
+
+Revision ID: a9d4e2b6f8c3
+Revises: b5e9c3a7d2f4
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2b6f8c3'
+down_revision: Union[str, Sequence[str], None] = 'b5e9c3a7d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('fee_definitions', sa.Column('late_fee_after_days', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('fee_definitions', 'late_fee_after_days')
@@ -0,0 +1,26 @@
+"""add payment paid_on
+
+Revision ID: b5e9c3a7d2f4
+Revises: f1c5d9e3a7b4
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e9c3a7d2f4'
+down_revision: Union[str, Sequence[str], None] = 'f1c5d9e3a7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payments', sa.Column('paid_on', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('payments', 'paid_on')
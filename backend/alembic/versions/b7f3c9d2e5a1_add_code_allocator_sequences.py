@@ -0,0 +1,31 @@
+"""add code allocator sequences
+
+Revision ID: b7f3c9d2e5a1
+Revises: a4d2e8f6c1b3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3c9d2e5a1'
+down_revision: Union[str, Sequence[str], None] = 'a4d2e8f6c1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.core.code_allocator permutes these values into visitor, staff and parcel codes
+SEQUENCES = ['visitor_access_code_seq', 'staff_access_code_seq', 'parcel_pickup_code_seq']
+
+
+def upgrade() -> None:
+    for name in SEQUENCES:
+        op.execute(sa.schema.CreateSequence(sa.Sequence(name)))
+
+
+def downgrade() -> None:
+    for name in SEQUENCES:
+        op.execute(sa.schema.DropSequence(sa.Sequence(name)))
@@ -0,0 +1,71 @@
+"""add bill periods and billing runs
+
+Revision ID: d3a7b9e1f5c2
+Revises: c8e4a1f7b2d6
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7b9e1f5c2'
+down_revision: Union[str, Sequence[str], None] = 'c8e4a1f7b2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bills', sa.Column('fee_id', sa.Integer(), nullable=True))
+    op.add_column('bills', sa.Column('period', sa.Date(), nullable=True))
+    op.create_foreign_key('bills_fee_id_fkey', 'bills', 'fee_definitions', ['fee_id'], ['id'], ondelete='SET NULL')
+
+    # Tag bills made by the old per-resident generator ("Monthly Levy - March 2026")
+    # so this month is not billed twice; only the first of any duplicates is tagged.
+    op.execute("""
+        UPDATE bills SET fee_id = levy.fee_id, period = levy.period
+        FROM (
+            SELECT DISTINCT ON (b.tenant_id, b.resident_id, f.id, date_trunc('month', b.created_at))
+                   b.id, f.id AS fee_id, date_trunc('month', b.created_at)::date AS period
+            FROM bills b
+            JOIN fee_definitions f ON f.tenant_id = b.tenant_id AND f.name = 'Monthly Levy'
+            WHERE b.description = 'Monthly Levy - ' || to_char(b.created_at, 'FMMonth YYYY')
+            ORDER BY b.tenant_id, b.resident_id, f.id, date_trunc('month', b.created_at), b.id
+        ) AS levy
+        WHERE bills.id = levy.id
+    """)
+    op.create_unique_constraint(
+        'uq_bills_tenant_resident_fee_period', 'bills', ['tenant_id', 'resident_id', 'fee_id', 'period']
+    )
+
+    op.create_table('billing_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('period', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('bills_created', sa.Integer(), nullable=False),
+        sa.Column('notifications_total', sa.Integer(), nullable=False),
+        sa.Column('notifications_sent', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('requested_by_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_billing_runs_id'), 'billing_runs', ['id'], unique=False)
+    op.create_index('ix_billing_runs_tenant_id_id', 'billing_runs', ['tenant_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_billing_runs_tenant_id_id', table_name='billing_runs')
+    op.drop_index(op.f('ix_billing_runs_id'), table_name='billing_runs')
+    op.drop_table('billing_runs')
+    op.drop_constraint('uq_bills_tenant_resident_fee_period', 'bills', type_='unique')
+    op.drop_constraint('bills_fee_id_fkey', 'bills', type_='foreignkey')
+    op.drop_column('bills', 'period')
+    op.drop_column('bills', 'fee_id')
@@ -0,0 +1,38 @@
+"""add bill paid_total and outstanding
+
+Revision ID: e6b2f8a4c9d1
+Revises: d3a7b9e1f5c2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2f8a4c9d1'
+down_revision: Union[str, Sequence[str], None] = 'd3a7b9e1f5c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bills', sa.Column('paid_total', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE bills SET paid_total = verified.total
+        FROM (
+            SELECT bill_id, sum(amount) AS total
+            FROM payments
+            WHERE bill_id IS NOT NULL AND lower(status::text) = 'verified'
+            GROUP BY bill_id
+        ) AS verified
+        WHERE bills.id = verified.bill_id
+    """)
+    op.add_column('bills', sa.Column('outstanding', sa.Integer(), sa.Computed('amount - paid_total', persisted=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('bills', 'outstanding')
+    op.drop_column('bills', 'paid_total')
@@ -0,0 +1,34 @@
+"""add bill analytics indexes
+
+Revision ID: f1c5d9e3a7b4
+Revises: e6b2f8a4c9d1
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c5d9e3a7b4'
+down_revision: Union[str, Sequence[str], None] = 'e6b2f8a4c9d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_bills_tenant_id_due_date', 'bills', ['tenant_id', 'due_date'],
+        unique=False, postgresql_include=['amount', 'paid_total'],
+    )
+    op.create_index(
+        'ix_bills_tenant_id_due_date_open', 'bills', ['tenant_id', 'due_date'],
+        unique=False, postgresql_include=['resident_id', 'outstanding'], postgresql_where=sa.text('outstanding > 0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bills_tenant_id_due_date_open', table_name='bills')
+    op.drop_index('ix_bills_tenant_id_due_date', table_name='bills')
@@ -1,12 +1,16 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import asyncio
+from typing import AsyncGenerator, Dict, Generator, List, Optional
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.principal_cache import CachedPrincipal, principal_cache
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.models import all_models as models
 from app.schemas import user as schemas
 from app.schemas.token import TokenPayload
@@ -23,9 +27,11 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> models.User:
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def decode_access_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -41,7 +47,64 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(models.User).filter(models.User.id == int(token_data.sub)).first()
+    return token_data
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+) -> models.User:
+    token_data = decode_access_token(token)
+    user = load_principal(db, int(token_data.sub))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+def _cache_loaded_user(db, user: models.User) -> CachedPrincipal:
+    # Detach the loaded graph so the cache owns it; requests only ever get merged copies
+    for obj in (user, user.tenant, user.tenant.package if user.tenant else None):
+        if obj is not None:
+            db.expunge(obj)
+    return principal_cache.put(user)
+
+def load_principal(db: Session, user_id: int) -> Optional[models.User]:
+    """
+    Return the user bound to `db`, served from the principal cache when possible.
+    A miss loads the user, tenant and package in one query.
+    """
+    cached = principal_cache.get(user_id)
+    if cached is None:
+        user = (
+            db.query(models.User)
+            .options(joinedload(models.User.tenant).joinedload(Tenant.package))
+            .filter(models.User.id == user_id)
+            .first()
+        )
+        if not user:
+            return None
+        cached = _cache_loaded_user(db, user)
+    return db.merge(cached.user, load=False)
+
+async def load_principal_async(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    """
+    Async counterpart of `load_principal` sharing the same cache.
+    """
+    cached = principal_cache.get(user_id)
+    if cached is None:
+        result = await db.execute(
+            select(models.User)
+            .options(joinedload(models.User.tenant).joinedload(Tenant.package))
+            .where(models.User.id == user_id)
+        )
+        user = result.scalars().first()
+        if not user:
+            return None
+        cached = _cache_loaded_user(db, user)
+    return await db.merge(cached.user, load=False)
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
+) -> models.User:
+    token_data = decode_access_token(token)
+    user = await load_principal_async(db, int(token_data.sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -53,6 +116,13 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_current_active_user_async(
+    current_user: models.User = Depends(get_current_user_async),
+) -> models.User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
 def get_current_active_admin(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
@@ -84,18 +154,47 @@ def get_current_tenant(
         raise HTTPException(status_code=403, detail="Tenant is suspended")
     return current_user.tenant
 
+# user_id -> in-flight principal load, so a reconnect storm costs one query per user
+_principal_loads: Dict[int, "asyncio.Future[Optional[CachedPrincipal]]"] = {}
+
+async def _fetch_principal(user_id: int) -> Optional[CachedPrincipal]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.User)
+            .options(joinedload(models.User.tenant).joinedload(Tenant.package))
+            .where(models.User.id == user_id)
+        )
+        user = result.scalars().first()
+        if not user:
+            return None
+        return _cache_loaded_user(db, user)
+
 async def get_current_user_ws(token: str) -> Optional[models.User]:
+    """
+    Authenticate a WebSocket without blocking the event loop.
+    Returns the cached, detached user: callers may read it but must not modify it.
+    """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
+        token_data = decode_access_token(token)
+    except HTTPException:
         return None
-        
-    db = SessionLocal()
-    try:
-        user = db.query(models.User).filter(models.User.id == int(token_data.sub)).first()
-        return user
-    finally:
-        db.close()
+
+    user_id = int(token_data.sub)
+    cached = principal_cache.get(user_id)
+    if cached is None:
+        pending = _principal_loads.get(user_id)
+        if pending is None:
+            pending = asyncio.ensure_future(_fetch_principal(user_id))
+            _principal_loads[user_id] = pending
+            pending.add_done_callback(lambda _: _principal_loads.pop(user_id, None))
+        cached = await asyncio.shield(pending)
+    if cached is None or not cached.user.is_active:
+        return None
+    return cached.user
+
+def with_next_cursor(response: Response, page: List) -> List:
+    """Expose a page's continuation cursor as the X-Next-Cursor header; the body stays a plain list."""
+    next_cursor = getattr(page, "next_cursor", None)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return page
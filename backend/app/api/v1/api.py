@@ -1,5 +1,13 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import visitors, login, users, financial, notices, incidents, tickets, amenities, bookings, staff, notifications, marketplace, utils, vehicles, parcels, polls, documents, mfa, security, upload, properties, tenants, packages, stats, websockets, access_logs
+from fastapi import APIRouter, Depends
+from app.api import deps
+from app.core.analytics_cache import financial_analytics_cache
+from app.core.blacklist_index import blacklist_index
+from app.core.code_allocator import code_allocator
+from app.core.financial_documents import document_renderer
+from app.core.principal_cache import principal_cache
+from app.db.pool_metrics import async_pool_metrics, sync_pool_metrics
+from app.db.session import async_engine, engine
+from app.api.v1.endpoints import visitors, gate, login, users, financial, notices, incidents, tickets, amenities, bookings, staff, notifications, marketplace, utils, vehicles, parcels, polls, documents, mfa, security, upload, properties, tenants, packages, stats, websockets, access_logs
 
 api_router = APIRouter()
 
@@ -7,9 +15,26 @@ api_router = APIRouter()
 def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@api_router.get("/metrics", tags=["system"], dependencies=[Depends(deps.get_current_active_superuser)])
+def read_metrics():
+    """Process-wide stats, across all tenants. (Super admin only)"""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "blacklist_index": blacklist_index.stats(),
+        "code_allocator": code_allocator.stats(),
+        "financial_analytics_cache": financial_analytics_cache.stats(),
+        "document_renderer": document_renderer.stats(),
+        "db_pool": {
+            "sync": sync_pool_metrics.snapshot(engine.pool),
+            "async": async_pool_metrics.snapshot(async_engine.pool),
+        },
+        "websockets": websockets.manager.stats(),
+    }
+
 api_router.include_router(login.router, tags=["login"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(visitors.router, prefix="/visitors", tags=["visitors"])
+api_router.include_router(gate.router, prefix="/gate", tags=["gate"])
 api_router.include_router(financial.router, prefix="/financial", tags=["financial"])
 api_router.include_router(notices.router, prefix="/notices", tags=["notices"])
 api_router.include_router(incidents.router, prefix="/incidents", tags=["incidents"])
@@ -1,19 +1,19 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models.all_models import User, UserRole, AccessLog
+from app.crud import crud_access_log_async
+from app.models.all_models import User, UserRole
 from app.schemas import access_log as schemas
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.AccessLog)
-def create_access_log(
+async def create_access_log(
     log_in: schemas.AccessLogCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Log resident/user access (Entry/Exit).
@@ -22,33 +22,26 @@ def create_access_log(
         raise HTTPException(status_code=403, detail="Not authorized to log access")
 
     # Verify user exists and belongs to same tenant
-    user = db.query(User).filter(User.id == log_in.user_id).first()
+    user = await db.get(User, log_in.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if user.tenant_id != current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User belongs to different tenant")
 
-    access_log = AccessLog(
-        tenant_id=current_user.tenant_id,
-        user_id=log_in.user_id,
-        direction=log_in.direction,
-        method=log_in.method,
-        guard_id=current_user.id
+    return await crud_access_log_async.create_access_log(
+        db, log_in=log_in, guard_id=current_user.id, tenant_id=current_user.tenant_id
     )
-    
-    db.add(access_log)
-    db.commit()
-    db.refresh(access_log)
-    return access_log
 
 @router.get("/user/{user_id}", response_model=List[schemas.AccessLog])
-def get_user_access_logs(
+async def get_user_access_logs(
+    response: Response,
     user_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Get access logs for a specific user.
@@ -56,7 +49,7 @@ def get_user_access_logs(
     if current_user.role == UserRole.RESIDENT and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    return db.query(AccessLog).filter(
-        AccessLog.user_id == user_id,
-        AccessLog.tenant_id == current_user.tenant_id
-    ).order_by(AccessLog.timestamp.desc()).offset(skip).limit(limit).all()
+    logs = await crud_access_log_async.get_access_logs_by_user(
+        db, user_id=user_id, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor
+    )
+    return deps.with_next_cursor(response, logs)
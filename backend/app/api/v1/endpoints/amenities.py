@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_amenity
@@ -10,14 +10,16 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Amenity])
 def read_amenities(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
-    return crud_amenity.get_amenities(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+    return deps.with_next_cursor(response, crud_amenity.get_amenities(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
 
 @router.post("/", response_model=schemas.Amenity)
 def create_amenity(
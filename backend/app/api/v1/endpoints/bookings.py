@@ -1,6 +1,6 @@
-from typing import List, Any
+from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_booking, crud_amenity
@@ -29,9 +29,11 @@ def create_booking(
 
 @router.get("/", response_model=List[schemas.Booking])
 def read_bookings(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: str = None,
     end_date: str = None,
     current_user: User = Depends(deps.get_current_active_user)
@@ -43,9 +45,9 @@ def read_bookings(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
     if current_user.role == UserRole.ADMIN:
-        return crud_booking.get_bookings(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, start_date=start, end_date=end)
+        return deps.with_next_cursor(response, crud_booking.get_bookings(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, start_date=start, end_date=end))
     else:
-        return crud_booking.get_bookings(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, user_id=current_user.id, start_date=start, end_date=end)
+        return deps.with_next_cursor(response, crud_booking.get_bookings(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, user_id=current_user.id, start_date=start, end_date=end))
 
 @router.patch("/{booking_id}", response_model=schemas.Booking)
 def update_booking(
@@ -57,14 +59,14 @@ def update_booking(
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
-    booking = crud_booking.get_booking(db=db, booking_id=booking_id)
+    # Residents may only change their own bookings
+    booking = crud_booking.update_booking(
+        db=db,
+        booking_id=booking_id,
+        booking_update=booking_in,
+        tenant_id=current_user.tenant_id,
+        user_id=None if current_user.role == UserRole.ADMIN else current_user.id,
+    )
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-        
-    if booking.tenant_id != current_user.tenant_id:
-        raise HTTPException(status_code=404, detail="Booking not found")
-        
-    if current_user.role != UserRole.ADMIN and booking.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    return crud_booking.update_booking(db=db, booking_id=booking_id, booking_update=booking_in)
+    return booking
@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_document
@@ -21,16 +21,18 @@ def create_document(
 
 @router.get("/", response_model=List[schemas.CommunityDocument])
 def read_documents(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     category: DocumentCategory = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """Retrieve documents."""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
-    return crud_document.get_documents(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, category=category)
+    return deps.with_next_cursor(response, crud_document.get_documents(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, category=category))
 
 @router.delete("/{document_id}", response_model=schemas.CommunityDocument)
 def delete_document(
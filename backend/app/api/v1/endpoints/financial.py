@@ -1,12 +1,24 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.crud import crud_financial
+from app.core.analytics_cache import financial_analytics_cache
+from app.core.config import settings
+from app.core.financial_documents import (
+    INVOICE, RECEIPT, document_key, document_renderer, document_state, invoice_query, receipt_query,
+)
+from app.core.payment_matching import PaymentMatcher, parse_statement_csv
+from app.crud import crud_financial, crud_statement
 from app.schemas import financial as schemas
-from app.models.all_models import User, UserRole, PaymentStatus, FeeDefinition, Bill, BillStatus
-from datetime import datetime, timedelta
-from app.core import notifications as notification_service
+from app.models.all_models import User, UserRole, PaymentStatus, FeeDefinition, Bill, BillStatus, Payment
+from datetime import date, datetime, timedelta, timezone
+import csv
+import io
+import json
+from app.jobs.generate_bills import current_period, run_billing
+from app.jobs.render_invoices import start_period_render
 
 router = APIRouter()
 
@@ -27,15 +39,17 @@ def create_fee_definition(
 
 @router.get("/fees", response_model=List[schemas.FeeDefinition])
 def read_fee_definitions(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """Retrieve fee definitions."""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
-    return crud_financial.get_fee_definitions(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+    return deps.with_next_cursor(response, crud_financial.get_fee_definitions(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
 
 @router.put("/fees/{fee_id}", response_model=schemas.FeeDefinition)
 def update_fee_definition(
@@ -72,71 +86,49 @@ def delete_fee_definition(
 
 # --- Bills ---
 
-@router.post("/bills/generate-monthly", response_model=List[schemas.Bill])
-async def generate_monthly_bills(
+@router.post("/bills/generate-monthly", response_model=schemas.BillingRun, status_code=202)
+def generate_monthly_bills(
+    background_tasks: BackgroundTasks,
+    period: Optional[date] = None,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """
-    Generate monthly bills for all active residents. (Admin only)
+    Generate a month's bills for all active residents, one per active fee
+    definition. (Admin only)
+
+    `period` is any day of the month to bill (default: this month). Returns a
+    billing run to poll at /bills/billing-runs/{run_id}; rerunning a period
+    only bills residents and fees it missed.
     """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
-    # 1. Get default levy fee
-    default_fee = db.query(FeeDefinition).filter(
-        FeeDefinition.name == "Monthly Levy",
-        FeeDefinition.is_active == True,
-        FeeDefinition.tenant_id == current_user.tenant_id
-    ).first()
-    
-    if not default_fee:
-        raise HTTPException(status_code=400, detail="Active 'Monthly Levy' fee definition not found")
-
-    # 2. Get all active residents
-    residents = db.query(User).filter(
-        User.role == UserRole.RESIDENT,
-        User.is_active == True,
-        User.tenant_id == current_user.tenant_id
-    ).all()
-    
-    generated_bills = []
-    
-    # 3. Create bill for each resident if not already billed for this month
-    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    due_date = current_month_start + timedelta(days=25) # Due on 25th
-    
-    for resident in residents:
-        bill_description = f"Monthly Levy - {current_month_start.strftime('%B %Y')}"
-        
-        # Check if bill exists for this month
-        existing_bill = db.query(Bill).filter(
-            Bill.resident_id == resident.id,
-            Bill.description == bill_description,
-            Bill.created_at >= current_month_start
-        ).first()
-        
-        if not existing_bill:
-            bill_in = schemas.BillCreate(
-                resident_id=resident.id,
-                amount=default_fee.amount,
-                description=bill_description,
-                due_date=due_date
-            )
-            bill = crud_financial.create_bill(db=db, bill=bill_in)
-            generated_bills.append(bill)
-            
-            # Send Email Notification
-            if resident.email:
-                await notification_service.send_email(
-                    to_email=resident.email,
-                    subject="New Bill Generated",
-                    body=f"Dear {resident.full_name}, your monthly levy bill for {current_month_start.strftime('%B %Y')} of ${(default_fee.amount/100):.2f} has been generated. Please view it in your dashboard."
-                )
-            
-    return generated_bills
+    period = current_period(period)
+    if not crud_financial.get_active_fee_definitions(db, current_user.tenant_id):
+        raise HTTPException(status_code=400, detail="No active fee definitions found")
+    if crud_financial.get_active_billing_run(db, current_user.tenant_id, period):
+        raise HTTPException(status_code=409, detail="Bills for this period are already being generated")
+
+    run = crud_financial.create_billing_run(db, current_user.tenant_id, period, requested_by_id=current_user.id)
+    background_tasks.add_task(run_billing, run.id)
+    return run
+
+@router.get("/bills/billing-runs/{run_id}", response_model=schemas.BillingRun)
+def read_billing_run(
+    run_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Progress of a bill generation run. (Admin only)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    run = crud_financial.get_billing_run(db, run_id, current_user.tenant_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing run not found")
+    return run
 
 @router.post("/bills", response_model=schemas.Bill)
 def create_bill(
@@ -158,13 +150,17 @@ def create_bill(
     if resident.tenant_id != current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Resident does not belong to your tenant")
         
-    return crud_financial.create_bill(db=db, bill=bill_in)
+    bill = crud_financial.create_bill(db=db, bill=bill_in, tenant_id=current_user.tenant_id)
+    financial_analytics_cache.invalidate_tenant(current_user.tenant_id)
+    return bill
 
 @router.get("/bills", response_model=List[schemas.Bill])
 def read_bills(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """Retrieve bills."""
@@ -172,9 +168,9 @@ def read_bills(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
         
     if current_user.role == UserRole.ADMIN:
-        return crud_financial.get_bills(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+        return deps.with_next_cursor(response, crud_financial.get_bills(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
     else:
-        return crud_financial.get_bills(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, resident_id=current_user.id)
+        return deps.with_next_cursor(response, crud_financial.get_bills(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, resident_id=current_user.id))
 
 # --- Payments ---
 
@@ -202,9 +198,11 @@ def create_payment(
 
 @router.get("/payments", response_model=List[schemas.Payment])
 def read_payments(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: str = None,
     end_date: str = None,
     current_user: User = Depends(deps.get_current_active_user)
@@ -217,9 +215,67 @@ def read_payments(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
     if current_user.role == UserRole.ADMIN:
-        return crud_financial.get_payments(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, start_date=start, end_date=end)
+        return deps.with_next_cursor(response, crud_financial.get_payments(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, start_date=start, end_date=end))
     else:
-        return crud_financial.get_payments(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, user_id=current_user.id, start_date=start, end_date=end)
+        return deps.with_next_cursor(response, crud_financial.get_payments(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, user_id=current_user.id, start_date=start, end_date=end))
+
+@router.post("/payments/import", response_model=schemas.BankImportResult)
+def import_bank_statement(
+    file: UploadFile = File(...),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Record and verify payments from a bank-statement CSV. (Admin only)
+
+    Each credit line is matched to an open bill by a bill number in its
+    reference ("BILL 123", "INV-123"), or by the resident's name or house
+    address in the payer/reference together with the amount. Matched lines
+    become verified bank-transfer payments in one transaction; the rest are
+    returned with the reason for review. Lines already imported (same
+    reference, amount and date) are skipped.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+    try:
+        content = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+    try:
+        lines = parse_statement_csv(content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not lines:
+        raise HTTPException(status_code=400, detail="No statement lines to import")
+    if len(lines) > settings.BANK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BANK_IMPORT_MAX_ROWS} lines per import")
+
+    matcher = PaymentMatcher.load(db, current_user.tenant_id, lines)
+    results, matches = [], []
+    for line in lines:
+        match, reason = matcher.match(line)
+        results.append(schemas.BankImportRowResult(
+            row=line.row,
+            status="matched" if match else "unmatched",
+            amount=line.amount,
+            reference=line.reference or None,
+            payer=line.payer,
+            paid_on=line.paid_on,
+            bill_id=match.bill.id if match else None,
+            reason=reason or None,
+        ))
+        if match:
+            matches.append(match)
+
+    payment_ids = crud_financial.record_bank_payments(db, matches, current_user.tenant_id)
+    db.commit()
+    if payment_ids:
+        financial_analytics_cache.invalidate_tenant(current_user.tenant_id)
+    for match, payment_id in zip(matches, payment_ids):
+        results[match.line.row - 1].payment_id = payment_id
+    return schemas.BankImportResult(matched=len(matches), unmatched=len(lines) - len(matches), results=results)
 
 @router.put("/payments/{payment_id}/status", response_model=schemas.Payment)
 def update_payment_status(
@@ -228,7 +284,11 @@ def update_payment_status(
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Update payment status (Verify/Reject). (Admin only)"""
+    """
+    Update payment status (Verify/Reject). (Admin only) The bill's paid total,
+    outstanding balance and status change in the same statement. Rejecting a
+    verified payment reverses it; any other transition gets a 409.
+    """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
     if not current_user.tenant_id:
@@ -237,4 +297,205 @@ def update_payment_status(
     payment = crud_financial.update_payment_status(db=db, payment_id=payment_id, status=status, tenant_id=current_user.tenant_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
+    financial_analytics_cache.invalidate_tenant(current_user.tenant_id)
     return payment
+
+@router.post("/payments/status", response_model=schemas.PaymentBulkStatusResult)
+def update_payment_statuses(
+    update_in: schemas.PaymentBulkStatusUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Verify or reject many payments in one transaction. (Admin only) Payments
+    that cannot make the transition are reported in `conflicts` and left as they are.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+
+    updated, conflicts, not_found = crud_financial.set_payment_statuses(
+        db, update_in.payment_ids, update_in.status, current_user.tenant_id
+    )
+    db.commit()
+    financial_analytics_cache.invalidate_tenant(current_user.tenant_id)
+    return {
+        "updated": updated,
+        "conflicts": [{"id": payment_id, "status": status} for payment_id, status in conflicts.items()],
+        "not_found": not_found,
+    }
+
+# --- Analytics ---
+
+@router.get("/analytics", response_model=schemas.FinancialAnalytics)
+def read_financial_analytics(
+    months: int = Query(12, ge=1, le=120),
+    top: int = Query(10, ge=1, le=100),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Receivables aging, collection rate by due month and top debtors. (Admin only)
+    Results are cached per tenant for FINANCIAL_ANALYTICS_CACHE_TTL_SECONDS and
+    refreshed when payments are verified or rejected.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+
+    tenant_id = current_user.tenant_id
+    cached = financial_analytics_cache.get(tenant_id, (months, top))
+    if cached is not None:
+        return cached
+
+    as_of = datetime.now(timezone.utc)
+    first_month = as_of.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+    collection = [
+        {
+            "month": row.month.date(),
+            "bills": row.bills,
+            "billed": row.billed,
+            "collected": row.collected,
+            "collection_rate": round(row.collected / row.billed, 4) if row.billed else 0.0,
+        }
+        for row in crud_financial.get_collection_by_month(db, tenant_id, first_month, as_of)
+    ]
+    analytics = {
+        "as_of": as_of,
+        "aging": crud_financial.get_receivables_aging(db, tenant_id, as_of),
+        "collection": collection,
+        "top_debtors": [dict(row._mapping) for row in crud_financial.get_top_debtors(db, tenant_id, top)],
+    }
+    return financial_analytics_cache.put(tenant_id, (months, top), analytics)
+
+# --- Statements ---
+
+def _statement_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+async def _statement_jsonl(batches):
+    async for rows in batches:
+        yield "".join(
+            json.dumps({name: _statement_value(row._mapping[name]) for name in crud_statement.COLUMNS}) + "\n"
+            for row in rows
+        )
+
+async def _statement_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(crud_statement.COLUMNS)
+    yield buffer.getvalue()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_statement_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+@router.get("/statement")
+async def read_statement(
+    resident_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    format: Literal["jsonl", "csv"] = "jsonl",
+    current_user: User = Depends(deps.get_current_active_user_async)
+) -> Any:
+    """
+    Stream a statement: bills, verified payments, the running balance after each
+    entry and the aging of unpaid bills, in date order per resident. Residents
+    get their own statement; admins get one resident's, or every resident's if
+    resident_id is omitted. Rows are sent as JSON lines or CSV as they are read.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+    if current_user.role != UserRole.ADMIN:
+        if resident_id is not None and resident_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        resident_id = current_user.id
+
+    stmt = crud_statement.statement_query(current_user.tenant_id, resident_id, start=start_date, end=end_date)
+    batches = crud_statement.stream_statement(stmt, settings.STATEMENT_STREAM_BATCH_SIZE)
+    filename = f"statement-{resident_id or 'all'}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "csv":
+        return StreamingResponse(_statement_csv(batches), media_type="text/csv", headers=headers)
+    return StreamingResponse(_statement_jsonl(batches), media_type="application/x-ndjson", headers=headers)
+
+# --- Documents (PDF) ---
+
+async def _document_response(request: Request, kind: str, row, filename: str) -> Response:
+    state = document_state(row)
+    key = document_key(kind, state)
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    content = await document_renderer.render(kind, state, key)
+    return Response(content=content, media_type="application/pdf", headers=headers)
+
+@router.get("/bills/{bill_id}/invoice.pdf")
+async def read_invoice_pdf(
+    bill_id: int,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async)
+) -> Any:
+    """
+    The bill as a PDF invoice. Residents get their own bills; admins any bill
+    of the tenant. Rendered in a worker process and stored under a hash of the
+    bill's current state, so repeat requests are served from storage until the
+    bill changes.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+    query = invoice_query().where(Bill.id == bill_id, Bill.tenant_id == current_user.tenant_id)
+    if current_user.role != UserRole.ADMIN:
+        query = query.where(Bill.resident_id == current_user.id)
+    row = (await db.execute(query)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Bill not found")
+    return await _document_response(request, INVOICE, row, f"invoice-{bill_id}.pdf")
+
+@router.get("/payments/{payment_id}/receipt.pdf")
+async def read_receipt_pdf(
+    payment_id: int,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async)
+) -> Any:
+    """The verified payment as a PDF receipt, rendered and stored like invoices."""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+    query = receipt_query().where(Payment.id == payment_id, Payment.tenant_id == current_user.tenant_id)
+    if current_user.role != UserRole.ADMIN:
+        query = query.where(Payment.user_id == current_user.id)
+    row = (await db.execute(query)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    if row.status != PaymentStatus.VERIFIED:
+        raise HTTPException(status_code=409, detail="Receipts are only issued for verified payments")
+    return await _document_response(request, RECEIPT, row, f"receipt-{payment_id}.pdf")
+
+@router.post("/bills/render-invoices", status_code=202)
+async def render_invoices(
+    period: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_user_async)
+) -> Any:
+    """
+    Pre-render the invoices of a month (any day of it; default this month) in
+    the background, so residents' downloads are served from storage. (Admin only)
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+    period = current_period(period)
+    if not start_period_render(current_user.tenant_id, period):
+        return {"period": period, "detail": f"Invoices for {period:%B %Y} are already being rendered"}
+    return {"period": period, "detail": f"Rendering invoices for {period:%B %Y}"}
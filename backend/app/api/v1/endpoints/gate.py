@@ -0,0 +1,56 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.v1.endpoints.visitors import notify_host_of_arrival, visitor_event
+from app.api.v1.endpoints.websockets import manager
+from app.core.blacklist_index import blacklist_index
+from app.crud import crud_visitor_async
+from app.models.all_models import User, UserRole
+from app.schemas import visitor as schemas
+
+router = APIRouter()
+
+@router.post("/verify-and-admit", response_model=schemas.Visitor)
+async def verify_and_admit(
+    admit_in: schemas.VisitorAdmit,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Scan a visitor's access code and check them in. (Guard/Admin only)
+
+    Lookup, expiry check and the status change happen in a single statement and
+    the blacklist is checked in memory; the host is notified after the response
+    is sent. A code that was already used gets a 409.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.GUARD]:
+        raise HTTPException(status_code=403, detail="Not authorized to check in visitors")
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+
+    row = await crud_visitor_async.admit_by_access_code(
+        db,
+        access_code=admit_in.access_code,
+        tenant_id=current_user.tenant_id,
+        items_carried_in=admit_in.items_carried_in,
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Visitor not found")
+    # Checked after the update, from memory; the admission is only committed if clear
+    if await blacklist_index.contains_async(db, current_user.tenant_id, phone_number=row.phone_number):
+        await db.rollback()
+        raise HTTPException(status_code=403, detail="This visitor is blacklisted and cannot be checked in.")
+    await db.commit()
+
+    visitor = schemas.Visitor.model_validate(row._mapping)
+    background_tasks.add_task(
+        manager.broadcast_to_topics,
+        message=visitor_event("visitor_checked_in", visitor),
+        tenant_id=current_user.tenant_id,
+        topics=[f"visitor:{visitor.id}", f"host:{visitor.host_id}"]
+    )
+    background_tasks.add_task(notify_host_of_arrival, visitor.host_id, visitor.full_name, visitor.check_in_time)
+    return visitor
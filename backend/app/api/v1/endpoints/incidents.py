@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_incident, crud_user
@@ -96,9 +96,11 @@ def create_incident(
 
 @router.get("/", response_model=List[schemas.Incident])
 def read_incidents(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: str = None,
     end_date: str = None,
     current_user: User = Depends(deps.get_current_active_user)
@@ -113,14 +115,15 @@ def read_incidents(
     end = datetime.fromisoformat(end_date) if end_date else None
 
     if current_user.role in [UserRole.ADMIN, UserRole.GUARD]:
-        return crud_incident.get_incidents(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, start_date=start, end_date=end)
+        return deps.with_next_cursor(response, crud_incident.get_incidents(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, start_date=start, end_date=end))
     else:
-        return crud_incident.get_incidents(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, reporter_id=current_user.id, start_date=start, end_date=end)
+        return deps.with_next_cursor(response, crud_incident.get_incidents(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, reporter_id=current_user.id, start_date=start, end_date=end))
 
 @router.patch("/{incident_id}/status", response_model=schemas.Incident)
 def update_incident_status(
     incident_id: int,
     status: IncidentStatus,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -142,4 +145,10 @@ def update_incident_status(
         raise HTTPException(status_code=404, detail="Incident not found")
         
     incident = crud_incident.update_incident_status(db=db, incident_id=incident_id, status=status, tenant_id=current_user.tenant_id)
+    background_tasks.add_task(
+        manager.broadcast_to_topics,
+        message={"type": "incident_status", "incident_id": incident.id, "status": incident.status},
+        tenant_id=current_user.tenant_id,
+        topics=[f"incident:{incident.id}"]
+    )
     return incident
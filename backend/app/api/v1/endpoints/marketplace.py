@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_marketplace
@@ -10,9 +10,11 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.MarketplaceItem])
 def read_marketplace_items(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     category: str = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -20,8 +22,8 @@ def read_marketplace_items(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
     
     if category:
-        return crud_marketplace.marketplace.get_multi_by_category(db=db, category=category, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
-    return crud_marketplace.marketplace.get_available(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+        return deps.with_next_cursor(response, crud_marketplace.marketplace.get_multi_by_category(db=db, category=category, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
+    return deps.with_next_cursor(response, crud_marketplace.marketplace.get_available(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
 
 @router.get("/me", response_model=List[schemas.MarketplaceItem])
 def read_my_items(
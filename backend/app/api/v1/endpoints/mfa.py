@@ -7,6 +7,7 @@ from app.schemas import mfa as mfa_schemas
 from app.schemas.token import Token
 from app.core import security
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from jose import jwt
 from datetime import timedelta
 from pydantic import ValidationError
@@ -30,6 +31,7 @@ def setup_mfa(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    principal_cache.invalidate(current_user.id)
     
     totp = pyotp.TOTP(secret)
     provisioning_uri = totp.provisioning_uri(
@@ -64,6 +66,7 @@ def verify_mfa_setup(
     current_user.mfa_enabled = True
     db.add(current_user)
     db.commit()
+    principal_cache.invalidate(current_user.id)
     
     return {"message": "MFA enabled successfully"}
 
@@ -87,6 +90,7 @@ def disable_mfa(
     current_user.mfa_secret = None
     db.add(current_user)
     db.commit()
+    principal_cache.invalidate(current_user.id)
     
     return {"message": "MFA disabled successfully"}
 
@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_notice
@@ -27,9 +27,11 @@ def create_notice(
 
 @router.get("/", response_model=List[schemas.Notice])
 def read_notices(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """
@@ -38,4 +40,4 @@ def read_notices(
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
-    return crud_notice.get_notices(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+    return deps.with_next_cursor(response, crud_notice.get_notices(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
@@ -1,8 +1,9 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.crud import crud_notification, crud_user
+from app.crud import crud_notification_async, crud_user
 from app.schemas import notification as schemas
 from app.models.all_models import User
 from app.core.communications import communication_service
@@ -42,25 +43,27 @@ def send_test_notification(
     return {"message": f"Test {type} sent"}
 
 @router.get("/", response_model=List[schemas.Notification])
-def read_notifications(
-    db: Session = Depends(deps.get_db),
+async def read_notifications(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_user)
+    cursor: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_active_user_async)
 ) -> Any:
-    return crud_notification.notification.get_by_user(db=db, user_id=current_user.id, skip=skip, limit=limit)
+    return deps.with_next_cursor(response, await crud_notification_async.notification.get_by_user(db=db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor))
 
 @router.get("/unread-count", response_model=int)
-def read_unread_count(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+async def read_unread_count(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async)
 ) -> Any:
-    return crud_notification.notification.get_unread_count(db=db, user_id=current_user.id)
+    return await crud_notification_async.notification.get_unread_count(db=db, user_id=current_user.id)
 
 @router.post("/mark-read", response_model=Any)
-def mark_all_read(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+async def mark_all_read(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async)
 ) -> Any:
-    crud_notification.notification.mark_all_read(db=db, user_id=current_user.id)
+    await crud_notification_async.notification.mark_all_read(db=db, user_id=current_user.id)
     return {"message": "All notifications marked as read"}
@@ -1,9 +1,10 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.principal_cache import principal_cache
 from app.crud import crud_package
 from app.models.all_models import User
 from app.schemas.package import Package, PackageCreate, PackageUpdate
@@ -12,16 +13,18 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Package])
 def read_packages(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Retrieve packages.
     """
-    packages = crud_package.package.get_multi(db, skip=skip, limit=limit)
-    return packages
+    packages = crud_package.package.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    return deps.with_next_cursor(response, packages)
 
 @router.post("/", response_model=Package)
 def create_package(
@@ -51,6 +54,8 @@ def update_package(
     if not package:
         raise HTTPException(status_code=404, detail="Package not found")
     package = crud_package.package.update(db, db_obj=package, obj_in=package_in)
+    # Plan limits are cached on every principal of every tenant on this package
+    principal_cache.clear()
     return package
 
 @router.delete("/{id}", response_model=Package)
@@ -67,4 +72,5 @@ def delete_package(
     if not package:
         raise HTTPException(status_code=404, detail="Package not found")
     package = crud_package.package.remove(db, id=id)
+    principal_cache.clear()
     return package
@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_parcel
@@ -33,9 +33,11 @@ def create_parcel(
 
 @router.get("/", response_model=List[schemas.Parcel])
 def read_parcels(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: ParcelStatus = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -44,9 +46,9 @@ def read_parcels(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
     if current_user.role in [UserRole.ADMIN, UserRole.GUARD]:
-        return crud_parcel.get_parcels(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, status=status)
+        return deps.with_next_cursor(response, crud_parcel.get_parcels(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, status=status))
     else:
-        return crud_parcel.get_parcels(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, recipient_id=current_user.id, status=status)
+        return deps.with_next_cursor(response, crud_parcel.get_parcels(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, recipient_id=current_user.id, status=status))
 
 @router.put("/{parcel_id}/collect", response_model=schemas.Parcel)
 def collect_parcel(
@@ -54,11 +56,11 @@ def collect_parcel(
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Mark parcel as collected."""
+    """Mark parcel as collected. A parcel that already left the gate gets a 409."""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
-    parcel = crud_parcel.update_parcel_status(db=db, parcel_id=parcel_id, status=ParcelStatus.COLLECTED, tenant_id=current_user.tenant_id)
+    parcel = crud_parcel.collect_parcel(db=db, parcel_id=parcel_id, tenant_id=current_user.tenant_id)
     if not parcel:
         raise HTTPException(status_code=404, detail="Parcel not found")
     return parcel
@@ -1,10 +1,11 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_poll
 from app.schemas import poll as schemas
 from app.models.all_models import User, UserRole
+from app.api.v1.endpoints.websockets import manager
 
 router = APIRouter()
 
@@ -21,20 +22,23 @@ def create_poll(
 
 @router.get("/", response_model=List[schemas.Poll])
 def read_polls(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """Retrieve polls."""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
-    return crud_poll.get_polls(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, user_id=current_user.id)
+    return deps.with_next_cursor(response, crud_poll.get_polls(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, user_id=current_user.id))
 
 @router.post("/{poll_id}/vote", response_model=schemas.Poll)
 def vote_poll(
     poll_id: int,
     vote_in: schemas.VoteCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -50,6 +54,17 @@ def vote_poll(
     # Actually crud returns the poll object, but we need to set the user_has_voted flag manually or re-fetch via get_polls logic
     # Simplified: return the poll, frontend will see updated counts.
     poll.user_has_voted = True
+
+    background_tasks.add_task(
+        manager.broadcast_to_topics,
+        message={
+            "type": "poll_updated",
+            "poll_id": poll.id,
+            "options": [{"id": option.id, "vote_count": option.vote_count} for option in poll.options]
+        },
+        tenant_id=current_user.tenant_id,
+        topics=[f"poll:{poll.id}"]
+    )
     return poll
 
 @router.put("/{poll_id}", response_model=schemas.Poll)
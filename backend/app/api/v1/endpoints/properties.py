@@ -1,5 +1,5 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
@@ -11,9 +11,11 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Property])
 def read_properties(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -23,9 +25,9 @@ def read_properties(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
         
     properties = crud_property.property.get_multi(
-        db, tenant_id=current_user.tenant_id, skip=skip, limit=limit
+        db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor
     )
-    return properties
+    return deps.with_next_cursor(response, properties)
 
 @router.post("/", response_model=schemas.Property)
 def create_property(
@@ -1,5 +1,5 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.models.all_models import User, UserRole
@@ -13,9 +13,11 @@ router = APIRouter()
 
 @router.get("/blacklist", response_model=List[security_schemas.Blacklist])
 def read_blacklist(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -25,9 +27,9 @@ def read_blacklist(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
         
     blacklist = crud_blacklist.blacklist.get_multi(
-        db, tenant_id=current_user.tenant_id, skip=skip, limit=limit
+        db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor
     )
-    return blacklist
+    return deps.with_next_cursor(response, blacklist)
 
 @router.post("/blacklist", response_model=security_schemas.Blacklist)
 def create_blacklist_entry(
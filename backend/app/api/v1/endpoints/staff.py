@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_staff, crud_notification
@@ -137,9 +137,11 @@ def check_in_out(
 
 @router.get("/attendance/all", response_model=List[schemas.StaffAttendance])
 def read_all_attendance(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: str = None,
     end_date: str = None,
     current_user: User = Depends(deps.get_current_active_user)
@@ -150,7 +152,7 @@ def read_all_attendance(
     start = datetime.fromisoformat(start_date) if start_date else None
     end = datetime.fromisoformat(end_date) if end_date else None
     
-    return crud_staff.staff_attendance.get_all_attendance(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, start_date=start, end_date=end)
+    return deps.with_next_cursor(response, crud_staff.staff_attendance.get_all_attendance(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, start_date=start, end_date=end))
 
 @router.get("/{staff_id}/attendance", response_model=List[schemas.StaffAttendance])
 def read_staff_attendance(
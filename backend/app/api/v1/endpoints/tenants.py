@@ -1,6 +1,6 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
@@ -93,14 +93,16 @@ def get_my_tenant_usage(
 
 @router.get("/public", response_model=List[Tenant])
 def read_public_tenants(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve public list of tenants.
     """
-    tenants = crud_tenant.get_multi(db, skip=skip, limit=limit)
+    tenants = deps.with_next_cursor(response, crud_tenant.get_multi(db, skip=skip, limit=limit, cursor=cursor))
     # Filter only active tenants
     active_tenants = [t for t in tenants if t.is_active]
     return active_tenants
@@ -108,16 +110,18 @@ def read_public_tenants(
 
 @router.get("/", response_model=List[Tenant])
 def read_tenants(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Retrieve tenants.
     """
-    tenants = crud_tenant.get_multi(db, skip=skip, limit=limit)
-    return tenants
+    tenants = crud_tenant.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    return deps.with_next_cursor(response, tenants)
 
 
 @router.get("/by-slug/{slug}", response_model=Tenant)
@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_ticket
@@ -24,9 +24,11 @@ def create_ticket(
 
 @router.get("/", response_model=List[schemas.Ticket])
 def read_tickets(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """
@@ -36,12 +38,12 @@ def read_tickets(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
     if current_user.role == UserRole.ADMIN:
-        return crud_ticket.get_tickets(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+        return deps.with_next_cursor(response, crud_ticket.get_tickets(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
     elif current_user.role == UserRole.GUARD:
         # Guards might see tickets assigned to them
-        return crud_ticket.get_tickets(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, assigned_to_id=current_user.id) 
+        return deps.with_next_cursor(response, crud_ticket.get_tickets(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, assigned_to_id=current_user.id))
     else:
-        return crud_ticket.get_tickets(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, created_by_id=current_user.id)
+        return deps.with_next_cursor(response, crud_ticket.get_tickets(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, created_by_id=current_user.id))
 
 @router.get("/{ticket_id}", response_model=schemas.Ticket)
 def read_ticket(
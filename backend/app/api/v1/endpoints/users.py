@@ -1,8 +1,9 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.core import security
+from app.core.principal_cache import principal_cache
 from app.crud import crud_user
 from app.models.all_models import User, UserRole, Tenant
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, UserPasswordChange, UserPasswordReset
@@ -11,9 +12,11 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserSchema])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     role: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -26,8 +29,8 @@ def read_users(
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
-    users = crud_user.get_multi(db, skip=skip, limit=limit, role=role, tenant_id=current_user.tenant_id)
-    return users
+    users = crud_user.get_multi(db, skip=skip, limit=limit, cursor=cursor, role=role, tenant_id=current_user.tenant_id)
+    return deps.with_next_cursor(response, users)
 
 @router.post("/", response_model=UserSchema)
 def create_user(
@@ -44,39 +47,43 @@ def create_user(
         user_in.tenant_id = current_user.tenant_id
 
     if user_in.tenant_id:
-        tenant = db.query(Tenant).filter(Tenant.id == user_in.tenant_id).first()
-        if tenant:
-            limit = None
+        limit = None
+        principal = principal_cache.get(current_user.id)
+        if principal and principal.tenant_id == user_in.tenant_id:
+            # Limits were resolved (Package > Custom) when the principal was cached
+            limit = principal.limit_for_role(user_in.role)
+        else:
+            tenant = db.query(Tenant).filter(Tenant.id == user_in.tenant_id).first()
+            if tenant:
+                # Dynamic Package Limits (Priority)
+                if tenant.package:
+                    if user_in.role == UserRole.ADMIN:
+                        limit = tenant.package.max_admins
+                    elif user_in.role == UserRole.GUARD:
+                        limit = tenant.package.max_guards
+                    elif user_in.role == UserRole.RESIDENT:
+                        limit = tenant.package.max_residents
+                # Custom Tenant Limits (Fallback)
+                else:
+                    if user_in.role == UserRole.ADMIN:
+                        limit = tenant.max_admins
+                    elif user_in.role == UserRole.GUARD:
+                        limit = tenant.max_guards
+                    elif user_in.role == UserRole.RESIDENT:
+                        limit = tenant.max_residents
             
-            # Dynamic Package Limits (Priority)
-            if tenant.package:
-                if user_in.role == UserRole.ADMIN:
-                    limit = tenant.package.max_admins
-                elif user_in.role == UserRole.GUARD:
-                    limit = tenant.package.max_guards
-                elif user_in.role == UserRole.RESIDENT:
-                    limit = tenant.package.max_residents
-            # Custom Tenant Limits (Fallback)
-            else:
-                if user_in.role == UserRole.ADMIN:
-                    limit = tenant.max_admins
-                elif user_in.role == UserRole.GUARD:
-                    limit = tenant.max_guards
-                elif user_in.role == UserRole.RESIDENT:
-                    limit = tenant.max_residents
+        if limit is not None:
+            current_count = db.query(User).filter(
+                User.tenant_id == user_in.tenant_id,
+                User.role == user_in.role,
+                User.is_active == True
+            ).count()
             
-            if limit is not None:
-                current_count = db.query(User).filter(
-                    User.tenant_id == user_in.tenant_id,
-                    User.role == user_in.role,
-                    User.is_active == True
-                ).count()
-                
-                if current_count >= limit:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"User limit reached for role {user_in.role}. Limit is {limit}."
-                    )
+            if current_count >= limit:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"User limit reached for role {user_in.role}. Limit is {limit}."
+                )
 
     user = crud_user.get_by_email(db, email=user_in.email)
     if user:
@@ -1,5 +1,5 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud import crud_vehicle
@@ -29,9 +29,11 @@ def create_vehicle(
 
 @router.get("/", response_model=List[schemas.Vehicle])
 def read_vehicles(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """Retrieve vehicles."""
@@ -39,9 +41,9 @@ def read_vehicles(
         raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
 
     if current_user.role in [UserRole.ADMIN, UserRole.GUARD]:
-        return crud_vehicle.get_vehicles(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+        return deps.with_next_cursor(response, crud_vehicle.get_vehicles(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor))
     else:
-        return crud_vehicle.get_vehicles(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, user_id=current_user.id)
+        return deps.with_next_cursor(response, crud_vehicle.get_vehicles(db=db, tenant_id=current_user.tenant_id, skip=skip, limit=limit, cursor=cursor, user_id=current_user.id))
 
 @router.delete("/{vehicle_id}", response_model=schemas.Vehicle)
 def delete_vehicle(
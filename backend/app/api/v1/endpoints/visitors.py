@@ -1,42 +1,59 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response, UploadFile, File
+from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+import csv
+import io
+import logging
 
 from app.api import deps
-from app.crud import crud_visitor, crud_user
-from app.models.all_models import User, VisitorStatus, UserRole, Blacklist
+from app.crud import crud_visitor, crud_visitor_async, crud_user
+from app.models.all_models import User, VisitorStatus, UserRole
 from app.schemas import visitor as schemas
-from app.core import notifications as notification_service
+from app.core.blacklist_index import blacklist_index, normalize_phone
+from app.core.code_allocator import VISITOR_ACCESS_CODE, code_allocator
+from app.core.config import settings
+from app.core.notifications import notification_service
 from app.core.communications import communication_service
+from app.api.v1.endpoints.websockets import manager
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Visitor])
-def read_visitors(
-    db: Session = Depends(deps.get_db),
+async def read_visitors(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Retrieve visitors.
     """
     if current_user.role == UserRole.RESIDENT:
-        return crud_visitor.get_visitors_by_host(db=db, host_id=current_user.id, skip=skip, limit=limit)
+        return deps.with_next_cursor(response, await crud_visitor_async.get_visitors_by_host(db=db, host_id=current_user.id, skip=skip, limit=limit, cursor=cursor))
     
-    return crud_visitor.get_all_visitors(
+    visitors = await crud_visitor_async.get_all_visitors(
         db=db,
         skip=skip,
         limit=limit,
+        cursor=cursor,
         status=status,
         start_date=start_date,
         end_date=end_date,
         tenant_id=current_user.tenant_id,
     )
+    return deps.with_next_cursor(response, visitors)
 
 @router.post("/", response_model=schemas.Visitor)
 def create_visitor(
@@ -52,12 +69,7 @@ def create_visitor(
         visitor_in.host_id = current_user.id
     
     # Check blacklist
-    blacklist_entry = db.query(Blacklist).filter(
-        Blacklist.phone_number == visitor_in.phone_number,
-        Blacklist.tenant_id == current_user.tenant_id
-    ).first()
-    
-    if blacklist_entry:
+    if blacklist_index.contains(db, current_user.tenant_id, phone_number=visitor_in.phone_number):
          raise HTTPException(status_code=403, detail="This visitor is blacklisted.")
     
     # Ensure host belongs to same tenant if admin creates visitor for someone else
@@ -73,12 +85,7 @@ def create_visitor(
 
     # Dual Send Notification (SMS + WhatsApp)
     # In a real app, generate a proper QR code image URL here
-    access_message = (
-        f"Welcome to Gated Community! \n"
-        f"Host: {current_user.full_name}\n"
-        f"Access Code: {visitor.access_code}\n"
-        f"Valid Until: {visitor.valid_until or 'N/A'}"
-    )
+    access_message = access_code_message(current_user.full_name, visitor.access_code, visitor.valid_until)
 
     background_tasks.add_task(
         communication_service.send_sms, 
@@ -95,25 +102,163 @@ def create_visitor(
 
     return visitor
 
-@router.get("/me", response_model=List[schemas.Visitor])
-def read_my_visitors(
+def access_code_message(host_name: Optional[str], access_code: str, valid_until: Optional[datetime]) -> str:
+    return (
+        f"Welcome to Gated Community! \n"
+        f"Host: {host_name}\n"
+        f"Access Code: {access_code}\n"
+        f"Valid Until: {valid_until or 'N/A'}"
+    )
+
+def send_access_code_batch(messages: List[Tuple[str, str]]) -> None:
+    """Send a batch of (phone_number, message) pairs by SMS and WhatsApp."""
+    for phone_number, message in messages:
+        try:
+            communication_service.send_sms(phone_number, message)
+            communication_service.send_whatsapp(phone_number, message)
+        except Exception as e:
+            logger.warning(f"Failed to send access code to {phone_number}: {e}")
+
+def register_visitors_bulk(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    current_user: User,
+    background_tasks: BackgroundTasks,
+) -> schemas.VisitorBulkResult:
+    """
+    Validate every row, then create the valid ones together: hosts are resolved
+    with one query, phone numbers are matched against the tenant's blacklist
+    index, access codes are allocated in bulk and the visitors are inserted with one
+    multi-row statement. Access-code messages go out in background batches.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User is not assigned to a tenant")
+    if not rows:
+        raise HTTPException(status_code=400, detail="No visitors to register")
+    if len(rows) > settings.BULK_VISITOR_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_VISITOR_MAX_ROWS} visitors per import")
+
+    results = [schemas.VisitorBulkRowResult(row=i, status="rejected") for i in range(1, len(rows) + 1)]
+    items: Dict[int, schemas.VisitorBulkItem] = {}
+    for result, raw in zip(results, rows):
+        try:
+            item = schemas.VisitorBulkItem.model_validate(raw)
+        except ValidationError as e:
+            result.errors = [f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors()]
+            continue
+        if current_user.role == UserRole.RESIDENT or item.host_id is None:
+            item.host_id = current_user.id
+        items[result.row] = item
+
+    host_ids = {item.host_id for item in items.values()} | {current_user.id}
+    hosts = dict(db.execute(
+        select(User.id, User.full_name).where(User.id.in_(host_ids), User.tenant_id == current_user.tenant_id)
+    ).all())
+
+    seen: Dict[Tuple[Optional[str], int], int] = {}
+    valid: List[Tuple[schemas.VisitorBulkRowResult, schemas.VisitorCreate]] = []
+    for row, item in items.items():
+        result = results[row - 1]
+        if item.host_id not in hosts:
+            result.errors.append("Invalid host")
+        if blacklist_index.contains(db, current_user.tenant_id, phone_number=item.phone_number):
+            result.errors.append("This visitor is blacklisted.")
+        key = (normalize_phone(item.phone_number), item.host_id)
+        if key in seen:
+            result.errors.append(f"Duplicate of row {seen[key]}")
+        else:
+            seen[key] = row
+        if not result.errors:
+            valid.append((result, schemas.VisitorCreate(**item.model_dump())))
+
+    if valid:
+        access_codes = code_allocator.allocate(db, VISITOR_ACCESS_CODE, len(valid))
+        created = crud_visitor.create_visitors_bulk(
+            db, [visitor for _, visitor in valid], tenant_id=current_user.tenant_id, access_codes=access_codes
+        )
+        db.commit()
+
+        messages = []
+        for (result, visitor), row in zip(valid, created):
+            result.status = "created"
+            result.visitor_id = row.id
+            result.access_code = row.access_code
+            messages.append((visitor.phone_number, access_code_message(hosts[visitor.host_id], row.access_code, visitor.valid_until)))
+        batch_size = settings.BULK_VISITOR_MESSAGE_BATCH_SIZE
+        for start in range(0, len(messages), batch_size):
+            background_tasks.add_task(send_access_code_batch, messages[start:start + batch_size])
+
+    return schemas.VisitorBulkResult(
+        created=len(valid),
+        rejected=len(results) - len(valid),
+        results=results,
+    )
+
+@router.post("/bulk", response_model=schemas.VisitorBulkResult)
+def create_visitors_bulk(
+    visitors_in: schemas.VisitorBulkCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Pre-register many visitors at once from JSON.
+
+    Each entry takes the fields of a single visitor plus an optional host_id
+    (residents always host their own visitors). Valid rows are created even if
+    others are rejected; the response reports every row.
+    """
+    return register_visitors_bulk(db, visitors_in.visitors, current_user, background_tasks)
+
+@router.post("/bulk/csv", response_model=schemas.VisitorBulkResult)
+def create_visitors_bulk_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
     db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Pre-register many visitors at once from a CSV file.
+
+    The header row names the columns (full_name, phone_number, host_id, ...);
+    empty cells are left unset. Rows are numbered from 1 after the header.
+    """
+    try:
+        content = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames:
+        raise HTTPException(status_code=400, detail="CSV file has no header row")
+    rows = [
+        {key.strip(): value.strip() for key, value in record.items() if key and value and value.strip()}
+        for record in reader
+    ]
+    return register_visitors_bulk(db, rows, current_user, background_tasks)
+
+@router.get("/me", response_model=List[schemas.Visitor])
+async def read_my_visitors(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Get current user's visitors.
     """
-    return crud_visitor.get_visitors_by_host(db=db, host_id=current_user.id, skip=skip, limit=limit)
+    return deps.with_next_cursor(response, await crud_visitor_async.get_visitors_by_host(db=db, host_id=current_user.id, skip=skip, limit=limit, cursor=cursor))
 
 @router.get("/host/{host_id}", response_model=List[schemas.Visitor])
-def read_visitors_by_host(
+async def read_visitors_by_host(
+    response: Response,
     host_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Get visitors by host ID.
@@ -121,44 +266,71 @@ def read_visitors_by_host(
     if current_user.role == UserRole.RESIDENT and current_user.id != host_id:
         raise HTTPException(status_code=403, detail="Not authorized to view these visitors")
         
-    return crud_visitor.get_visitors_by_host(db=db, host_id=host_id, skip=skip, limit=limit)
+    return deps.with_next_cursor(response, await crud_visitor_async.get_visitors_by_host(db=db, host_id=host_id, skip=skip, limit=limit, cursor=cursor))
 
 @router.get("/code/{access_code}", response_model=schemas.Visitor)
-def get_visitor_by_code(
+async def get_visitor_by_code(
     access_code: str,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Get visitor by access code.
     """
-    visitor = crud_visitor.get_visitor_by_access_code(db=db, access_code=access_code)
+    visitor = await crud_visitor_async.get_visitor_by_access_code(db=db, access_code=access_code)
     if not visitor:
         raise HTTPException(status_code=404, detail="Visitor not found")
     return visitor
 
 @router.get("/{visitor_id}", response_model=schemas.Visitor)
-def read_visitor(
+async def read_visitor(
     visitor_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Get visitor by ID.
     """
-    visitor = crud_visitor.get_visitor(db=db, visitor_id=visitor_id)
+    visitor = await crud_visitor_async.get_visitor(db=db, visitor_id=visitor_id)
     if not visitor:
         raise HTTPException(status_code=404, detail="Visitor not found")
     if current_user.role == UserRole.RESIDENT and visitor.host_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     return visitor
 
+def visitor_event(event_type: str, visitor) -> dict:
+    return {
+        "type": event_type,
+        "visitor": {
+            "id": visitor.id,
+            "full_name": visitor.full_name,
+            "status": visitor.status,
+            "check_in_time": visitor.check_in_time,
+            "check_out_time": visitor.check_out_time,
+        }
+    }
+
+async def notify_host_of_arrival(host_id: int, visitor_name: str, check_in_time: datetime):
+    """Email the host that their visitor arrived. Runs after the response is sent."""
+    try:
+        async with AsyncSessionLocal() as db:
+            host_email = (await db.execute(select(User.email).where(User.id == host_id))).scalar()
+        if host_email:
+            await notification_service.send_email(
+                to_email=host_email,
+                subject="Visitor Arrival Notification",
+                body=f"Your visitor {visitor_name} has checked in at {check_in_time}."
+            )
+    except Exception as e:
+        logger.warning(f"Failed to send arrival notification to host {host_id}: {e}")
+
 @router.post("/{visitor_id}/check-in", response_model=schemas.Visitor)
 async def check_in_visitor(
     visitor_id: int,
+    background_tasks: BackgroundTasks,
     visitor_update_in: Optional[schemas.VisitorUpdate] = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async)
 ):
     """
     Check in a visitor. (Guard/Admin only)
@@ -166,56 +338,41 @@ async def check_in_visitor(
     if current_user.role not in [UserRole.ADMIN, UserRole.GUARD]:
         raise HTTPException(status_code=403, detail="Not authorized to check in visitors")
 
-    db_visitor = crud_visitor.get_visitor(db, visitor_id=visitor_id)
-    if db_visitor is None:
+    # Expiry and "already checked in" are checked by the update itself (400/409)
+    row = await crud_visitor_async.check_in_visitor(
+        db,
+        visitor_id=visitor_id,
+        tenant_id=current_user.tenant_id,
+        items_carried_in=visitor_update_in.items_carried_in if visitor_update_in else None,
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="Visitor not found")
-    
-    # Check blacklist before checking in
-    blacklist_entry = db.query(Blacklist).filter(
-        Blacklist.phone_number == db_visitor.phone_number
-    ).first()
-    
-    if blacklist_entry:
-         raise HTTPException(status_code=403, detail="This visitor is blacklisted and cannot be checked in.")
-    
-    # Check Expiry
-    if db_visitor.valid_until and db_visitor.valid_until < datetime.now(db_visitor.valid_until.tzinfo):
-        raise HTTPException(status_code=400, detail="Access code has expired")
 
-    if db_visitor.status == VisitorStatus.CHECKED_IN:
-        raise HTTPException(status_code=400, detail="Visitor already checked in")
-        
-    # Create update schema
-    visitor_update = schemas.VisitorUpdate(
-        status=VisitorStatus.CHECKED_IN,
-        check_in_time=datetime.now()
-    )
-    
-    if visitor_update_in and visitor_update_in.items_carried_in:
-        visitor_update.items_carried_in = visitor_update_in.items_carried_in
-    
-    updated_visitor = crud_visitor.update_visitor(db=db, db_visitor=db_visitor, visitor_update=visitor_update)
+    if await blacklist_index.contains_async(db, row.tenant_id, phone_number=row.phone_number):
+        await db.rollback()
+        raise HTTPException(status_code=403, detail="This visitor is blacklisted and cannot be checked in.")
+    await db.commit()
 
-    # Send Notification to Host
-    try:
-        host = crud_user.get(db, id=db_visitor.host_id)
-        if host and host.email:
-            await notification_service.send_email(
-                to_email=host.email,
-                subject="Visitor Arrival Notification",
-                body=f"Your visitor {updated_visitor.full_name} has checked in at {updated_visitor.check_in_time}."
-            )
-    except Exception as e:
-        print(f"Failed to send notification: {e}")
+    updated_visitor = schemas.Visitor.model_validate(row._mapping)
+    background_tasks.add_task(
+        manager.broadcast_to_topics,
+        message=visitor_event("visitor_checked_in", updated_visitor),
+        tenant_id=row.tenant_id,
+        topics=[f"visitor:{updated_visitor.id}", f"host:{updated_visitor.host_id}"]
+    )
 
+    background_tasks.add_task(
+        notify_host_of_arrival, updated_visitor.host_id, updated_visitor.full_name, updated_visitor.check_in_time
+    )
     return updated_visitor
 
 @router.post("/{visitor_id}/check-out", response_model=schemas.Visitor)
-def check_out_visitor(
+async def check_out_visitor(
     visitor_id: int,
+    background_tasks: BackgroundTasks,
     visitor_update_in: Optional[schemas.VisitorUpdate] = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async)
 ):
     """
     Check out a visitor. (Guard/Admin only)
@@ -223,22 +380,24 @@ def check_out_visitor(
     if current_user.role not in [UserRole.ADMIN, UserRole.GUARD]:
         raise HTTPException(status_code=403, detail="Not authorized to check out visitors")
 
-    db_visitor = crud_visitor.get_visitor(db, visitor_id=visitor_id)
-    if db_visitor is None:
+    row = await crud_visitor_async.check_out_visitor(
+        db,
+        visitor_id=visitor_id,
+        tenant_id=current_user.tenant_id,
+        items_carried_out=visitor_update_in.items_carried_out if visitor_update_in else None,
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="Visitor not found")
-        
-    if db_visitor.status == VisitorStatus.CHECKED_OUT:
-         raise HTTPException(status_code=400, detail="Visitor already checked out")
+    await db.commit()
 
-    visitor_update = schemas.VisitorUpdate(
-        status=VisitorStatus.CHECKED_OUT,
-        check_out_time=datetime.now()
+    updated_visitor = schemas.Visitor.model_validate(row._mapping)
+    background_tasks.add_task(
+        manager.broadcast_to_topics,
+        message=visitor_event("visitor_checked_out", updated_visitor),
+        tenant_id=row.tenant_id,
+        topics=[f"visitor:{updated_visitor.id}", f"host:{updated_visitor.host_id}"]
     )
-    
-    if visitor_update_in and visitor_update_in.items_carried_out:
-        visitor_update.items_carried_out = visitor_update_in.items_carried_out
-    
-    return crud_visitor.update_visitor(db=db, db_visitor=db_visitor, visitor_update=visitor_update)
+    return updated_visitor
 
 @router.put("/{visitor_id}", response_model=schemas.Visitor)
 def update_visitor(
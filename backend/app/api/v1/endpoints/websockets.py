@@ -1,74 +1,426 @@
-from typing import List, Dict
+import asyncio
+import json
+import logging
+import re
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from sqlalchemy import select
 from app.api import deps
-from app.models.all_models import User, UserRole
+from app.core.broadcast import BroadcastBackend, InMemoryBroadcast, create_broadcast_backend
+from app.core.config import settings
+from app.core.dashboard_deltas import DeltaCoalescer
+from app.crud import crud_tenant_counter
+from app.db.session import AsyncSessionLocal
+from app.models.all_models import Incident, User, UserRole, Visitor
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Bounds how many sockets authenticate and accept at once. After a Wi-Fi blip every
+# tablet reconnects together; queued handshakes wait here instead of competing with
+# in-flight HTTP requests for the event loop and the DB pool.
+handshake_slots = asyncio.Semaphore(settings.WS_MAX_CONCURRENT_HANDSHAKES)
+
+class Connection:
+    """One accepted socket with its own bounded send queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, user: User, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user.id
+        self.role = user.role
+        self.tenant_id = user.tenant_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set()
+        self.dropped = 0
+
+
+TOPIC_PATTERN = re.compile(r"^(visitor|incident|host|poll):\d+$")
+STAFF_ROLES = (UserRole.SUPER_ADMIN, UserRole.ADMIN, UserRole.GUARD)
+# kind -> (model, column naming the one non-staff user who may follow it)
+TOPIC_OWNERS = {"visitor": (Visitor, Visitor.host_id), "incident": (Incident, Incident.reporter_id)}
+
+
+async def allowed_topics(user_id: int, role: UserRole, tenant_id: int, topics: Iterable[str]) -> List[str]:
+    """
+    The requested topics this user may subscribe to. Staff may follow any topic
+    in their tenant; others get host:{user_id} for themselves, poll topics, and
+    visitor:{id} / incident:{id} only for visitors they host and incidents they
+    reported, checked with one query per kind.
+    """
+    valid = [topic for topic in dict.fromkeys(topics) if TOPIC_PATTERN.match(topic)]
+    valid = valid[:settings.WS_MAX_TOPICS_PER_CONNECTION]
+    if role in STAFF_ROLES:
+        return valid
+    requested: Dict[str, List[int]] = defaultdict(list)
+    for topic in valid:
+        kind, _, ident = topic.partition(":")
+        requested[kind].append(int(ident))
+    allowed = {f"host:{user_id}"} | {f"poll:{ident}" for ident in requested["poll"]}
+    owned = [(kind, requested[kind]) for kind in TOPIC_OWNERS if requested[kind]]
+    if owned:
+        async with AsyncSessionLocal() as db:
+            for kind, ids in owned:
+                model, owner = TOPIC_OWNERS[kind]
+                result = await db.execute(
+                    select(model.id).where(model.id.in_(ids), model.tenant_id == tenant_id, owner == user_id)
+                )
+                allowed.update(f"{kind}:{ident}" for ident in result.scalars())
+    return [topic for topic in valid if topic in allowed]
+
+
+class ReplayBuffer:
+    """
+    The last `size` sequenced envelopes of one tenant, in seq order, for clients
+    resuming with last_seq. Another worker's NOTIFY can overtake a local
+    delivery, so envelopes are inserted by seq; a seq that never arrived (the
+    listener reconnected) leaves a gap that cannot be replayed across.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries: "deque[dict]" = deque()
+
+    def append(self, envelope: dict):
+        seq = envelope["seq"]
+        index = len(self.entries)
+        while index and self.entries[index - 1]["seq"] > seq:
+            index -= 1
+        if index and self.entries[index - 1]["seq"] == seq:
+            return
+        self.entries.insert(index, envelope)
+        if len(self.entries) > self.size:
+            self.entries.popleft()
+
+    def since(self, last_seq: int) -> Optional[List[dict]]:
+        """Envelopes after last_seq, or None if some of them are not held."""
+        if not self.entries or last_seq + 1 < self.entries[0]["seq"] or last_seq > self.entries[-1]["seq"]:
+            return None
+        missed = [envelope for envelope in self.entries if envelope["seq"] > last_seq]
+        if any(envelope["seq"] != last_seq + offset for offset, envelope in enumerate(missed, start=1)):
+            return None
+        return missed
+
+
+# Frames a slow consumer must not lose to drop_oldest
+ALERT_TYPES = {"panic_alert"}
+
+
 class ConnectionManager:
-    def __init__(self):
-        # tenant_id -> list of (user_id, websocket)
-        self.active_connections: Dict[int, List[Dict]] = {}
+    def __init__(
+        self,
+        queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        slow_consumer_policy: str = settings.WS_SLOW_CONSUMER_POLICY,
+        backend: Optional[BroadcastBackend] = None,
+        replay_size: int = settings.WS_REPLAY_BUFFER_SIZE,
+    ):
+        # Relays broadcasts to the other workers; in-memory unless configured
+        self.backend = backend or InMemoryBroadcast()
+        self.backend.bind(self.deliver)
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        # tenant_id -> connections, (tenant_id, role) -> connections, user_id -> connections
+        self.by_tenant: Dict[int, Set[Connection]] = defaultdict(set)
+        self.by_role: Dict[Tuple[int, UserRole], Set[Connection]] = defaultdict(set)
+        self.by_user: Dict[int, Set[Connection]] = defaultdict(set)
+        # (tenant_id, topic) -> subscribed connections
+        self.by_topic: Dict[Tuple[int, str], Set[Connection]] = defaultdict(set)
+        self.by_socket: Dict[WebSocket, Connection] = {}
+        self.replay_size = replay_size
+        self.replay: Dict[int, ReplayBuffer] = {}
+        self.messages_dropped = 0
+        self.slow_disconnects = 0
+        # Close tasks for slow consumers, held until done so they aren't collected
+        self._closing: Set[asyncio.Task] = set()
 
-    async def connect(self, websocket: WebSocket, user: User):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user: User,
+        last_seq: Optional[int] = None,
+        topics: Iterable[str] = (),
+    ) -> Connection:
         await websocket.accept()
-        if user.tenant_id not in self.active_connections:
-            self.active_connections[user.tenant_id] = []
-        
-        self.active_connections[user.tenant_id].append({
-            "user_id": user.id,
-            "role": user.role,
-            "websocket": websocket
-        })
-        print(f"User {user.id} ({user.role}) connected to WS for Tenant {user.tenant_id}")
+        conn = Connection(websocket, user, self.queue_size)
+        # Register and replay without yielding, so nothing broadcast in between is lost
+        self.by_tenant[conn.tenant_id].add(conn)
+        self.by_role[(conn.tenant_id, conn.role)].add(conn)
+        self.by_user[conn.user_id].add(conn)
+        self.by_socket[websocket] = conn
+        self.subscribe(conn, topics)
+        if last_seq is not None:
+            self._replay(conn, last_seq)
+        conn.sender = asyncio.create_task(self._drain(conn))
+        logger.debug(f"User {user.id} ({user.role}) connected to WS for Tenant {user.tenant_id}")
+        return conn
+
+    def disconnect(self, websocket: WebSocket, user: Optional[User] = None):
+        conn = self.by_socket.pop(websocket, None)
+        if conn is None:
+            return
+        self._discard(self.by_tenant, conn.tenant_id, conn)
+        self._discard(self.by_role, (conn.tenant_id, conn.role), conn)
+        self._discard(self.by_user, conn.user_id, conn)
+        for topic in conn.topics:
+            self._discard(self.by_topic, (conn.tenant_id, topic), conn)
+        if conn.sender and conn.sender is not asyncio.current_task():
+            conn.sender.cancel()
+
+    def subscribe(self, conn: Connection, topics: Iterable[str]) -> List[str]:
+        """Subscribe to topics passed by `allowed_topics`, up to WS_MAX_TOPICS_PER_CONNECTION. Returns those added."""
+        added = []
+        for topic in topics:
+            if topic in conn.topics:
+                continue
+            if len(conn.topics) >= settings.WS_MAX_TOPICS_PER_CONNECTION:
+                break
+            conn.topics.add(topic)
+            self.by_topic[(conn.tenant_id, topic)].add(conn)
+            added.append(topic)
+        return added
+
+    def unsubscribe(self, conn: Connection, topics: Iterable[str]) -> List[str]:
+        removed = []
+        for topic in topics:
+            if topic in conn.topics:
+                conn.topics.discard(topic)
+                self._discard(self.by_topic, (conn.tenant_id, topic), conn)
+                removed.append(topic)
+        return removed
+
+    @staticmethod
+    def _discard(index: dict, key, conn: Connection):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.discard(conn)
+            if not bucket:
+                del index[key]
+
+    async def _drain(self, conn: Connection):
+        try:
+            while True:
+                data = await conn.queue.get()
+                await conn.websocket.send_text(data)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error sending to WS: {e}")
+            self.disconnect(conn.websocket)
 
-    def disconnect(self, websocket: WebSocket, user: User):
-        if user.tenant_id in self.active_connections:
-            self.active_connections[user.tenant_id] = [
-                conn for conn in self.active_connections[user.tenant_id] 
-                if conn["websocket"] != websocket
-            ]
+    def _enqueue(self, conn: Connection, data: str, alert: bool = False):
+        try:
+            conn.queue.put_nowait(data)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.slow_consumer_policy == "disconnect" or alert:
+            # Alerts are never dropped: the client reconnects with last_seq and
+            # gets them replayed, or a resync
+            self.slow_disconnects += 1
+            self.disconnect(conn.websocket)
+            task = asyncio.create_task(self._close(conn.websocket, code=4008))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+            return
+        # drop_oldest: the newest state is what the client needs most
+        conn.queue.get_nowait()
+        conn.queue.put_nowait(data)
+        conn.dropped += 1
+        self.messages_dropped += 1
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _fan_out(self, message: dict, targets: Iterable[Connection]):
+        # Serialise once; every sender task writes the same text frame
+        data = json.dumps(message, default=str)
+        alert = message.get("type") in ALERT_TYPES
+        for conn in list(targets):
+            self._enqueue(conn, data, alert)
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def deliver(self, envelope: dict):
+        """Fan an envelope out to the matching connections on this worker."""
+        tenant_id = envelope["tenant_id"]
+        if envelope.get("seq") is not None:
+            envelope["message"] = dict(envelope["message"], seq=envelope["seq"])
+            if tenant_id not in self.replay:
+                self.replay[tenant_id] = ReplayBuffer(self.replay_size)
+            self.replay[tenant_id].append(envelope)
+        scope = envelope["scope"]
+        if scope == "tenant":
+            self._fan_out(envelope["message"], self.by_tenant.get(tenant_id, ()))
+        elif scope == "role":
+            for role in envelope["roles"]:
+                self._fan_out(envelope["message"], self.by_role.get((tenant_id, UserRole(role)), ()))
+        elif scope == "user":
+            targets = [conn for conn in self.by_user.get(envelope["user_id"], ()) if conn.tenant_id == tenant_id]
+            self._fan_out(envelope["message"], targets)
+        elif scope == "topic":
+            # A connection subscribed to several of the topics gets the frame once
+            targets: Set[Connection] = set()
+            for topic in envelope["topics"]:
+                targets.update(self.by_topic.get((tenant_id, topic), ()))
+            self._fan_out(envelope["message"], targets)
+
+    @staticmethod
+    def _matches(envelope: dict, conn: Connection) -> bool:
+        scope = envelope["scope"]
+        if scope == "role":
+            return conn.role.value in envelope["roles"]
+        if scope == "user":
+            return conn.user_id == envelope["user_id"]
+        if scope == "topic":
+            return not conn.topics.isdisjoint(envelope["topics"])
+        return True
+
+    def _replay(self, conn: Connection, last_seq: int):
+        buffer = self.replay.get(conn.tenant_id)
+        missed = buffer.since(last_seq) if buffer else None
+        if missed is not None:
+            missed = [envelope["message"] for envelope in missed if self._matches(envelope, conn)]
+        if missed is None or len(missed) > self.queue_size:
+            # Gap is older than this worker's buffer: the client must refetch
+            latest = buffer.entries[-1]["seq"] if buffer else None
+            self._enqueue(conn, json.dumps({"type": "resync", "seq": latest}))
+            return
+        for message in missed:
+            self._enqueue(conn, json.dumps(message, default=str))
 
     async def broadcast_to_tenant(self, message: dict, tenant_id: int):
-        if tenant_id in self.active_connections:
-            for connection in self.active_connections[tenant_id]:
-                try:
-                    await connection["websocket"].send_json(message)
-                except Exception as e:
-                    print(f"Error sending to WS: {e}")
+        await self.backend.publish({"scope": "tenant", "tenant_id": tenant_id, "message": message})
 
     async def broadcast_to_role(self, message: dict, tenant_id: int, roles: List[UserRole]):
-        if tenant_id in self.active_connections:
-            for connection in self.active_connections[tenant_id]:
-                if connection["role"] in roles:
-                    try:
-                        await connection["websocket"].send_json(message)
-                    except Exception as e:
-                        print(f"Error sending to WS: {e}")
+        await self.backend.publish({
+            "scope": "role",
+            "tenant_id": tenant_id,
+            "roles": [UserRole(role).value for role in roles],
+            "message": message,
+        })
+
+    async def send_to_user(self, message: dict, tenant_id: int, user_id: int):
+        await self.backend.publish({"scope": "user", "tenant_id": tenant_id, "user_id": user_id, "message": message})
+
+    async def handle_frame(self, conn: Connection, data: str):
+        """Apply a subscribe/unsubscribe frame from the client and acknowledge it."""
+        try:
+            frame = json.loads(data)
+            action = frame.get("action")
+            requested = [str(topic) for topic in frame.get("topics", [])]
+        except (ValueError, AttributeError, TypeError):
+            # Plain keep-alive text and malformed frames are ignored
+            return
+        if action == "subscribe":
+            allowed = await allowed_topics(conn.user_id, conn.role, conn.tenant_id, requested)
+            added = self.subscribe(conn, allowed)
+            rejected = [topic for topic in requested if topic not in conn.topics]
+            self._enqueue(conn, json.dumps({"type": "subscribed", "topics": added, "rejected": rejected}))
+        elif action == "unsubscribe":
+            removed = self.unsubscribe(conn, requested)
+            self._enqueue(conn, json.dumps({"type": "unsubscribed", "topics": removed}))
+
+    async def broadcast_to_topics(self, message: dict, tenant_id: int, topics: List[str]):
+        """Send only to connections subscribed to at least one of `topics`."""
+        await self.backend.publish({"scope": "topic", "tenant_id": tenant_id, "topics": topics, "message": message})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": len(self.by_socket),
+            "tenants": len(self.by_tenant),
+            "topics": len(self.by_topic),
+            "queued": sum(conn.queue.qsize() for conn in self.by_socket.values()),
+            "messages_dropped": self.messages_dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "backend": self.backend.stats(),
+        }
 
-manager = ConnectionManager()
+manager = ConnectionManager(backend=create_broadcast_backend())
+
+# Tenants whose counters changed (committed writes or reconcile corrections) get
+# their admin dashboards refreshed once per window. Frames carry absolute counts,
+# so a frame lost to drop_oldest is made good by the next one.
+dashboard_deltas = DeltaCoalescer(settings.WS_DASHBOARD_DELTA_WINDOW_MS / 1000)
+crud_tenant_counter.on_commit(dashboard_deltas.add)
+
+async def publish_dashboard_counts(tenant_ids: List[int]):
+    async with AsyncSessionLocal() as db:
+        counters = await crud_tenant_counter.get_counters_async(db, tenant_ids)
+    for counter in counters:
+        await manager.broadcast_to_role(
+            message={
+                "type": "dashboard_counts",
+                "counts": crud_tenant_counter.as_dashboard(crud_tenant_counter.counter_values(counter)),
+            },
+            tenant_id=counter.tenant_id,
+            roles=[UserRole.ADMIN]
+        )
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, token: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: str,
+    last_seq: Optional[int] = None,
+    topics: Optional[str] = None,
+):
+    """
+    Realtime events for the caller's tenant. Broadcasts carry a per-tenant `seq`;
+    reconnect with `last_seq` to receive what was missed, or a `resync` frame
+    when the gap can no longer be replayed and state must be refetched.
+
+    Topic events (`visitor:{id}`, `incident:{id}`, `host:{user_id}`, `poll:{id}`)
+    only reach subscribers. Residents may follow their own visitors, incidents
+    and host topic; staff may follow any. Pass `topics` as a comma-separated list to subscribe
+    before the replay, or send `{"action": "subscribe" | "unsubscribe", "topics": [...]}`.
+    """
     try:
-        # Validate token
-        user = await deps.get_current_user_ws(token)
-        if not user:
-            await websocket.close(code=4003)
+        try:
+            await asyncio.wait_for(
+                handshake_slots.acquire(), timeout=settings.WS_HANDSHAKE_QUEUE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            # 1013 Try Again Later: clients back off with jitter and reconnect. The
+            # close code only reaches the client on an accepted socket; closing
+            # before accept() would answer the handshake with HTTP 403.
+            await websocket.accept()
+            await websocket.close(code=1013)
             return
 
-        await manager.connect(websocket, user)
+        try:
+            # Validate token (principal cache, or one async query per user)
+            user = await deps.get_current_user_ws(token)
+            if not user:
+                await websocket.close(code=4003)
+                return
+
+            initial_topics = [t.strip() for t in topics.split(",") if t.strip()] if topics else []
+            if initial_topics:
+                initial_topics = await allowed_topics(user.id, user.role, user.tenant_id, initial_topics)
+            conn = await manager.connect(websocket, user, last_seq=last_seq, topics=initial_topics)
+        finally:
+            handshake_slots.release()
         
         try:
             while True:
-                # Keep connection alive
                 data = await websocket.receive_text()
-                # We can handle client messages here if needed (e.g., ping/pong)
+                await manager.handle_frame(conn, data)
         except WebSocketDisconnect:
+            pass
+        finally:
             manager.disconnect(websocket, user)
             
     except Exception as e:
-        print(f"WebSocket Error: {e}")
+        logger.warning(f"WebSocket Error: {e}")
         try:
             await websocket.close()
         except:
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+
+
+class TenantResultCache:
+    """
+    Per-process LRU cache of computed reports keyed by (tenant id, parameters).
+
+    Entries live for FINANCIAL_ANALYTICS_CACHE_TTL_SECONDS, so changes made by
+    another worker show up within one TTL. Writes in this process that change a
+    tenant's figures (payment verification, new bills) invalidate its entries.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self._cache = TTLCache(ttl_seconds, max_size)
+
+    def get(self, tenant_id: int, key: Hashable) -> Optional[Any]:
+        return self._cache.get((tenant_id, key))
+
+    def put(self, tenant_id: int, key: Hashable, value: Any) -> Any:
+        return self._cache.put((tenant_id, key), value)
+
+    def invalidate_tenant(self, tenant_id: int) -> None:
+        self._cache.invalidate_where(lambda entry_key, _: entry_key[0] == tenant_id)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+financial_analytics_cache = TenantResultCache(
+    ttl_seconds=settings.FINANCIAL_ANALYTICS_CACHE_TTL_SECONDS,
+    max_size=settings.FINANCIAL_ANALYTICS_CACHE_MAX_SIZE,
+)
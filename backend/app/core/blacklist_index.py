@@ -0,0 +1,151 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.models.all_models import Blacklist
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]")
+
+
+def normalize_phone(
+    phone: Optional[str],
+    country_code: str = settings.DEFAULT_PHONE_COUNTRY_CODE,
+    national_length: int = settings.PHONE_NATIONAL_NUMBER_LENGTH,
+) -> Optional[str]:
+    """
+    Reduce a phone number to international digits, so "+263 77 123 4567",
+    "00263771234567", "077-123-4567" and "771234567" all become "263771234567".
+    Other numbers without a prefix are taken to be international already.
+    """
+    if not phone:
+        return None
+    international = phone.strip().startswith("+")
+    digits = _NON_DIGITS.sub("", phone)
+    if not digits:
+        return None
+    if international:
+        return digits
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0"):
+        return country_code + digits[1:]
+    if len(digits) == national_length:
+        return country_code + digits
+    return digits
+
+
+def normalize_id_number(id_number: Optional[str]) -> Optional[str]:
+    """Uppercase alphanumerics only: "63-123456 a 42" -> "63123456A42"."""
+    if not id_number:
+        return None
+    return _NON_ALNUM.sub("", id_number).upper() or None
+
+
+@dataclass
+class TenantBlacklist:
+    phones: FrozenSet[str]
+    id_numbers: FrozenSet[str]
+
+
+class BlacklistIndex:
+    """
+    Per-process index of each tenant's blacklisted phone and ID numbers, normalized.
+
+    A tenant's entries are loaded with one query on its first check and then
+    answered from memory. crud_blacklist invalidates a tenant when it changes;
+    other workers pick the change up within BLACKLIST_INDEX_TTL_SECONDS.
+    """
+
+    def __init__(self, ttl_seconds: int, max_tenants: int):
+        self._cache = TTLCache(ttl_seconds, max_tenants)
+        # Bumped on invalidation so a load that raced with a change is discarded
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _get(self, tenant_id: int) -> Tuple[Optional[TenantBlacklist], int]:
+        with self._lock:
+            generation = self._generations.get(tenant_id, 0)
+        return self._cache.get(tenant_id), generation
+
+    def _put(self, tenant_id: int, generation: int, rows: Iterable[Tuple[Optional[str], Optional[str]]]) -> TenantBlacklist:
+        rows = list(rows)
+        entry = TenantBlacklist(
+            phones=frozenset(p for p in (normalize_phone(phone) for phone, _ in rows) if p),
+            id_numbers=frozenset(i for i in (normalize_id_number(id_number) for _, id_number in rows) if i),
+        )
+        with self._lock:
+            self.loads += 1
+            if self._generations.get(tenant_id, 0) == generation:
+                self._cache.put(tenant_id, entry)
+        return entry
+
+    @staticmethod
+    def _query(tenant_id: int):
+        return select(Blacklist.phone_number, Blacklist.id_number).where(Blacklist.tenant_id == tenant_id)
+
+    def _entry(self, db: Session, tenant_id: int) -> TenantBlacklist:
+        entry, generation = self._get(tenant_id)
+        if entry is None:
+            entry = self._put(tenant_id, generation, db.execute(self._query(tenant_id)).all())
+        return entry
+
+    async def _entry_async(self, db: AsyncSession, tenant_id: int) -> TenantBlacklist:
+        entry, generation = self._get(tenant_id)
+        if entry is None:
+            entry = self._put(tenant_id, generation, (await db.execute(self._query(tenant_id))).all())
+        return entry
+
+    @staticmethod
+    def _matches(entry: TenantBlacklist, phone_number: Optional[str], id_number: Optional[str]) -> bool:
+        phone = normalize_phone(phone_number)
+        id_norm = normalize_id_number(id_number)
+        return (phone is not None and phone in entry.phones) or (id_norm is not None and id_norm in entry.id_numbers)
+
+    def contains(
+        self, db: Session, tenant_id: int, phone_number: Optional[str] = None, id_number: Optional[str] = None
+    ) -> bool:
+        return self._matches(self._entry(db, tenant_id), phone_number, id_number)
+
+    async def contains_async(
+        self, db: AsyncSession, tenant_id: int, phone_number: Optional[str] = None, id_number: Optional[str] = None
+    ) -> bool:
+        return self._matches(await self._entry_async(db, tenant_id), phone_number, id_number)
+
+    def invalidate(self, tenant_id: int) -> None:
+        with self._lock:
+            self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+            self._cache.invalidate(tenant_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            for tenant_id in self._cache.keys():
+                self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._cache.stats()
+        with self._lock:
+            loads = self.loads
+        return {
+            "tenants": stats["size"],
+            "max_tenants": stats["max_size"],
+            "ttl_seconds": stats["ttl_seconds"],
+            "hits": stats["hits"],
+            "loads": loads,
+            "invalidations": stats["invalidations"],
+        }
+
+
+blacklist_index = BlacklistIndex(
+    ttl_seconds=settings.BLACKLIST_INDEX_TTL_SECONDS,
+    max_tenants=settings.BLACKLIST_INDEX_MAX_TENANTS,
+)
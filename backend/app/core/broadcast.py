@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+SEQ_DIGITS = 19
+
+
+class BroadcastBackend:
+    """
+    Carries WebSocket broadcast envelopes to every worker process.
+    The bound handler is called with each envelope in every worker that receives it.
+    Envelopes are stamped with `seq`, increasing per tenant, before delivery.
+    """
+
+    _handler: Optional[Handler] = None
+
+    def bind(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def start(self) -> None:
+        pass
+
+    async def publish(self, envelope: dict) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryBroadcast(BroadcastBackend):
+    """Single-worker default: deliver straight to the local ConnectionManager."""
+
+    def __init__(self):
+        self._seq: Dict[int, int] = defaultdict(int)
+
+    async def publish(self, envelope: dict) -> None:
+        self._seq[envelope["tenant_id"]] += 1
+        envelope["seq"] = self._seq[envelope["tenant_id"]]
+        self._handler(envelope)
+
+
+class PostgresBroadcast(BroadcastBackend):
+    """
+    Relays envelopes between workers with Postgres LISTEN/NOTIFY.
+
+    Sequence numbers come from ws_tenant_sequences; the row lock is held until the
+    NOTIFY commits, so every worker receives a tenant's envelopes in seq order.
+    The publishing worker delivers locally once the NOTIFY is committed and tags
+    the notification with its origin id, so it ignores its own echo. Its own
+    publishes for a tenant go one at a time (they would queue on the row lock
+    anyway), so they are delivered locally in seq order too. Envelopes too large
+    for NOTIFY are delivered locally without a seq, leaving no gap.
+
+    LISTEN needs a session-level connection: point WS_BROADCAST_DATABASE_URL at
+    Postgres directly when the application goes through a transaction-pooling
+    PgBouncer.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        publish: Callable[[str, int, Callable[[int], str]], Awaitable[int]],
+        reconnect_delay: float = 1.0,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._publish = publish
+        self._reconnect_delay = reconnect_delay
+        self._listener: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._tenant_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.published = 0
+        self.received = 0
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+        await self._ready.wait()
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+
+    async def publish(self, envelope: dict) -> None:
+        def payload_for(seq: int) -> str:
+            return json.dumps({"origin": self.origin, "envelope": dict(envelope, seq=seq)}, default=str)
+
+        # Sized before a seq is taken; SEQ_DIGITS leaves room for the real number
+        size = len(payload_for(0).encode()) + SEQ_DIGITS
+        if size > MAX_NOTIFY_PAYLOAD:
+            logger.error(f"Broadcast of {size} bytes is too large for NOTIFY; delivered locally only")
+            self._handler(envelope)
+            return
+
+        async with self._tenant_locks[envelope["tenant_id"]]:
+            try:
+                envelope["seq"] = await self._publish(self.channel, envelope["tenant_id"], payload_for)
+                self.published += 1
+            except Exception as e:
+                # Local clients still get it, unsequenced; don't fail the request that broadcast
+                logger.error(f"Broadcast NOTIFY failed: {e}")
+            self._handler(envelope)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        data = json.loads(payload)
+        if data["origin"] == self.origin:
+            return
+        self.received += 1
+        self._handler(data["envelope"])
+
+    async def _listen(self):
+        import asyncpg
+
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self._ready.set()
+                await lost.wait()
+                logger.warning("Broadcast listener connection lost; reconnecting")
+            except asyncio.CancelledError:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+                raise
+            except Exception as e:
+                logger.warning(f"Broadcast listener error: {e}")
+                # Don't hold up startup while the database is unreachable
+                self._ready.set()
+            await asyncio.sleep(self._reconnect_delay)
+
+    def stats(self) -> dict:
+        return {"published": self.published, "received": self.received}
+
+
+def _listen_dsn() -> str:
+    url = make_url(settings.WS_BROADCAST_DATABASE_URL or settings.DATABASE_URL)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+NEXT_SEQ = text(
+    "INSERT INTO ws_tenant_sequences (tenant_id, last_seq) VALUES (:tenant_id, 1) "
+    "ON CONFLICT (tenant_id) DO UPDATE SET last_seq = ws_tenant_sequences.last_seq + 1 "
+    "RETURNING last_seq"
+)
+
+
+async def _notify_via_engine(channel: str, tenant_id: int, payload_for: Callable[[int], str]) -> int:
+    from app.db.session import async_engine
+
+    async with async_engine.connect() as conn:
+        seq = (await conn.execute(NEXT_SEQ, {"tenant_id": tenant_id})).scalar_one()
+        await conn.execute(
+            text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload_for(seq)}
+        )
+        await conn.commit()
+    return seq
+
+
+def create_broadcast_backend() -> BroadcastBackend:
+    if settings.WS_BROADCAST_BACKEND == "postgres":
+        return PostgresBroadcast(_listen_dsn(), settings.WS_BROADCAST_CHANNEL, _notify_via_engine)
+    return InMemoryBroadcast()
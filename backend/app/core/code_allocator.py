@@ -0,0 +1,159 @@
+import hashlib
+import hmac
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.all_models import (
+    Parcel, Staff, Visitor, parcel_pickup_code_seq, staff_access_code_seq, visitor_access_code_seq,
+)
+
+ROUNDS = 8
+
+
+class CodeSpaceExhausted(RuntimeError):
+    """A code space's sequence has passed its size; answered with a 503."""
+
+
+@dataclass(frozen=True)
+class CodeSpace:
+    name: str
+    column: Any
+    sequence: Any
+    alphabet: str
+    length: int
+
+    @property
+    def size(self) -> int:
+        return len(self.alphabet) ** self.length
+
+
+# Each sequence is shared by every tenant, so a space must outlast the whole
+# deployment's volume: 16^8 visitor codes, 10^8 staff and parcel codes
+VISITOR_ACCESS_CODE = CodeSpace("visitor_access_code", Visitor.access_code, visitor_access_code_seq, "0123456789ABCDEF", 8)
+STAFF_ACCESS_CODE = CodeSpace("staff_access_code", Staff.access_code, staff_access_code_seq, "0123456789", 8)
+PARCEL_PICKUP_CODE = CodeSpace("parcel_pickup_code", Parcel.pickup_code, parcel_pickup_code_seq, "0123456789", 8)
+
+
+def permute(space: CodeSpace, index: int, key: bytes) -> str:
+    """
+    Map index (0 <= index < space.size) to a code with a keyed Feistel network
+    over the code's two halves. It is a bijection, so distinct indexes give
+    distinct codes, and without the key consecutive indexes look unrelated.
+    """
+    if not 0 <= index < space.size:
+        raise CodeSpaceExhausted(f"{space.name} has no codes left")
+    base = len(space.alphabet)
+    left_size = base ** (space.length // 2)
+    right_size = base ** (space.length - space.length // 2)
+    left, right = divmod(index, right_size)
+    for round_ in range(ROUNDS):
+        source, modulus = (right, left_size) if round_ % 2 == 0 else (left, right_size)
+        digest = hmac.new(key, f"{space.name}:{round_}:{source}".encode(), hashlib.sha256).digest()
+        mixed = int.from_bytes(digest[:8], "big") % modulus
+        if round_ % 2 == 0:
+            left = (left + mixed) % left_size
+        else:
+            right = (right + mixed) % right_size
+    value = left * right_size + right
+    chars = []
+    for _ in range(space.length):
+        value, digit = divmod(value, base)
+        chars.append(space.alphabet[digit])
+    return "".join(reversed(chars))
+
+
+class CodeAllocator:
+    """
+    Hands out unique, non-guessable codes without a lookup per attempt.
+
+    Each code space has a Postgres sequence; its values are permuted with a
+    secret key into codes, which are distinct by construction. Every process
+    reserves sequence values in blocks (one query fills CODE_ALLOCATOR_BLOCK_SIZE
+    codes, or a whole bulk request) and serves allocations from memory. A block
+    is also checked once against the table, so codes issued before the allocator
+    or under another key are skipped instead of colliding.
+    """
+
+    def __init__(self, key: str, block_size: int):
+        self.key = key.encode()
+        self.block_size = block_size
+        self._pools: Dict[str, Deque[str]] = {}
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.refills = 0
+        self.skipped = 0
+
+    def _take(self, space: CodeSpace, count: int) -> List[str]:
+        with self._lock:
+            pool = self._pools.setdefault(space.name, deque())
+            taken = [pool.popleft() for _ in range(min(count, len(pool)))]
+            self.allocated += len(taken)
+            return taken
+
+    def _give(self, space: CodeSpace, codes: List[str]) -> None:
+        with self._lock:
+            self._pools.setdefault(space.name, deque()).extend(codes)
+
+    @staticmethod
+    def _reserve_query(space: CodeSpace, count: int):
+        return select(space.sequence.next_value()).select_from(func.generate_series(1, count))
+
+    @staticmethod
+    def _in_use_query(space: CodeSpace, codes: List[str]):
+        return select(space.column).where(space.column.in_(codes))
+
+    def _block(self, space: CodeSpace, values: List[int]) -> List[str]:
+        return [permute(space, value - 1, self.key) for value in values]
+
+    def _refill_done(self, space: CodeSpace, codes: List[str], in_use: set) -> None:
+        fresh = [code for code in codes if code not in in_use]
+        with self._lock:
+            self.refills += 1
+            self.skipped += len(codes) - len(fresh)
+        self._give(space, fresh)
+
+    def allocate(self, db: Session, space: CodeSpace, count: int = 1) -> List[str]:
+        codes = self._take(space, count)
+        while len(codes) < count:
+            values = db.execute(self._reserve_query(space, max(count - len(codes), self.block_size))).scalars().all()
+            block = self._block(space, values)
+            in_use = set(db.execute(self._in_use_query(space, block)).scalars())
+            self._refill_done(space, block, in_use)
+            codes += self._take(space, count - len(codes))
+        return codes
+
+    async def allocate_async(self, db: AsyncSession, space: CodeSpace, count: int = 1) -> List[str]:
+        codes = self._take(space, count)
+        while len(codes) < count:
+            values = (await db.execute(self._reserve_query(space, max(count - len(codes), self.block_size)))).scalars().all()
+            block = self._block(space, values)
+            in_use = set((await db.execute(self._in_use_query(space, block))).scalars())
+            self._refill_done(space, block, in_use)
+            codes += self._take(space, count - len(codes))
+        return codes
+
+    def allocate_one(self, db: Session, space: CodeSpace) -> str:
+        return self.allocate(db, space, 1)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pooled": {name: len(pool) for name, pool in self._pools.items()},
+                "block_size": self.block_size,
+                "allocated": self.allocated,
+                "refills": self.refills,
+                "skipped": self.skipped,
+            }
+
+
+code_allocator = CodeAllocator(
+    key=settings.CODE_ALLOCATOR_KEY or settings.SECRET_KEY,
+    block_size=settings.CODE_ALLOCATOR_BLOCK_SIZE,
+)
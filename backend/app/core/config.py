@@ -34,17 +34,108 @@ class Settings(BaseSettings):
             f"{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
         )
 
+    # Async engine (asyncpg). Derived from DATABASE_URL unless set explicitly.
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    @validator("ASYNC_DATABASE_URL", pre=True)
+    def assemble_async_db_connection(cls, v: Optional[str], values: dict) -> str:
+        if isinstance(v, str):
+            return v
+        url = values.get("DATABASE_URL")
+        scheme, _, rest = url.partition("://")
+        if scheme.startswith("postgresql"):
+            return f"postgresql+asyncpg://{rest}"
+        return url
+
+    # Connection pooling (applies to both engines, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+    # Transaction-pooling PgBouncer in front of Postgres: no server-side prepared
+    # statements, and NullPool so PgBouncer is the only pool.
+    DB_PGBOUNCER_MODE: bool = False
+
     # JWT
     SECRET_KEY: str = "changelethis"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
 
+    # Authenticated principal cache (per process)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Blacklist index (per process): tenants' normalized phone and ID numbers
+    BLACKLIST_INDEX_TTL_SECONDS: int = 60
+    BLACKLIST_INDEX_MAX_TENANTS: int = 1000
+    # Country code assumed for local numbers ("077..." and "77..." -> "26377...")
+    DEFAULT_PHONE_COUNTRY_CODE: str = "263"
+    PHONE_NATIONAL_NUMBER_LENGTH: int = 9  # digits after the trunk 0 of a local number
+
+    # Visitor, staff and parcel code allocation; the key defaults to SECRET_KEY
+    CODE_ALLOCATOR_KEY: Optional[str] = None
+    CODE_ALLOCATOR_BLOCK_SIZE: int = 100  # sequence values reserved per refill, per process
+
+    # Bulk visitor pre-registration
+    BULK_VISITOR_MAX_ROWS: int = 1000
+    BULK_VISITOR_MESSAGE_BATCH_SIZE: int = 50  # access-code messages per background task
+
+    # WebSockets
+    WS_MAX_CONCURRENT_HANDSHAKES: int = 50
+    WS_HANDSHAKE_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    WS_SEND_QUEUE_SIZE: int = 100  # pending messages per connection
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # or "disconnect" (closes with 4008)
+    # "memory" for a single worker; "postgres" relays broadcasts between workers
+    # with LISTEN/NOTIFY. LISTEN needs a direct (non-PgBouncer) connection.
+    WS_BROADCAST_BACKEND: str = "memory"
+    WS_BROADCAST_CHANNEL: str = "ws_broadcast"
+    WS_BROADCAST_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL
+    WS_REPLAY_BUFFER_SIZE: int = 256  # broadcasts kept per tenant for last_seq resume
+    WS_MAX_TOPICS_PER_CONNECTION: int = 100
+    WS_DASHBOARD_DELTA_WINDOW_MS: int = 500  # coalescing window for dashboard_counts frames
+
+    # Idempotency-Key replay for POST/PATCH (per user)
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LEASE_SECONDS: int = 60  # renewed while a request runs; an abandoned key can be reclaimed after this
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1_000_000  # larger responses are not stored
+
+    # Bill generation
+    BILLING_NOTIFICATION_BATCH_SIZE: int = 100  # emails sent between progress updates
+
+    # Bank-statement payment import
+    BANK_IMPORT_MAX_ROWS: int = 5000
+
+    # Financial analytics (per-process result cache)
+    FINANCIAL_ANALYTICS_CACHE_TTL_SECONDS: int = 60
+    FINANCIAL_ANALYTICS_CACHE_MAX_SIZE: int = 1000
+
+    # Late-fee accrual
+    LATE_FEE_CHUNK_SIZE: int = 500  # residents charged per transaction
+    LATE_FEE_DUE_DAYS: int = 14  # late-fee bills are due this many days after they are charged
+
+    # Invoice and receipt PDFs
+    PDF_RENDER_WORKERS: int = 2  # rendering processes
+    PDF_RENDER_MAX_PENDING: int = 32  # request renders queued on the pool at once
+    INVOICE_RENDER_CHUNK_SIZE: int = 200  # bills rendered per batch by the month-end job
+
+    # Resident statements
+    STATEMENT_STREAM_BATCH_SIZE: int = 1000  # ledger rows fetched from the cursor at a time
+
+    # Background jobs (seconds between runs; 0 disables)
+    COUNTER_RECONCILE_INTERVAL_SECONDS: int = 3600
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 3600
+    BILLING_RUN_INTERVAL_SECONDS: int = 0  # e.g. 86400 bills each tenant once at the start of every month
+    LATE_FEE_INTERVAL_SECONDS: int = 86400  # idempotent per month; only tenants with a late fee are charged
+    INVOICE_RENDER_INTERVAL_SECONDS: int = 0  # e.g. 86400 pre-renders the current month's invoices nightly
+
     # Minio Storage
     MINIO_ENDPOINT: str = "minio:9000"  # Internal endpoint (backend -> minio)
     MINIO_PUBLIC_ENDPOINT: str = "localhost:9000"  # Public endpoint (browser -> minio)
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET_UPLOADS: str = "uploads"
+    MINIO_BUCKET_DOCUMENTS: str = "documents"  # private: invoices and receipts, served only via the API
     MINIO_SECURE: bool = False
 
     class Config:
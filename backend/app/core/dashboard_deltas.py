@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+Deltas = Dict[int, Dict[str, int]]
+
+
+class DeltaCoalescer:
+    """
+    Sums per-tenant counter deltas from committing threads and, at most once per
+    window, hands `publish` the tenants whose counters changed, so a burst of
+    check-ins becomes one frame per tenant.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._pending: Deltas = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def add(self, deltas: Deltas) -> None:
+        # Called from after_commit, possibly in a threadpool worker
+        with self._lock:
+            for tenant_id, changes in deltas.items():
+                for name, delta in changes.items():
+                    self._pending[tenant_id][name] += delta
+
+    def drain(self) -> Deltas:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        # Drop counters whose changes cancelled out within the window
+        drained = {}
+        for tenant_id, changes in pending.items():
+            nonzero = {name: delta for name, delta in changes.items() if delta}
+            if nonzero:
+                drained[tenant_id] = nonzero
+        return drained
+
+    async def run(self, publish: Callable[[List[int]], Awaitable[None]]) -> None:
+        while True:
+            await asyncio.sleep(self.window_seconds)
+            changed = sorted(self.drain())
+            if not changed:
+                continue
+            try:
+                await publish(changed)
+                self.published += len(changed)
+            except Exception as e:
+                logger.warning(f"Dashboard counts publish failed: {e}")
@@ -0,0 +1,200 @@
+import asyncio
+import enum
+import hashlib
+import hmac
+import io
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core import pdf
+from app.core.config import settings
+from app.core.storage import storage
+from app.models.all_models import Bill, Payment, Tenant, User
+
+INVOICE = "invoice"
+RECEIPT = "receipt"
+RENDERERS = {INVOICE: pdf.render_invoice, RECEIPT: pdf.render_receipt}
+CONTENT_TYPE = "application/pdf"
+
+
+def invoice_query():
+    return (
+        select(
+            Bill.id, Bill.tenant_id, Bill.resident_id, Bill.description, Bill.amount, Bill.paid_total,
+            Bill.outstanding, Bill.status, Bill.due_date, Bill.created_at,
+            User.full_name.label("resident_name"), User.house_address, Tenant.name.label("tenant_name"),
+        )
+        .join(User, User.id == Bill.resident_id)
+        .outerjoin(Tenant, Tenant.id == Bill.tenant_id)
+    )
+
+
+def receipt_query():
+    return (
+        select(
+            Payment.id, Payment.tenant_id, Payment.user_id, Payment.amount, Payment.method, Payment.reference,
+            Payment.status, Payment.created_at, Payment.bill_id,
+            Bill.description.label("bill_description"), Bill.outstanding.label("bill_outstanding"),
+            User.full_name.label("resident_name"), Tenant.name.label("tenant_name"),
+        )
+        .outerjoin(Bill, Bill.id == Payment.bill_id)
+        .join(User, User.id == Payment.user_id)
+        .outerjoin(Tenant, Tenant.id == Payment.tenant_id)
+    )
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def document_state(row) -> Dict[str, Any]:
+    """Everything a document shows, as JSON-safe values; also the cache key input."""
+    return {name: _plain(value) for name, value in row._mapping.items()}
+
+
+def document_key(kind: str, state: Dict[str, Any]) -> str:
+    """
+    Keyed hash of the document's content. Equal state maps to the same stored
+    PDF, and any change (a payment settling the bill) to a new one.
+    """
+    payload = json.dumps([kind, pdf.RENDER_VERSION, state], sort_keys=True, default=str).encode()
+    return hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).hexdigest()
+
+
+def object_name(kind: str, key: str) -> str:
+    """Name in the private documents bucket; the PDFs carry names and addresses."""
+    return f"{kind}s/{key}.pdf"
+
+
+def _stored(name: str) -> Optional[bytes]:
+    return storage.get_file(name, bucket=storage.documents_bucket)
+
+
+def _exists(name: str) -> bool:
+    return storage.file_exists(name, bucket=storage.documents_bucket)
+
+
+def _store(name: str, content: bytes) -> None:
+    storage.upload_file(io.BytesIO(content), name, CONTENT_TYPE, bucket=storage.documents_bucket)
+
+
+class DocumentRenderer:
+    """
+    Renders invoices and receipts in a bounded process pool and caches them in
+    the private documents bucket under their content key.
+
+    Rendering is CPU work, so it runs in PDF_RENDER_WORKERS spawned processes,
+    never on the event loop or the threadpool shared by sync endpoints. At most
+    PDF_RENDER_MAX_PENDING renders wait on the pool at once; further ones wait
+    their turn. Batches on the event loop take those slots too, PDF_RENDER_WORKERS
+    at a time, so request renders still get a slot while a period renders. A
+    document whose key is already stored is served from storage without rendering.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.rendered = 0
+        self.cache_hits = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _count(self, rendered: int = 0, cache_hits: int = 0) -> None:
+        with self._lock:
+            self.rendered += rendered
+            self.cache_hits += cache_hits
+
+    async def _render_in_pool(self, kind: str, state: Dict[str, Any]) -> bytes:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), RENDERERS[kind], state)
+
+    async def render(self, kind: str, state: Dict[str, Any], key: Optional[str] = None) -> bytes:
+        """The document's PDF, from storage or freshly rendered and stored."""
+        name = object_name(kind, key or document_key(kind, state))
+        cached = await run_in_threadpool(_stored, name)
+        if cached is not None:
+            self._count(cache_hits=1)
+            return cached
+        content = await self._render_in_pool(kind, state)
+        await run_in_threadpool(_store, name, content)
+        self._count(rendered=1)
+        return content
+
+    def _missing(self, kind: str, states: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        names = [object_name(kind, document_key(kind, state)) for state in states]
+        missing = [(name, state) for name, state in zip(names, states) if not _exists(name)]
+        self._count(cache_hits=len(states) - len(missing))
+        return missing
+
+    @staticmethod
+    def _store_all(missing: List[Tuple[str, Dict[str, Any]]], contents: Iterable[bytes]) -> None:
+        for (name, _), content in zip(missing, contents):
+            _store(name, content)
+
+    def render_many(self, kind: str, states: List[Dict[str, Any]]) -> int:
+        """Render and store the documents not stored yet, blocking; returns how many were rendered."""
+        missing = self._missing(kind, states)
+        if not missing:
+            return 0
+        self._store_all(missing, self._pool().map(RENDERERS[kind], [state for _, state in missing], chunksize=8))
+        self._count(rendered=len(missing))
+        return len(missing)
+
+    async def render_many_async(self, kind: str, states: List[Dict[str, Any]]) -> int:
+        """`render_many` for the event loop: storage calls go to the threadpool, renders are awaited."""
+        missing = await run_in_threadpool(self._missing, kind, states)
+        if not missing:
+            return 0
+        batch = asyncio.Semaphore(self.workers)
+
+        async def render_one(state: Dict[str, Any]) -> bytes:
+            async with batch:
+                return await self._render_in_pool(kind, state)
+
+        contents = await asyncio.gather(*(render_one(state) for _, state in missing))
+        await run_in_threadpool(self._store_all, missing, contents)
+        self._count(rendered=len(missing))
+        return len(missing)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "started": self._executor is not None,
+                "rendered": self.rendered,
+                "cache_hits": self.cache_hits,
+            }
+
+
+document_renderer = DocumentRenderer(
+    workers=settings.PDF_RENDER_WORKERS,
+    max_pending=settings.PDF_RENDER_MAX_PENDING,
+)
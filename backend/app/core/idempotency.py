@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional, Tuple
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.crud import crud_idempotency_key
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"POST", "PATCH"}
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def _user_id(authorization: Optional[bytes]) -> Optional[int]:
+    """The verified subject of a bearer token; keys are scoped per user."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if payload.get("type") == "mfa_pending":
+            return None
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response for a repeated POST/PATCH with the same
+    Idempotency-Key instead of running the handler again.
+
+    Keys are scoped to the authenticated user; requests without a valid bearer
+    token are passed through. The first request with a key claims it for a
+    short lease (IDEMPOTENCY_LEASE_SECONDS), renewed every third of the lease
+    while it runs, and stores its response for IDEMPOTENCY_KEY_TTL_SECONDS; a
+    claim whose worker died is reclaimable once its lease runs out. A retry
+    gets that response back with `Idempotent-Replayed: true`, a retry that
+    arrives while the first is still running gets a 409, and reusing a key for
+    a different request gets a 422. The response is stored as soon as its last
+    body chunk is sent, before any background tasks run. Server errors are not
+    stored, so their retries run again; a response too large to keep is recorded
+    without its body and its retries get a 409.
+    """
+
+    def __init__(self, app: ASGIApp, ttl_seconds: int, lease_seconds: float, max_body_bytes: int):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(HEADER)
+        user_id = _user_id(headers.get(b"authorization")) if raw_key else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = raw_key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400, content={"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        request_hash = hashlib.sha256(
+            b"\0".join([scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body])
+        ).digest()
+
+        claim_id, stored = await crud_idempotency_key.claim(user_id, key, request_hash, self.lease_seconds)
+        if stored is not None:
+            await self._replay(stored, request_hash, scope, receive, send)
+            return
+
+        await self._run_and_store(user_id, key, claim_id, body, scope, receive, send)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(stored, request_hash: bytes, scope: Scope, receive: Receive, send: Send) -> None:
+        if bytes(stored.request_hash) != request_hash:
+            response = JSONResponse(
+                status_code=422, content={"detail": "Idempotency-Key was already used for a different request"}
+            )
+        elif stored.status_code is None:
+            response = JSONResponse(
+                status_code=409, content={"detail": "A request with this Idempotency-Key is still in progress"}
+            )
+        elif stored.body is None:
+            response = JSONResponse(
+                status_code=409, content={"detail": "Request already processed; its response was too large to replay"}
+            )
+        else:
+            response = Response(content=bytes(stored.body), status_code=stored.status_code)
+            response.raw_headers = [
+                (name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers or []
+            ] + [(REPLAYED_HEADER.lower().encode(), b"true")]
+        await response(scope, receive, send)
+
+    async def _run_and_store(
+        self, user_id: int, key: str, claim_id: str, body: bytes, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        response_headers: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+        size = 0
+        started = False
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, size, started
+            if message["type"] == "http.response.start":
+                started = True
+                status_code = message["status"]
+                response_headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= self.max_body_bytes:
+                    chunks.append(chunk)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Settle the key now: background tasks run after this inside
+                # the app call, and a retry must see the response, not a 409.
+                heartbeat.cancel()
+                await self._settle(user_id, key, claim_id, status_code, response_headers, chunks, size)
+
+        heartbeat = asyncio.create_task(self._renew_lease(user_id, key, claim_id))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            # Once the response has started the client may have seen it, so the
+            # key is kept; an unfinished claim simply expires with its lease.
+            if not started:
+                await crud_idempotency_key.release(user_id, key, claim_id)
+            raise
+        finally:
+            heartbeat.cancel()
+
+    async def _renew_lease(self, user_id: int, key: str, claim_id: str) -> None:
+        """Keep the claim alive while the handler runs, however long it takes."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await crud_idempotency_key.renew(user_id, key, claim_id, self.lease_seconds):
+                    return
+            except Exception:
+                logger.exception(f"Could not renew the lease on idempotency key {key!r}")
+
+    async def _settle(
+        self,
+        user_id: int,
+        key: str,
+        claim_id: str,
+        status_code: int,
+        headers: List[Tuple[str, str]],
+        chunks: List[bytes],
+        size: int,
+    ) -> None:
+        if status_code >= 500:
+            await crud_idempotency_key.release(user_id, key, claim_id)
+        elif size > self.max_body_bytes:
+            logger.info(f"Not storing idempotent response body of {size} bytes for key {key!r}")
+            await crud_idempotency_key.store(user_id, key, claim_id, status_code, headers, None, self.ttl_seconds)
+        else:
+            await crud_idempotency_key.store(
+                user_id, key, claim_id, status_code, headers, b"".join(chunks), self.ttl_seconds
+            )
@@ -0,0 +1,245 @@
+import csv
+import io
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.all_models import Bill, Payment, PaymentMethod, User
+
+# Header names accepted for each statement field (lowercased)
+COLUMN_ALIASES = {
+    "amount": ("amount", "credit", "credit amount", "paid in"),
+    "reference": ("reference", "description", "narrative", "details"),
+    "payer": ("payer", "name", "payer name", "account name"),
+    "date": ("date", "value date", "transaction date", "posting date"),
+}
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d %b %Y")
+
+# "BILL 123", "bill#123", "INV-123", "Invoice: 123"
+_BILL_NUMBER = re.compile(r"\b(?:BILL|INV(?:OICE)?)\s*[-#:]?\s*(\d+)\b", re.IGNORECASE)
+_NON_ALNUM = re.compile(r"[^0-9A-Z]+")
+MAX_KEY_WORDS = 5
+
+
+def normalize_words(text: Optional[str]) -> List[str]:
+    """Uppercase alphanumeric words: "12, Oak Lane." -> ["12", "OAK", "LANE"]."""
+    return _NON_ALNUM.sub(" ", (text or "").upper()).split()
+
+
+def _key(words: Iterable[str]) -> str:
+    return " ".join(words)
+
+
+# "1,250.50", "-40", "$12.00"; parentheses and DR/CR markers are handled around it
+_AMOUNT = re.compile(r"[-+]?[$£€]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?")
+
+
+def parse_amount(value: str) -> int:
+    """
+    Currency units to cents: "1,250.50" -> 125050. Debits are negative:
+    "(50.00)", "50.00 DR" and "-50.00" all give -5000; a trailing "CR" is a
+    credit. Raises ValueError for anything else.
+    """
+    text = (value or "").strip().upper()
+    negative = False
+    if text.endswith(("DR", "CR")):
+        negative, text = text.endswith("DR"), text[:-2].strip()
+    if text.startswith("(") and text.endswith(")"):
+        negative, text = True, text[1:-1].strip()
+    if not _AMOUNT.fullmatch(text) or (negative and text[0] in "-+"):
+        raise ValueError(f"Invalid amount {value!r}")
+    cents = int((Decimal(re.sub(r"[$£€,]", "", text)) * 100).to_integral_value())
+    return -cents if negative else cents
+
+
+def parse_date(value: str) -> date:
+    value = (value or "").strip()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date {value!r}")
+
+
+@dataclass
+class StatementLine:
+    row: int
+    reference: str = ""
+    payer: Optional[str] = None
+    amount: Optional[int] = None  # cents
+    paid_on: Optional[date] = None
+    error: Optional[str] = None
+
+
+def parse_statement_csv(content: str) -> List[StatementLine]:
+    """
+    Read a bank-statement CSV into lines. Columns are found by header name
+    (see COLUMN_ALIASES); amount and reference are required. Lines that cannot
+    be read carry an error instead of failing the import.
+    """
+    reader = csv.DictReader(io.StringIO(content))
+    headers = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+    columns = {
+        key: next((headers[alias] for alias in aliases if alias in headers), None)
+        for key, aliases in COLUMN_ALIASES.items()
+    }
+    missing = [key for key in ("amount", "reference") if columns[key] is None]
+    if missing:
+        raise ValueError(f"CSV file has no {' or '.join(missing)} column")
+
+    lines = []
+    for row, record in enumerate(reader, start=1):
+        def cell(key: str) -> str:
+            return (record.get(columns[key]) or "").strip() if columns[key] else ""
+
+        line = StatementLine(row=row, reference=cell("reference"), payer=cell("payer") or None)
+        try:
+            line.amount = parse_amount(cell("amount"))
+            line.paid_on = parse_date(cell("date")) if cell("date") else None
+        except ValueError as e:
+            line.error = str(e)
+        lines.append(line)
+    return lines
+
+
+@dataclass
+class OpenBill:
+    id: int
+    resident_id: int
+    remaining: int
+    due_date: datetime
+
+
+@dataclass
+class Match:
+    line: StatementLine
+    bill: OpenBill
+
+
+@dataclass
+class PaymentMatcher:
+    """
+    Matches bank-statement lines to a tenant's open bills in memory.
+
+    `load` reads the open bills, their residents and the bank-transfer payments
+    already recorded under the statement's references (three queries), and
+    builds hash indexes over them: bills by id, residents by normalized name and
+    house address, and each resident's open bills by outstanding amount. Every
+    line is then matched with dictionary lookups. Matched amounts are deducted
+    as the import proceeds, so two lines cannot both settle the same balance.
+    A line is skipped as already imported when its resident already has a
+    bank transfer with the same reference, amount and date.
+    """
+    bills: Dict[int, OpenBill] = field(default_factory=dict)
+    residents_by_key: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    bills_by_resident: Dict[int, List[OpenBill]] = field(default_factory=lambda: defaultdict(list))
+    bills_by_resident_amount: Dict[Tuple[int, int], List[OpenBill]] = field(default_factory=lambda: defaultdict(list))
+    imported: Set[Tuple[str, int, date, int]] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, db: Session, tenant_id: int, lines: List[StatementLine]) -> "PaymentMatcher":
+        matcher = cls()
+        open_bills = db.execute(
+            select(Bill.id, Bill.resident_id, Bill.outstanding, Bill.due_date)
+            .where(Bill.tenant_id == tenant_id, Bill.outstanding > 0)
+            .order_by(Bill.due_date, Bill.id)
+        ).all()
+        for bill_id, resident_id, outstanding, due_date in open_bills:
+            matcher._add_bill(OpenBill(bill_id, resident_id, outstanding, due_date))
+
+        residents = db.execute(
+            select(User.id, User.full_name, User.house_address)
+            .where(User.id.in_(matcher.bills_by_resident))
+        ).all() if matcher.bills_by_resident else []
+        for resident_id, full_name, house_address in residents:
+            for text in (full_name, house_address):
+                words = normalize_words(text)
+                if words:
+                    matcher.residents_by_key[_key(words)].add(resident_id)
+
+        references = {line.reference for line in lines if line.reference}
+        if references:
+            existing = db.execute(
+                select(Payment.reference, Payment.amount, Payment.paid_on, Payment.user_id)
+                .where(
+                    Payment.tenant_id == tenant_id,
+                    Payment.method == PaymentMethod.BANK_TRANSFER,
+                    Payment.reference.in_(references),
+                )
+            ).all()
+            matcher.imported = {tuple(row) for row in existing}
+        return matcher
+
+    def _add_bill(self, bill: OpenBill) -> None:
+        self.bills[bill.id] = bill
+        self.bills_by_resident[bill.resident_id].append(bill)
+        self.bills_by_resident_amount[(bill.resident_id, bill.remaining)].append(bill)
+
+    def _settle(self, bill: OpenBill, amount: int) -> None:
+        self.bills_by_resident_amount[(bill.resident_id, bill.remaining)].remove(bill)
+        bill.remaining -= amount
+        if bill.remaining > 0:
+            self.bills_by_resident_amount[(bill.resident_id, bill.remaining)].append(bill)
+        else:
+            self.bills_by_resident[bill.resident_id].remove(bill)
+
+    def _residents(self, line: StatementLine) -> Set[int]:
+        """Residents named in the payer field or anywhere in the reference."""
+        found = set(self.residents_by_key.get(_key(normalize_words(line.payer)), ()))
+        words = normalize_words(line.reference)
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + MAX_KEY_WORDS, len(words)) + 1):
+                found |= self.residents_by_key.get(_key(words[start:end]), set())
+        return found
+
+    def _bill_for(self, line: StatementLine) -> Tuple[Optional[OpenBill], str]:
+        numbers = [int(number) for number in _BILL_NUMBER.findall(line.reference)]
+        referenced = [self.bills[number] for number in numbers if number in self.bills]
+        if referenced:
+            bill = referenced[0]
+            if line.amount > bill.remaining:
+                return None, f"Amount exceeds the {bill.remaining / 100:.2f} outstanding on bill {bill.id}"
+            return bill, ""
+        if numbers:
+            return None, f"Bill {numbers[0]} is not open"
+
+        candidates = []
+        for resident_id in self._residents(line):
+            exact = self.bills_by_resident_amount.get((resident_id, line.amount))
+            if exact:
+                candidates.append(exact[0])
+            elif len(self.bills_by_resident[resident_id]) == 1 and line.amount <= self.bills_by_resident[resident_id][0].remaining:
+                candidates.append(self.bills_by_resident[resident_id][0])
+        if len(candidates) == 1:
+            return candidates[0], ""
+        if len(candidates) > 1:
+            return None, "Matches more than one resident"
+        return None, "No matching bill or resident"
+
+    def match(self, line: StatementLine) -> Tuple[Optional[Match], str]:
+        """Match one line, reserving its amount against the bill; or the reason it is unmatched."""
+        if line.error:
+            return None, line.error
+        if line.amount <= 0:
+            return None, "Not a credit"
+        bill, reason = self._bill_for(line)
+        if bill is None:
+            return None, reason
+        # Keyed by resident too: generic references ("LEVY") recur across payers
+        key = (line.reference, line.amount, line.paid_on or date.today(), bill.resident_id)
+        if key in self.imported:
+            return None, "Already imported"
+        self._settle(bill, line.amount)
+        self.imported.add(key)
+        return Match(line, bill), ""
@@ -0,0 +1,105 @@
+"""
+Minimal single-page PDF invoices and receipts.
+
+The renderers run in worker processes (app.core.financial_documents), so this
+module must stay importable on its own: standard library only, no app imports.
+Output depends only on the state passed in, so equal state gives identical
+bytes. Bump RENDER_VERSION when the layout changes, so cached documents are
+re-rendered.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+RENDER_VERSION = 1
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 56
+VALUE_X = 240
+
+
+def _escape(text: str) -> bytes:
+    encoded = str(text).encode("latin-1", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _text(font: str, size: int, x: int, y: int, text: str) -> bytes:
+    return b"BT /%s %d Tf %d %d Td (%s) Tj ET\n" % (font.encode(), size, x, y, _escape(text))
+
+
+def render_pdf(title: str, subtitle: Optional[str], rows: List[Tuple[str, str]], footer: Optional[str] = None) -> bytes:
+    """A page with a title, an optional subtitle, label/value rows and a footer."""
+    y = PAGE_HEIGHT - MARGIN
+    content = [_text("F2", 20, MARGIN, y, title)]
+    if subtitle:
+        y -= 24
+        content.append(_text("F1", 11, MARGIN, y, subtitle))
+    y -= 36
+    for label, value in rows:
+        content.append(_text("F2", 11, MARGIN, y, label))
+        content.append(_text("F1", 11, VALUE_X, y, value))
+        y -= 20
+    if footer:
+        content.append(_text("F1", 9, MARGIN, MARGIN, footer))
+    stream = b"".join(content)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>"
+        % (PAGE_WIDTH, PAGE_HEIGHT),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _money(cents: Optional[int]) -> str:
+    return f"${(cents or 0) / 100:,.2f}"
+
+
+def _day(value: Optional[str]) -> str:
+    return value[:10] if value else "-"
+
+
+def render_invoice(state: Dict[str, Any]) -> bytes:
+    return render_pdf(
+        f"Invoice #{state['id']}",
+        state.get("tenant_name"),
+        [
+            ("Billed to", state.get("resident_name") or "-"),
+            ("Address", state.get("house_address") or "-"),
+            ("Issued", _day(state.get("created_at"))),
+            ("Due", _day(state.get("due_date"))),
+            ("Description", state["description"]),
+            ("Amount", _money(state["amount"])),
+            ("Paid", _money(state.get("paid_total"))),
+            ("Outstanding", _money(state.get("outstanding"))),
+            ("Status", str(state.get("status") or "-").upper()),
+        ],
+        "Please quote the invoice number as your payment reference.",
+    )
+
+
+def render_receipt(state: Dict[str, Any]) -> bytes:
+    rows = [
+        ("Received from", state.get("resident_name") or "-"),
+        ("Date", _day(state.get("created_at"))),
+        ("Amount", _money(state["amount"])),
+        ("Method", str(state.get("method") or "-").replace("_", " ").title()),
+        ("Reference", state.get("reference") or "-"),
+    ]
+    if state.get("bill_id"):
+        rows += [
+            ("For invoice", f"#{state['bill_id']} {state.get('bill_description') or ''}".strip()),
+            ("Outstanding on invoice", _money(state.get("bill_outstanding"))),
+        ]
+    return render_pdf(f"Receipt #{state['id']}", state.get("tenant_name"), rows, "Thank you for your payment.")
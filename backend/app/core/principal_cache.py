@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.models.all_models import User, UserRole
+
+
+@dataclass
+class CachedPrincipal:
+    """
+    Snapshot of an authenticated user and the tenant facts checked on every request.
+    `user` is detached from any session and must never be mutated; request code gets
+    a session-bound copy via `Session.merge(user, load=False)`.
+    """
+    user: User
+    user_id: int
+    role: UserRole
+    tenant_id: Optional[int]
+    tenant_is_active: bool
+    max_admins: Optional[int]
+    max_guards: Optional[int]
+    max_residents: Optional[int]
+
+    def limit_for_role(self, role: UserRole) -> Optional[int]:
+        if role == UserRole.ADMIN:
+            return self.max_admins
+        if role == UserRole.GUARD:
+            return self.max_guards
+        if role == UserRole.RESIDENT:
+            return self.max_residents
+        return None
+
+
+class PrincipalCache:
+    """
+    Per-process LRU cache of authenticated principals keyed by user id.
+
+    Entries live for PRINCIPAL_CACHE_TTL_SECONDS, so changes made by another worker
+    are picked up within one TTL. Writes in this process invalidate explicitly.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self._cache = TTLCache(ttl_seconds, max_size)
+
+    def get(self, user_id: int) -> Optional[CachedPrincipal]:
+        return self._cache.get(user_id)
+
+    def put(self, user: User) -> CachedPrincipal:
+        """
+        Cache a user whose `tenant` (and its `package`) are already loaded and
+        which has been expunged from its session.
+        """
+        tenant = user.tenant
+        package = tenant.package if tenant else None
+        limits_source = package or tenant
+        entry = CachedPrincipal(
+            user=user,
+            user_id=user.id,
+            role=user.role,
+            tenant_id=user.tenant_id,
+            tenant_is_active=bool(tenant and tenant.is_active),
+            max_admins=limits_source.max_admins if limits_source else None,
+            max_guards=limits_source.max_guards if limits_source else None,
+            max_residents=limits_source.max_residents if limits_source else None,
+        )
+        return self._cache.put(user.id, entry)
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.invalidate(user_id)
+
+    def invalidate_tenant(self, tenant_id: int) -> None:
+        self._cache.invalidate_where(lambda _, entry: entry.tenant_id == tenant_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+)
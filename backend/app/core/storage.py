@@ -17,6 +17,7 @@ class StorageClient:
         self.access_key = settings.MINIO_ACCESS_KEY
         self.secret_key = settings.MINIO_SECRET_KEY
         self.bucket_name = settings.MINIO_BUCKET_UPLOADS
+        self.documents_bucket = settings.MINIO_BUCKET_DOCUMENTS
         self.secure = settings.MINIO_SECURE
 
         # Client for internal operations (uploading)
@@ -28,6 +29,7 @@ class StorageClient:
         )
 
         self._ensure_bucket_exists()
+        self._ensure_private_bucket_exists(self.documents_bucket)
 
     def _ensure_bucket_exists(self):
         try:
@@ -53,10 +55,20 @@ class StorageClient:
         except S3Error as e:
             logger.error(f"Error checking/creating bucket: {e}")
 
-    def upload_file(self, file_data, file_name, content_type):
+    def _ensure_private_bucket_exists(self, bucket):
+        # No bucket policy: objects are only readable with the backend's credentials
+        try:
+            if not self.client.bucket_exists(bucket):
+                self.client.make_bucket(bucket)
+                logger.info(f"Created private bucket: {bucket}")
+        except S3Error as e:
+            logger.error(f"Error checking/creating bucket: {e}")
+
+    def upload_file(self, file_data, file_name, content_type, bucket=None):
+        bucket = bucket or self.bucket_name
         try:
             result = self.client.put_object(
-                self.bucket_name,
+                bucket,
                 file_name,
                 file_data,
                 length=-1,
@@ -68,11 +80,34 @@ class StorageClient:
             # But from outside (browser), localhost:9000 works.
             # From inside (backend), minio:9000 works.
             # We return the object name, and the frontend constructs the URL or we return a presigned URL.
-            return f"{self.bucket_name}/{file_name}"
+            return f"{bucket}/{file_name}"
         except S3Error as e:
             logger.error(f"Error uploading file: {e}")
             raise e
 
+    def get_file(self, object_name, bucket=None):
+        """The object's bytes, or None if it does not exist."""
+        try:
+            response = self.client.get_object(bucket or self.bucket_name, object_name)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def file_exists(self, object_name, bucket=None):
+        try:
+            self.client.stat_object(bucket or self.bucket_name, object_name)
+            return True
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return False
+            raise
+
     def get_file_url(self, object_name):
         # Return a simple public URL for the file (Bucket is public)
         # Avoids complexity of presigned URLs and potential CORS/signature issues
@@ -0,0 +1,32 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.pagination import paginate_async
+from app.models.all_models import AccessLog
+from app.schemas import access_log as schemas
+
+async def create_access_log(
+    db: AsyncSession, log_in: schemas.AccessLogCreate, guard_id: int, tenant_id: int
+) -> AccessLog:
+    access_log = AccessLog(
+        tenant_id=tenant_id,
+        user_id=log_in.user_id,
+        direction=log_in.direction,
+        method=log_in.method,
+        guard_id=guard_id
+    )
+    db.add(access_log)
+    await db.commit()
+    await db.refresh(access_log)
+    return access_log
+
+async def get_access_logs_by_user(
+    db: AsyncSession, user_id: int, tenant_id: int, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[AccessLog]:
+    return await paginate_async(
+        db,
+        select(AccessLog).where(AccessLog.user_id == user_id, AccessLog.tenant_id == tenant_id),
+        [AccessLog.timestamp, AccessLog.id],
+        skip=skip, limit=limit, cursor=cursor,
+    )
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Amenity
 from app.schemas import amenity as schemas
 
@@ -9,8 +10,9 @@ def get_amenity(db: Session, amenity_id: int, tenant_id: int = None) -> Optional
         query = query.filter(Amenity.tenant_id == tenant_id)
     return query.first()
 
-def get_amenities(db: Session, tenant_id: int, skip: int = 0, limit: int = 100) -> List[Amenity]:
-    return db.query(Amenity).filter(Amenity.tenant_id == tenant_id).offset(skip).limit(limit).all()
+def get_amenities(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Amenity]:
+    query = db.query(Amenity).filter(Amenity.tenant_id == tenant_id)
+    return paginate(query, [Amenity.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 def create_amenity(db: Session, amenity: schemas.AmenityCreate, tenant_id: int) -> Amenity:
     db_amenity = Amenity(**amenity.model_dump(), tenant_id=tenant_id)
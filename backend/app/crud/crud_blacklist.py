@@ -1,5 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.core.blacklist_index import blacklist_index
+from app.crud.pagination import paginate
 from app.models.all_models import Blacklist
 from app.schemas import blacklist as schemas
 
@@ -8,14 +10,12 @@ class CRUDBlacklist:
         return db.query(Blacklist).filter(Blacklist.id == id).first()
 
     def get_multi(
-        self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[Blacklist]:
-        return (
-            db.query(Blacklist)
-            .filter(Blacklist.tenant_id == tenant_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return paginate(
+            db.query(Blacklist).filter(Blacklist.tenant_id == tenant_id),
+            [Blacklist.id],
+            skip=skip, limit=limit, cursor=cursor, descending=False,
         )
 
     def create(
@@ -32,12 +32,14 @@ class CRUDBlacklist:
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        blacklist_index.invalidate(tenant_id)
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> Blacklist:
         obj = db.query(Blacklist).get(id)
         db.delete(obj)
         db.commit()
+        blacklist_index.invalidate(obj.tenant_id)
         return obj
 
     def get_by_phone(self, db: Session, phone_number: str, tenant_id: int) -> Optional[Blacklist]:
@@ -1,6 +1,9 @@
 from typing import List, Optional
 from datetime import datetime
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
+from app.crud.transitions import transition
 from app.models.all_models import Booking, BookingStatus
 from app.schemas import booking as schemas
 
@@ -15,6 +18,7 @@ def get_bookings(
     tenant_id: int,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     user_id: Optional[int] = None,
     amenity_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
@@ -29,7 +33,7 @@ def get_bookings(
         query = query.filter(Booking.start_time >= start_date)
     if end_date:
         query = query.filter(Booking.start_time <= end_date)
-    return query.order_by(Booking.start_time.desc()).offset(skip).limit(limit).all()
+    return paginate(query, [Booking.start_time, Booking.id], skip=skip, limit=limit, cursor=cursor)
 
 def create_booking(db: Session, booking: schemas.BookingCreate, user_id: int, tenant_id: int) -> Booking:
     db_booking = Booking(
@@ -43,16 +47,29 @@ def create_booking(db: Session, booking: schemas.BookingCreate, user_id: int, te
     db.refresh(db_booking)
     return db_booking
 
-def update_booking(db: Session, booking_id: int, booking_update: schemas.BookingUpdate) -> Optional[Booking]:
-    db_booking = get_booking(db, booking_id)
-    if not db_booking:
-        return None
-    
+# target status -> statuses a booking may move to it from
+BOOKING_TRANSITIONS = {
+    BookingStatus.PENDING: [],
+    BookingStatus.CONFIRMED: [BookingStatus.PENDING],
+    BookingStatus.REJECTED: [BookingStatus.PENDING],
+    BookingStatus.CANCELLED: [BookingStatus.PENDING, BookingStatus.CONFIRMED],
+}
+
+def update_booking(
+    db: Session, booking_id: int, booking_update: schemas.BookingUpdate, tenant_id: int, user_id: Optional[int] = None
+):
+    """
+    Apply an update in one statement, restricted to the tenant and, if user_id is
+    given, to that user's bookings. A status change must follow
+    BOOKING_TRANSITIONS or StateConflict is raised. Returns the updated row, or
+    None if there is no such booking. Commits.
+    """
     update_data = booking_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_booking, key, value)
-        
-    db.add(db_booking)
+    where = Booking.id == booking_id
+    if user_id is not None:
+        where = and_(where, Booking.user_id == user_id)
+    status = update_data.get("status")
+    allowed = BOOKING_TRANSITIONS[status] if status else [None, *BookingStatus]
+    row = transition(db, Booking, where, update_data, allowed=allowed, tenant_id=tenant_id)
     db.commit()
-    db.refresh(db_booking)
-    return db_booking
+    return row
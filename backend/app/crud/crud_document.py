@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import CommunityDocument, DocumentCategory
 from app.schemas import document as schemas
 
@@ -17,11 +18,11 @@ def create_document(db: Session, document: schemas.DocumentCreate, uploaded_by_i
     db.refresh(db_document)
     return db_document
 
-def get_documents(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, category: Optional[DocumentCategory] = None) -> List[CommunityDocument]:
+def get_documents(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, category: Optional[DocumentCategory] = None) -> List[CommunityDocument]:
     query = db.query(CommunityDocument).filter(CommunityDocument.tenant_id == tenant_id)
     if category:
         query = query.filter(CommunityDocument.category == category)
-    return query.order_by(CommunityDocument.created_at.desc()).offset(skip).limit(limit).all()
+    return paginate(query, [CommunityDocument.created_at, CommunityDocument.id], skip=skip, limit=limit, cursor=cursor)
 
 def delete_document(db: Session, document_id: int, tenant_id: int) -> Optional[CommunityDocument]:
     db_document = db.query(CommunityDocument).filter(CommunityDocument.id == document_id, CommunityDocument.tenant_id == tenant_id).first()
@@ -1,7 +1,12 @@
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import and_, case, cast, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from app.models.all_models import Bill, Payment, FeeDefinition, BillStatus, PaymentStatus
+from app.crud.crud_tenant_counter import record_counter_deltas, transition_deltas
+from app.crud.pagination import paginate
+from app.crud.transitions import StateConflict
+from app.models.all_models import Bill, BillingRun, Payment, FeeDefinition, BillStatus, PaymentMethod, PaymentStatus, User, UserRole
 from app.schemas import financial as schemas
 
 # FeeDefinition CRUD
@@ -11,6 +16,7 @@ def create_fee_definition(db: Session, fee: schemas.FeeDefinitionCreate, tenant_
         description=fee.description,
         amount=fee.amount,
         is_active=fee.is_active,
+        late_fee_after_days=fee.late_fee_after_days,
         tenant_id=tenant_id
     )
     db.add(db_fee)
@@ -18,8 +24,9 @@ def create_fee_definition(db: Session, fee: schemas.FeeDefinitionCreate, tenant_
     db.refresh(db_fee)
     return db_fee
 
-def get_fee_definitions(db: Session, tenant_id: int, skip: int = 0, limit: int = 100) -> List[FeeDefinition]:
-    return db.query(FeeDefinition).filter(FeeDefinition.tenant_id == tenant_id).offset(skip).limit(limit).all()
+def get_fee_definitions(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[FeeDefinition]:
+    query = db.query(FeeDefinition).filter(FeeDefinition.tenant_id == tenant_id)
+    return paginate(query, [FeeDefinition.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 def get_active_fee_definitions(db: Session, tenant_id: int) -> List[FeeDefinition]:
     return db.query(FeeDefinition).filter(FeeDefinition.is_active == True, FeeDefinition.tenant_id == tenant_id).all()
@@ -59,11 +66,134 @@ def create_bill(db: Session, bill: schemas.BillCreate, tenant_id: int) -> Bill:
     db.refresh(db_bill)
     return db_bill
 
-def get_bills(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, resident_id: Optional[int] = None) -> List[Bill]:
+def generate_period_bills(db: Session, tenant_id: int, period: date):
+    """
+    Bill every active resident of the tenant for each of its active fee
+    definitions for `period` (the first of a month), in one INSERT ... SELECT.
+    Resident/fee pairs already billed for the period are skipped by the unique
+    key, so a rerun only fills gaps. Late fees are left to accrue_late_fees.
+    Returns the created (id, resident_id, amount, description) rows; the caller
+    commits.
+    """
+    due_date = datetime.combine(period, time()) + timedelta(days=25)  # the 26th
+    billable = (
+        select(
+            User.tenant_id,
+            User.id,
+            FeeDefinition.id,
+            literal(period, Bill.period.type),
+            FeeDefinition.amount,
+            FeeDefinition.name + literal(f" - {period.strftime('%B %Y')}"),
+            literal(due_date, Bill.due_date.type),
+            # Cast, or Postgres types the untyped literal in the select list as text
+            cast(literal(BillStatus.UNPAID, Bill.status.type), Bill.status.type),
+        )
+        .join(FeeDefinition, and_(
+            FeeDefinition.tenant_id == User.tenant_id,
+            FeeDefinition.is_active == True,
+            FeeDefinition.late_fee_after_days.is_(None),
+        ))
+        .where(User.tenant_id == tenant_id, User.role == UserRole.RESIDENT, User.is_active == True)
+    )
+    stmt = (
+        insert(Bill)
+        .from_select(
+            ["tenant_id", "resident_id", "fee_id", "period", "amount", "description", "due_date", "status"],
+            billable,
+        )
+        .on_conflict_do_nothing(constraint="uq_bills_tenant_resident_fee_period")
+        .returning(Bill.id, Bill.resident_id, Bill.amount, Bill.description)
+    )
+    created = db.execute(stmt).all()
+    if created:
+        # INSERT ... SELECT skips the flush hook that keeps the dashboard counters
+        deltas = transition_deltas(Bill, None, BillStatus.UNPAID, created=True)
+        record_counter_deltas(db, {tenant_id: {name: delta * len(created) for name, delta in deltas.items()}})
+    return created
+
+# Statuses of bills that attract a late fee once past due (late-fee bills never do)
+OVERDUE_STATUSES = [BillStatus.UNPAID, BillStatus.PARTIAL, BillStatus.OVERDUE]
+
+def get_overdue_resident_ids(db: Session, tenant_id: int, due_before: datetime, after_resident_id: int, limit: int) -> List[int]:
+    """
+    The next `limit` residents (by id, after after_resident_id) with an unpaid
+    bill due before `due_before`, for keyset-chunked late-fee accrual.
+    """
+    late_fees = select(FeeDefinition.id).where(
+        FeeDefinition.tenant_id == tenant_id, FeeDefinition.late_fee_after_days.is_not(None)
+    )
+    return db.execute(
+        select(Bill.resident_id)
+        .where(
+            Bill.tenant_id == tenant_id,
+            Bill.outstanding > 0,
+            Bill.due_date < due_before,
+            Bill.status.in_(OVERDUE_STATUSES),
+            Bill.resident_id > after_resident_id,
+            or_(Bill.fee_id.is_(None), Bill.fee_id.not_in(late_fees)),
+        )
+        .group_by(Bill.resident_id)
+        .order_by(Bill.resident_id)
+        .limit(limit)
+    ).scalars().all()
+
+def create_late_fee_bills(db: Session, fee, resident_ids: List[int], period: date, due_date: datetime):
+    """
+    Charge the late fee (a FeeDefinition or row with id, tenant_id, name and
+    amount) to the residents for `period`, in one multi-row INSERT. Residents
+    already charged this fee for the period are skipped by the unique key, so
+    reruns are harmless. Returns the created (id, resident_id) rows; the caller
+    commits.
+    """
+    if not resident_ids:
+        return []
+    rows = [
+        {
+            "tenant_id": fee.tenant_id,
+            "resident_id": resident_id,
+            "fee_id": fee.id,
+            "period": period,
+            "amount": fee.amount,
+            "description": f"{fee.name} - {period.strftime('%B %Y')}",
+            "due_date": due_date,
+            "status": BillStatus.UNPAID,
+        }
+        for resident_id in resident_ids
+    ]
+    stmt = (
+        insert(Bill)
+        .values(rows)
+        .on_conflict_do_nothing(constraint="uq_bills_tenant_resident_fee_period")
+        .returning(Bill.id, Bill.resident_id)
+    )
+    created = db.execute(stmt).all()
+    if created:
+        deltas = transition_deltas(Bill, None, BillStatus.UNPAID, created=True)
+        record_counter_deltas(db, {fee.tenant_id: {name: delta * len(created) for name, delta in deltas.items()}})
+    return created
+
+def create_billing_run(db: Session, tenant_id: int, period: date, requested_by_id: Optional[int] = None) -> BillingRun:
+    db_run = BillingRun(tenant_id=tenant_id, period=period, status="queued", requested_by_id=requested_by_id)
+    db.add(db_run)
+    db.commit()
+    db.refresh(db_run)
+    return db_run
+
+def get_billing_run(db: Session, run_id: int, tenant_id: int) -> Optional[BillingRun]:
+    return db.query(BillingRun).filter(BillingRun.id == run_id, BillingRun.tenant_id == tenant_id).first()
+
+def get_active_billing_run(db: Session, tenant_id: int, period: date) -> Optional[BillingRun]:
+    return db.query(BillingRun).filter(
+        BillingRun.tenant_id == tenant_id,
+        BillingRun.period == period,
+        BillingRun.status.in_(["queued", "running"]),
+    ).first()
+
+def get_bills(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, resident_id: Optional[int] = None) -> List[Bill]:
     query = db.query(Bill).filter(Bill.tenant_id == tenant_id)
     if resident_id:
         query = query.filter(Bill.resident_id == resident_id)
-    return query.order_by(Bill.created_at.desc()).offset(skip).limit(limit).all()
+    return paginate(query, [Bill.created_at, Bill.id], skip=skip, limit=limit, cursor=cursor)
 
 def get_bill(db: Session, bill_id: int, tenant_id: Optional[int] = None) -> Optional[Bill]:
     query = db.query(Bill).filter(Bill.id == bill_id)
@@ -93,6 +223,7 @@ def get_payments(
     tenant_id: int,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     user_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None
@@ -104,36 +235,233 @@ def get_payments(
         query = query.filter(Payment.created_at >= start_date)
     if end_date:
         query = query.filter(Payment.created_at <= end_date)
-    return query.order_by(Payment.created_at.desc()).offset(skip).limit(limit).all()
-
-def update_payment_status(db: Session, payment_id: int, status: PaymentStatus, tenant_id: int) -> Optional[Payment]:
-    payment = db.query(Payment).filter(Payment.id == payment_id, Payment.tenant_id == tenant_id).first()
-    if payment:
-        payment.status = status
-        
-        # If payment is verified and linked to a bill, update bill status
-        if status == PaymentStatus.VERIFIED and payment.bill_id:
-            bill = get_bill(db, payment.bill_id, tenant_id) # Pass tenant_id for safety
-            if bill:
-                # We need to refresh the bill's payments relationship to include the current one (if not already)
-                # But querying explicitly is safer
-                db.refresh(bill)
-                # Recalculate total paid from DB to be safe
-                total_paid = 0
-                paid_payments = db.query(Payment).filter(
-                    Payment.bill_id == bill.id, 
-                    Payment.status == PaymentStatus.VERIFIED,
-                    Payment.tenant_id == tenant_id
-                ).all()
-                total_paid = sum(p.amount for p in paid_payments)
-                
-                if total_paid >= bill.amount:
-                    bill.status = BillStatus.PAID
-                elif total_paid > 0:
-                    bill.status = BillStatus.PARTIAL
-                db.add(bill)
-
-        db.add(payment)
-        db.commit()
-        db.refresh(payment)
-    return payment
+    return paginate(query, [Payment.created_at, Payment.id], skip=skip, limit=limit, cursor=cursor)
+
+# target status -> statuses a payment may move to it from; rejecting a verified
+# payment reverses it (e.g. a bounced transfer)
+PAYMENT_TRANSITIONS = {
+    PaymentStatus.PENDING: [],
+    PaymentStatus.VERIFIED: [PaymentStatus.PENDING],
+    PaymentStatus.REJECTED: [PaymentStatus.PENDING, PaymentStatus.VERIFIED],
+}
+
+def _verified_change(amount, previous_status, status: PaymentStatus):
+    """How much a bill's verified total moves when a payment of `amount` goes from previous_status to status."""
+    was_verified = case((previous_status == PaymentStatus.VERIFIED, 1), else_=0)
+    is_verified = 1 if status == PaymentStatus.VERIFIED else 0
+    return amount * (is_verified - was_verified)
+
+def _settled_bill_values(delta) -> dict:
+    """New paid_total and status for a bill whose verified total moves by `delta`."""
+    paid_total = Bill.paid_total + delta
+    return {
+        "paid_total": paid_total,
+        "status": case(
+            (paid_total >= Bill.amount, literal(BillStatus.PAID, Bill.status.type)),
+            (paid_total > 0, literal(BillStatus.PARTIAL, Bill.status.type)),
+            (Bill.status.in_([BillStatus.PAID, BillStatus.PARTIAL]), literal(BillStatus.UNPAID, Bill.status.type)),
+            else_=Bill.status,
+        ),
+    }
+
+def _payment_status_statement(payment_ids: List[int], status: PaymentStatus, tenant_id: int):
+    """
+    One statement that moves the payments to `status` and applies the change in
+    verified amount to each bill's paid_total, deriving the bill's status from
+    the new total in the same UPDATE:
+
+        WITH target AS (SELECT ... FROM payments ... FOR UPDATE),
+             changed AS (UPDATE payments ... RETURNING ...),
+             totals AS (SELECT bill_id, sum(delta) FROM changed ... GROUP BY bill_id),
+             bill_before AS (SELECT id, status FROM bills ... FOR UPDATE),
+             settled AS (UPDATE bills SET paid_total = paid_total + delta, status = CASE ... RETURNING ...)
+        SELECT ...
+
+    `paid_total + delta` is evaluated against the locked, latest row, so
+    concurrent verifications against one bill add up instead of overwriting
+    each other. There is one result row per payment found: its columns are null
+    if the payment could not make the transition.
+    """
+    target = (
+        select(Payment.id, Payment.status.label("previous_status"))
+        .where(Payment.id.in_(payment_ids), Payment.tenant_id == tenant_id)
+        .with_for_update(of=Payment)
+        .cte("target")
+    )
+    changed = (
+        update(Payment)
+        .where(Payment.id == target.c.id, Payment.status.in_(PAYMENT_TRANSITIONS[status]))
+        .values(status=status)
+        .returning(*Payment.__table__.c)
+        .cte("changed")
+    )
+    delta = func.sum(_verified_change(changed.c.amount, target.c.previous_status, status))
+    totals = (
+        select(changed.c.bill_id, delta.label("delta"))
+        .select_from(changed.join(target, target.c.id == changed.c.id))
+        .where(changed.c.bill_id.is_not(None))
+        .group_by(changed.c.bill_id)
+        .having(delta != 0)
+        .cte("totals")
+    )
+    bill_before = (
+        select(Bill.id, Bill.status.label("previous_status"))
+        .where(Bill.id.in_(select(totals.c.bill_id)))
+        .with_for_update(of=Bill)
+        .cte("bill_before")
+    )
+    settled = (
+        update(Bill)
+        .where(Bill.id == bill_before.c.id, Bill.id == totals.c.bill_id)
+        .values(**_settled_bill_values(totals.c.delta))
+        .returning(Bill.id, Bill.tenant_id, Bill.status)
+        .cte("settled")
+    )
+    return select(
+        target.c.id.label("requested_id"),
+        target.c.previous_status,
+        changed,
+        bill_before.c.previous_status.label("bill_previous_status"),
+        settled.c.status.label("bill_status"),
+        settled.c.tenant_id.label("bill_tenant_id"),
+    ).select_from(
+        target
+        .outerjoin(changed, changed.c.id == target.c.id)
+        .outerjoin(settled, settled.c.id == changed.c.bill_id)
+        .outerjoin(bill_before, bill_before.c.id == settled.c.id)
+    )
+
+def set_payment_statuses(db: Session, payment_ids: List[int], status: PaymentStatus, tenant_id: int):
+    """
+    Verify or reject many payments in one statement, keeping their bills'
+    paid_total, outstanding and status in step. Returns (updated payment rows,
+    {id: current status} of those that could not make the transition, ids not
+    found). The caller commits.
+    """
+    rows = db.execute(_payment_status_statement(payment_ids, status, tenant_id)).all()
+    deltas = {}
+    settled_bills = set()
+    for row in rows:
+        if row.bill_status is None or row.bill_id in settled_bills:
+            continue
+        settled_bills.add(row.bill_id)
+        tenant_deltas = deltas.setdefault(row.bill_tenant_id, {})
+        for name, delta in transition_deltas(Bill, row.bill_previous_status, row.bill_status).items():
+            tenant_deltas[name] = tenant_deltas.get(name, 0) + delta
+    if deltas:
+        record_counter_deltas(db, deltas)
+    found = {row.requested_id for row in rows}
+    updated = [row for row in rows if row.id is not None]
+    conflicts = {row.requested_id: row.previous_status for row in rows if row.id is None}
+    not_found = [payment_id for payment_id in dict.fromkeys(payment_ids) if payment_id not in found]
+    return updated, conflicts, not_found
+
+def update_payment_status(db: Session, payment_id: int, status: PaymentStatus, tenant_id: int):
+    """
+    Verify or reject a payment and settle its bill in one statement. Returns the
+    updated payment row, None if there is no such payment, and raises
+    StateConflict if it cannot make the transition. Commits.
+    """
+    updated, conflicts, _ = set_payment_statuses(db, [payment_id], status, tenant_id)
+    if conflicts:
+        db.rollback()
+        previous = conflicts[payment_id]
+        raise StateConflict(f"Payment is {getattr(previous, 'value', previous)}")
+    db.commit()
+    return updated[0] if updated else None
+
+def record_bank_payments(db: Session, matches: list, tenant_id: int):
+    """
+    Record matched bank-statement lines (app.core.payment_matching.Match) as
+    bank-transfer payments by the bills' residents, with one multi-row INSERT,
+    then verify them together with set_payment_statuses so the bills settle.
+    Returns the payment ids in the order given; the caller commits.
+    """
+    if not matches:
+        return []
+    today = date.today()
+    rows = [
+        {
+            "tenant_id": tenant_id,
+            "user_id": match.bill.resident_id,
+            "bill_id": match.bill.id,
+            "amount": match.line.amount,
+            "method": PaymentMethod.BANK_TRANSFER,
+            "reference": match.line.reference or None,
+            "status": PaymentStatus.PENDING,
+            "notes": "Imported from bank statement",
+            # The matcher dedupes on this date, so reruns of the same file skip these lines
+            "paid_on": match.line.paid_on or today,
+        }
+        for match in matches
+    ]
+    stmt = insert(Payment).returning(Payment.id, sort_by_parameter_order=True)
+    payment_ids = db.execute(stmt, rows).scalars().all()
+    set_payment_statuses(db, payment_ids, PaymentStatus.VERIFIED, tenant_id)
+    return payment_ids
+
+# Analytics: one aggregate query per report, over bill balances only
+
+# (bucket, days past due: more than, at most); None is unbounded. Shared by the
+# receivables aging report and resident statements.
+AGING_BUCKETS = [("current", None, 0), ("1-30", 0, 30), ("31-60", 30, 60), ("61-90", 60, 90), ("90+", 90, None)]
+
+def aging_conditions(due_date, as_of: datetime) -> list:
+    """(bucket, condition on due_date) for each of AGING_BUCKETS; a due date meets exactly one."""
+    conditions = []
+    for bucket, days_from, days_to in AGING_BUCKETS:
+        terms = []
+        if days_from is not None:
+            terms.append(due_date < as_of - timedelta(days=days_from))
+        if days_to is not None:
+            terms.append(due_date >= as_of - timedelta(days=days_to))
+        conditions.append((bucket, and_(*terms)))
+    return conditions
+
+def get_receivables_aging(db: Session, tenant_id: int, as_of: datetime) -> dict:
+    """Outstanding amounts of open bills by AGING_BUCKETS, not yet due first."""
+    outstanding = func.sum(Bill.outstanding)
+    columns = [
+        func.coalesce(outstanding.filter(condition), 0).label(bucket)
+        for bucket, condition in aging_conditions(Bill.due_date, as_of)
+    ]
+    columns += [func.coalesce(outstanding, 0).label("total"), func.count().label("open_bills")]
+    row = db.execute(select(*columns).where(Bill.tenant_id == tenant_id, Bill.outstanding > 0)).one()
+    return dict(row._mapping)
+
+def get_collection_by_month(db: Session, tenant_id: int, since: datetime, as_of: datetime) -> list:
+    """Billed and collected amounts of bills due in each month from `since` up to as_of."""
+    month = func.date_trunc("month", Bill.due_date)
+    return db.execute(
+        select(
+            month.label("month"),
+            func.count().label("bills"),
+            func.sum(Bill.amount).label("billed"),
+            func.sum(Bill.paid_total).label("collected"),
+        )
+        .where(Bill.tenant_id == tenant_id, Bill.due_date >= since, Bill.due_date <= as_of)
+        .group_by(month)
+        .order_by(month)
+    ).all()
+
+def get_top_debtors(db: Session, tenant_id: int, limit: int = 10) -> list:
+    """Residents with the largest outstanding balance across their open bills."""
+    debts = (
+        select(
+            Bill.resident_id,
+            func.sum(Bill.outstanding).label("outstanding"),
+            func.count().label("open_bills"),
+            func.min(Bill.due_date).label("oldest_due_date"),
+        )
+        .where(Bill.tenant_id == tenant_id, Bill.outstanding > 0)
+        .group_by(Bill.resident_id)
+        .order_by(func.sum(Bill.outstanding).desc(), Bill.resident_id)
+        .limit(limit)
+        .subquery("debts")
+    )
+    return db.execute(
+        select(debts, User.full_name.label("resident_name"), User.house_address)
+        .select_from(debts)
+        .outerjoin(User, User.id == debts.c.resident_id)
+        .order_by(debts.c.outstanding.desc(), debts.c.resident_id)
+    ).all()
@@ -0,0 +1,115 @@
+"""
+Storage for app.core.idempotency. Each statement runs in its own short
+transaction on the async engine, outside the request's session.
+"""
+import secrets
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import async_engine
+from app.models.all_models import IdempotencyKey
+
+table = IdempotencyKey.__table__
+
+
+async def claim(
+    user_id: int, key: str, request_hash: bytes, lease_seconds: float
+) -> Tuple[Optional[str], Optional[IdempotencyKey]]:
+    """
+    Reserve (user_id, key) for a new request. Returns (claim_id, None) if this
+    request now owns the key (it was unused or had expired); otherwise
+    (None, stored row), whose status_code is None while the first request is
+    still running.
+
+    The claim is a short lease: it expires after lease_seconds unless `renew`
+    or `store` extends it, so a request whose worker died can be retried soon
+    after. `renew`, `store` and `release` only act while claim_id still owns
+    the key, so a request that lost its lease cannot touch a later claim.
+    """
+    claim_id = secrets.token_hex(16)
+    values = {
+        "user_id": user_id,
+        "key": key,
+        "claim_id": claim_id,
+        "request_hash": request_hash,
+        "status_code": None,
+        "headers": None,
+        "body": None,
+        "expires_at": func.now() + timedelta(seconds=lease_seconds),
+    }
+    stmt = insert(table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.key],
+        set_={name: stmt.excluded[name] for name in values if name not in ("user_id", "key")},
+        where=table.c.expires_at < func.now(),
+    ).returning(table.c.key)
+    async with async_engine.begin() as conn:
+        if (await conn.execute(stmt)).first() is not None:
+            return claim_id, None
+        return None, (await conn.execute(
+            select(table).where(table.c.user_id == user_id, table.c.key == key)
+        )).first()
+
+
+def _owned(user_id: int, key: str, claim_id: str):
+    return (table.c.user_id == user_id, table.c.key == key, table.c.claim_id == claim_id)
+
+
+async def renew(user_id: int, key: str, claim_id: str, lease_seconds: float) -> bool:
+    """Extend an in-progress claim's lease; False once the claim is no longer held."""
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
+            update(table)
+            .where(*_owned(user_id, key, claim_id), table.c.status_code.is_(None))
+            .values(expires_at=func.now() + timedelta(seconds=lease_seconds))
+        )
+    return result.rowcount > 0
+
+
+async def store(
+    user_id: int,
+    key: str,
+    claim_id: str,
+    status_code: int,
+    headers: List[Tuple[str, str]],
+    body: Optional[bytes],
+    ttl_seconds: int,
+) -> None:
+    """Save the response for replay until ttl_seconds from now; body None if it was too large to keep."""
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            update(table)
+            .where(*_owned(user_id, key, claim_id))
+            .values(
+                status_code=status_code, headers=headers, body=body,
+                expires_at=func.now() + timedelta(seconds=ttl_seconds),
+            )
+        )
+
+
+async def release(user_id: int, key: str, claim_id: str) -> None:
+    """Forget a key whose request failed, so a retry runs the handler again."""
+    async with async_engine.begin() as conn:
+        await conn.execute(delete(table).where(*_owned(user_id, key, claim_id)))
+
+
+def purge_expired(db: Session, batch_size: int = 10000) -> int:
+    """Delete expired keys in batches, committing each; returns how many were removed."""
+    removed = 0
+    while True:
+        batch = (
+            select(table.c.user_id, table.c.key)
+            .where(table.c.expires_at < func.now())
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(table).where(tuple_(table.c.user_id, table.c.key).in_(batch))
+        )
+        db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Incident, IncidentStatus
 from app.schemas import incident as schemas
 
@@ -24,6 +25,7 @@ def get_incidents(
     tenant_id: int,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     reporter_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None
@@ -35,7 +37,7 @@ def get_incidents(
         query = query.filter(Incident.created_at >= start_date)
     if end_date:
         query = query.filter(Incident.created_at <= end_date)
-    return query.order_by(Incident.created_at.desc()).offset(skip).limit(limit).all()
+    return paginate(query, [Incident.created_at, Incident.id], skip=skip, limit=limit, cursor=cursor)
 
 def update_incident_status(db: Session, incident_id: int, status: IncidentStatus, tenant_id: int) -> Optional[Incident]:
     db_incident = db.query(Incident).filter(Incident.id == incident_id, Incident.tenant_id == tenant_id).first()
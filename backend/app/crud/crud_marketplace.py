@@ -1,6 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.pagination import paginate
 from app.models.all_models import MarketplaceItem, MarketplaceItemStatus
 from app.schemas.marketplace import MarketplaceItemCreate, MarketplaceItemUpdate
 
@@ -17,18 +18,20 @@ class CRUDMarketplace(CRUDBase[MarketplaceItem, MarketplaceItemCreate, Marketpla
         db.refresh(db_obj)
         return db_obj
 
-    def get_multi_by_category(self, db: Session, *, category: str, tenant_id: int, skip: int = 0, limit: int = 100) -> List[MarketplaceItem]:
-        return db.query(MarketplaceItem).filter(
+    def get_multi_by_category(self, db: Session, *, category: str, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[MarketplaceItem]:
+        query = db.query(MarketplaceItem).filter(
             MarketplaceItem.tenant_id == tenant_id,
             MarketplaceItem.category == category,
             MarketplaceItem.status == MarketplaceItemStatus.AVAILABLE
-        ).offset(skip).limit(limit).all()
+        )
+        return paginate(query, [MarketplaceItem.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
-    def get_available(self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100) -> List[MarketplaceItem]:
-        return db.query(MarketplaceItem).filter(
+    def get_available(self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[MarketplaceItem]:
+        query = db.query(MarketplaceItem).filter(
             MarketplaceItem.tenant_id == tenant_id,
             MarketplaceItem.status == MarketplaceItemStatus.AVAILABLE
-        ).order_by(MarketplaceItem.created_at.desc()).offset(skip).limit(limit).all()
+        )
+        return paginate(query, [MarketplaceItem.created_at, MarketplaceItem.id], skip=skip, limit=limit, cursor=cursor)
 
     def get_by_seller(self, db: Session, seller_id: int, tenant_id: int) -> List[MarketplaceItem]:
         return db.query(MarketplaceItem).filter(
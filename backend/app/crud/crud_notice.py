@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Notice
 from app.schemas import notice as schemas
 
@@ -17,9 +18,10 @@ def create_notice(db: Session, notice: schemas.NoticeCreate, author_id: int, ten
     db.refresh(db_notice)
     return db_notice
 
-def get_notices(db: Session, tenant_id: int, skip: int = 0, limit: int = 100) -> List[Notice]:
+def get_notices(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Notice]:
     # Could filter by expiry_date > now here
-    return db.query(Notice).filter(Notice.tenant_id == tenant_id).order_by(Notice.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(Notice).filter(Notice.tenant_id == tenant_id)
+    return paginate(query, [Notice.created_at, Notice.id], skip=skip, limit=limit, cursor=cursor)
 
 def get_notice(db: Session, notice_id: int, tenant_id: int) -> Notice:
     return db.query(Notice).filter(Notice.id == notice_id, Notice.tenant_id == tenant_id).first()
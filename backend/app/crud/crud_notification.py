@@ -1,12 +1,14 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.pagination import paginate
 from app.models.all_models import Notification
 from app.schemas.notification import NotificationCreate, NotificationUpdate
 
 class CRUDNotification(CRUDBase[Notification, NotificationCreate, NotificationUpdate]):
-    def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Notification]:
-        return db.query(Notification).filter(Notification.user_id == user_id).order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+    def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Notification]:
+        query = db.query(Notification).filter(Notification.user_id == user_id)
+        return paginate(query, [Notification.created_at, Notification.id], skip=skip, limit=limit, cursor=cursor)
 
     def get_unread_count(self, db: Session, user_id: int) -> int:
         return db.query(Notification).filter(Notification.user_id == user_id, Notification.is_read == False).count()
@@ -0,0 +1,34 @@
+from typing import List, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import AsyncCRUDBase
+from app.crud.pagination import paginate_async
+from app.models.all_models import Notification
+from app.schemas.notification import NotificationCreate, NotificationUpdate
+
+class CRUDNotificationAsync(AsyncCRUDBase[Notification, NotificationCreate, NotificationUpdate]):
+    async def get_by_user(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Notification]:
+        return await paginate_async(
+            db,
+            select(Notification).where(Notification.user_id == user_id),
+            [Notification.created_at, Notification.id],
+            skip=skip, limit=limit, cursor=cursor,
+        )
+
+    async def get_unread_count(self, db: AsyncSession, user_id: int) -> int:
+        result = await db.execute(
+            select(func.count(Notification.id)).where(
+                Notification.user_id == user_id, Notification.is_read == False
+            )
+        )
+        return result.scalar()
+
+    async def mark_all_read(self, db: AsyncSession, user_id: int):
+        await db.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read == False)
+            .values(is_read=True)
+        )
+        await db.commit()
+
+notification = CRUDNotificationAsync(Notification)
@@ -1,20 +1,15 @@
 from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from app.core.code_allocator import PARCEL_PICKUP_CODE, code_allocator
+from app.crud.pagination import paginate
+from app.crud.transitions import transition
 from app.models.all_models import Parcel, ParcelStatus
 from app.schemas import parcel as schemas
-import random
-import string
-
-def generate_pickup_code(length=6):
-    return ''.join(random.choices(string.digits, k=length))
 
 def create_parcel(db: Session, parcel: schemas.ParcelCreate, tenant_id: int) -> Parcel:
-    code = generate_pickup_code()
-    # Ensure unique code (simple check)
-    while db.query(Parcel).filter(Parcel.pickup_code == code, Parcel.status == ParcelStatus.AT_GATE).first():
-        code = generate_pickup_code()
-        
+    code = code_allocator.allocate_one(db, PARCEL_PICKUP_CODE)
+
     db_parcel = Parcel(
         recipient_id=parcel.recipient_id,
         tenant_id=tenant_id,
@@ -29,21 +24,26 @@ def create_parcel(db: Session, parcel: schemas.ParcelCreate, tenant_id: int) ->
     db.refresh(db_parcel)
     return db_parcel
 
-def get_parcels(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, recipient_id: Optional[int] = None, status: Optional[ParcelStatus] = None) -> List[Parcel]:
+def get_parcels(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, recipient_id: Optional[int] = None, status: Optional[ParcelStatus] = None) -> List[Parcel]:
     query = db.query(Parcel).filter(Parcel.tenant_id == tenant_id)
     if recipient_id:
         query = query.filter(Parcel.recipient_id == recipient_id)
     if status:
         query = query.filter(Parcel.status == status)
-    return query.order_by(Parcel.created_at.desc()).offset(skip).limit(limit).all()
+    return paginate(query, [Parcel.created_at, Parcel.id], skip=skip, limit=limit, cursor=cursor)
 
-def update_parcel_status(db: Session, parcel_id: int, status: ParcelStatus, tenant_id: int) -> Optional[Parcel]:
-    db_parcel = db.query(Parcel).filter(Parcel.id == parcel_id, Parcel.tenant_id == tenant_id).first()
-    if db_parcel:
-        db_parcel.status = status
-        if status == ParcelStatus.COLLECTED:
-            db_parcel.collected_at = datetime.now()
-        db.add(db_parcel)
-        db.commit()
-        db.refresh(db_parcel)
-    return db_parcel
+def collect_parcel(db: Session, parcel_id: int, tenant_id: int):
+    """
+    Mark a parcel at the gate as collected in one statement. Returns the updated
+    row, None if there is no such parcel, and raises StateConflict if it has
+    already left the gate. Commits.
+    """
+    row = transition(
+        db, Parcel, Parcel.id == parcel_id,
+        {"status": ParcelStatus.COLLECTED, "collected_at": func.now()},
+        allowed=[ParcelStatus.AT_GATE],
+        tenant_id=tenant_id,
+        conflict="Parcel already collected or returned",
+    )
+    db.commit()
+    return row
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import PatrolLog
 from app.schemas import security as schemas
 
@@ -8,15 +9,12 @@ class CRUDPatrolLog:
         return db.query(PatrolLog).filter(PatrolLog.id == id).first()
 
     def get_multi(
-        self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[PatrolLog]:
-        return (
-            db.query(PatrolLog)
-            .filter(PatrolLog.tenant_id == tenant_id)
-            .order_by(PatrolLog.timestamp.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return paginate(
+            db.query(PatrolLog).filter(PatrolLog.tenant_id == tenant_id),
+            [PatrolLog.timestamp, PatrolLog.id],
+            skip=skip, limit=limit, cursor=cursor,
         )
 
     def create(
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Poll, PollOption, PollVote, PollStatus
 from app.schemas import poll as schemas
 
@@ -25,8 +26,9 @@ def create_poll(db: Session, poll: schemas.PollCreate, created_by_id: int, tenan
     db.refresh(db_poll)
     return db_poll
 
-def get_polls(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, user_id: Optional[int] = None) -> List[Poll]:
-    polls = db.query(Poll).filter(Poll.tenant_id == tenant_id).order_by(Poll.created_at.desc()).offset(skip).limit(limit).all()
+def get_polls(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, user_id: Optional[int] = None) -> List[Poll]:
+    query = db.query(Poll).filter(Poll.tenant_id == tenant_id)
+    polls = paginate(query, [Poll.created_at, Poll.id], skip=skip, limit=limit, cursor=cursor)
     
     if user_id:
         # Check if user has voted for each poll
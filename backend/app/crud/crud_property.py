@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Property
 from app.schemas import property as schemas
 
@@ -8,14 +9,12 @@ class CRUDProperty:
         return db.query(Property).filter(Property.id == id).first()
 
     def get_multi(
-        self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[Property]:
-        return (
-            db.query(Property)
-            .filter(Property.tenant_id == tenant_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return paginate(
+            db.query(Property).filter(Property.tenant_id == tenant_id),
+            [Property.id],
+            skip=skip, limit=limit, cursor=cursor, descending=False,
         )
 
     def create(
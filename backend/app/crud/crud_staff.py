@@ -1,22 +1,14 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.core.code_allocator import STAFF_ACCESS_CODE, code_allocator
 from app.crud.base import CRUDBase
+from app.crud.pagination import paginate
 from app.models.all_models import Staff, StaffAttendance, StaffStatus
 from app.schemas.staff import StaffCreate, StaffUpdate, StaffAttendanceCreate, StaffAttendanceUpdate
 from datetime import datetime
-import random
-import string
-
-def generate_access_code(length=6):
-    return ''.join(random.choices(string.digits, k=length))
-
 class CRUDStaff(CRUDBase[Staff, StaffCreate, StaffUpdate]):
     def create_staff(self, db: Session, *, staff: StaffCreate, tenant_id: int) -> Staff:
-        # Generate unique access code
-        while True:
-            code = generate_access_code()
-            if not db.query(Staff).filter(Staff.access_code == code).first():
-                break
+        code = code_allocator.allocate_one(db, STAFF_ACCESS_CODE)
         
         db_obj = Staff(
             full_name=staff.full_name,
@@ -59,15 +51,16 @@ class CRUDStaffAttendance(CRUDBase[StaffAttendance, StaffAttendanceCreate, Staff
         db.refresh(db_obj)
         return db_obj
 
-    def get_attendance_by_staff(self, db: Session, staff_id: int, skip: int = 0, limit: int = 100) -> List[StaffAttendance]:
-        return db.query(StaffAttendance).filter(StaffAttendance.staff_id == staff_id).offset(skip).limit(limit).all()
+    def get_attendance_by_staff(self, db: Session, staff_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[StaffAttendance]:
+        query = db.query(StaffAttendance).filter(StaffAttendance.staff_id == staff_id)
+        return paginate(query, [StaffAttendance.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
-    def get_all_attendance(self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100, start_date: datetime = None, end_date: datetime = None) -> List[StaffAttendance]:
+    def get_all_attendance(self, db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, start_date: datetime = None, end_date: datetime = None) -> List[StaffAttendance]:
         query = db.query(StaffAttendance).join(Staff).filter(Staff.tenant_id == tenant_id)
         if start_date:
-            query = query.filter(StaffAttendance.check_in_time >= start_date)
+            query = query.filter(StaffAttendance.check_in >= start_date)
         if end_date:
-            query = query.filter(StaffAttendance.check_in_time <= end_date)
-        return query.order_by(StaffAttendance.check_in_time.desc()).offset(skip).limit(limit).all()
+            query = query.filter(StaffAttendance.check_in <= end_date)
+        return paginate(query, [StaffAttendance.check_in, StaffAttendance.id], skip=skip, limit=limit, cursor=cursor)
 
 staff_attendance = CRUDStaffAttendance(StaffAttendance)
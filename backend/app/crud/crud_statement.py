@@ -0,0 +1,120 @@
+"""
+Resident financial statements.
+
+The ledger is built in one query: bills (debits) and verified payments (credits)
+are combined with UNION ALL, and a window sum per resident gives the running
+balance after every entry. Entries before `start` are excluded from the output
+but still count towards the balance, so the first row carries the opening
+balance forward. Bills with an outstanding amount are aged against `as_of`.
+
+`stream_statement` reads the result from a server-side cursor on its own
+connection, a batch at a time, so a statement of any length is served in
+constant memory.
+"""
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import case, func, literal, null, or_, select, union_all
+from sqlalchemy.engine import Row
+
+from app.crud.crud_financial import aging_conditions
+from app.db.session import async_engine
+from app.models.all_models import Bill, Payment, PaymentStatus, User
+
+COLUMNS = [
+    "resident_id", "resident_name", "entry_date", "entry_type", "entry_id", "bill_id",
+    "description", "debit", "credit", "balance", "due_date", "outstanding", "aging_bucket",
+]
+
+def statement_query(
+    tenant_id: int,
+    resident_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    as_of: Optional[datetime] = None,
+):
+    """Ledger rows in COLUMNS order, per resident and in date order."""
+    as_of = as_of or datetime.now(timezone.utc)
+    payment_resident = func.coalesce(Bill.resident_id, Payment.user_id)
+
+    bills = select(
+        Bill.resident_id.label("resident_id"),
+        Bill.created_at.label("entry_date"),
+        literal("bill").label("entry_type"),
+        literal(0).label("entry_order"),
+        Bill.id.label("entry_id"),
+        Bill.id.label("bill_id"),
+        Bill.description.label("description"),
+        Bill.amount.label("debit"),
+        literal(0).label("credit"),
+        Bill.due_date.label("due_date"),
+        Bill.outstanding.label("outstanding"),
+    ).where(Bill.tenant_id == tenant_id)
+    payments = (
+        select(
+            payment_resident,
+            Payment.created_at,
+            literal("payment"),
+            literal(1),
+            Payment.id,
+            Payment.bill_id,
+            func.coalesce(Payment.reference, "Payment"),
+            literal(0),
+            Payment.amount,
+            null(),
+            null(),
+        )
+        .select_from(Payment)
+        .outerjoin(Bill, Bill.id == Payment.bill_id)
+        .where(Payment.tenant_id == tenant_id, Payment.status == PaymentStatus.VERIFIED)
+    )
+    if resident_id is not None:
+        bills = bills.where(Bill.resident_id == resident_id)
+        payments = payments.where(payment_resident == resident_id)
+
+    entries = union_all(bills, payments).subquery("entries")
+    entry_order = (entries.c.entry_date, entries.c.entry_order, entries.c.entry_id)
+    ledger = select(
+        entries,
+        func.sum(entries.c.debit - entries.c.credit).over(
+            partition_by=entries.c.resident_id, order_by=entry_order, rows=(None, 0),
+        ).label("balance"),
+    ).subquery("ledger")
+
+    aging_bucket = case(
+        (or_(ledger.c.entry_type != "bill", ledger.c.outstanding <= 0), null()),
+        *((condition, bucket) for bucket, condition in aging_conditions(ledger.c.due_date, as_of)),
+    )
+    stmt = (
+        select(
+            ledger.c.resident_id,
+            User.full_name.label("resident_name"),
+            ledger.c.entry_date,
+            ledger.c.entry_type,
+            ledger.c.entry_id,
+            ledger.c.bill_id,
+            ledger.c.description,
+            ledger.c.debit,
+            ledger.c.credit,
+            ledger.c.balance,
+            ledger.c.due_date,
+            ledger.c.outstanding,
+            aging_bucket.label("aging_bucket"),
+        )
+        .select_from(ledger)
+        .outerjoin(User, User.id == ledger.c.resident_id)
+        .order_by(ledger.c.resident_id, ledger.c.entry_date, ledger.c.entry_order, ledger.c.entry_id)
+    )
+    if start is not None:
+        stmt = stmt.where(ledger.c.entry_date >= start)
+    if end is not None:
+        stmt = stmt.where(ledger.c.entry_date <= end)
+    return stmt
+
+
+async def stream_statement(stmt, batch_size: int) -> AsyncIterator[List[Row]]:
+    """Yield the statement's rows in batches of up to batch_size."""
+    async with async_engine.connect() as conn:
+        result = await conn.stream(stmt)
+        async for rows in result.partitions(batch_size):
+            yield rows
@@ -0,0 +1,10 @@
+from typing import Any, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import crud_tenant_counter
+
+async def get_dashboard_counts(db: AsyncSession, tenant_id: int) -> Dict[str, Any]:
+    """
+    Dashboard counts from the tenant's counter row: one primary-key read.
+    """
+    counter = await crud_tenant_counter.get_counter_async(db, tenant_id)
+    return crud_tenant_counter.as_dashboard(crud_tenant_counter.counter_values(counter))
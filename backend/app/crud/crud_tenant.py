@@ -1,5 +1,7 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
+from app.core.principal_cache import principal_cache
 from app.models.all_models import Tenant
 from app.schemas.tenant import TenantCreate, TenantUpdate
 
@@ -12,8 +14,8 @@ def get_by_slug(db: Session, slug: str) -> Optional[Tenant]:
     return db.query(Tenant).filter(Tenant.slug == slug).first()
 
 
-def get_multi(db: Session, skip: int = 0, limit: int = 100) -> List[Tenant]:
-    return db.query(Tenant).offset(skip).limit(limit).all()
+def get_multi(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Tenant]:
+    return paginate(db.query(Tenant), [Tenant.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 
 def create(db: Session, obj_in: TenantCreate) -> Tenant:
@@ -44,6 +46,7 @@ def update(db: Session, *, db_obj: Tenant, obj_in: TenantUpdate) -> Tenant:
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    principal_cache.invalidate_tenant(db_obj.id)
     return db_obj
 
 
@@ -51,5 +54,6 @@ def remove(db: Session, *, id: int) -> Tenant:
     obj = db.query(Tenant).get(id)
     db.delete(obj)
     db.commit()
+    principal_cache.invalidate_tenant(id)
     return obj
 
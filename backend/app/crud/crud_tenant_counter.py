@@ -0,0 +1,271 @@
+"""
+Per-tenant dashboard counters.
+
+Every ORM flush that creates, deletes or changes the status of a visitor,
+incident, bill or ticket adjusts the tenant's `tenant_counters` row in the same
+transaction. Writes that bypass the ORM (Core UPDATE/INSERT ... SELECT) must call
+`record_counter_deltas` themselves. `reconcile_tenant` recomputes a row from the
+source tables with one FILTER-aggregate statement to correct any drift.
+
+Functions registered with `on_commit` receive each committed transaction's
+deltas, and the corrections a reconcile made, e.g. to refresh open dashboards.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.all_models import (
+    Bill, BillStatus, Incident, IncidentStatus, Tenant, TenantCounter,
+    Ticket, TicketStatus, Visitor, VisitorStatus,
+)
+
+# counter -> (model, statuses counted; None counts every row)
+COUNTERS = {
+    "visitors_total": (Visitor, None),
+    "visitors_active": (Visitor, {VisitorStatus.CHECKED_IN}),
+    "visitors_pending": (Visitor, {VisitorStatus.EXPECTED}),
+    "incidents_open": (Incident, {IncidentStatus.OPEN}),
+    "bills_pending": (Bill, {BillStatus.UNPAID}),
+    "tickets_open": (Ticket, {TicketStatus.OPEN, TicketStatus.IN_PROGRESS}),
+}
+TRACKED_MODELS = (Visitor, Incident, Bill, Ticket)
+
+# counter -> (section, key) in the /stats/dashboard response
+DASHBOARD_KEYS = {
+    "visitors_total": ("visitors", "total"),
+    "visitors_active": ("visitors", "active"),
+    "visitors_pending": ("visitors", "pending"),
+    "incidents_open": ("incidents", "open"),
+    "bills_pending": ("financial", "pending_bills"),
+    "tickets_open": ("maintenance", "open_tickets"),
+}
+
+Deltas = Dict[int, Dict[str, int]]
+
+_commit_listeners: List[Callable[[Deltas], None]] = []
+
+
+def _status_value(status: Any) -> Optional[str]:
+    if status is None:
+        return None
+    return str(getattr(status, "value", status)).lower()
+
+
+def _membership(model: type, status: Any) -> Dict[str, int]:
+    value = _status_value(status)
+    counts = {}
+    for name, (counted_model, statuses) in COUNTERS.items():
+        if counted_model is model:
+            counts[name] = int(statuses is None or value in {s.value for s in statuses})
+    return counts
+
+
+def transition_deltas(model: type, old_status: Any, new_status: Any, created: bool = False, deleted: bool = False) -> Dict[str, int]:
+    """Counter changes for one row moving from old_status to new_status."""
+    before = {} if created else _membership(model, old_status)
+    after = {} if deleted else _membership(model, new_status)
+    deltas = {}
+    for name in set(before) | set(after):
+        delta = after.get(name, 0) - before.get(name, 0)
+        if delta:
+            deltas[name] = delta
+    return deltas
+
+
+def _add(total: Deltas, tenant_id: Optional[int], deltas: Dict[str, int]):
+    if tenant_id is None:
+        return
+    for name, delta in deltas.items():
+        total[tenant_id][name] += delta
+
+
+def apply_counter_deltas(connection: Connection, deltas: Deltas) -> None:
+    """
+    Add deltas to existing counter rows. Tenants are updated in id order so
+    concurrent writers cannot deadlock; tenants without a row are skipped and get
+    one, fully counted, on their next dashboard read.
+    """
+    table = TenantCounter.__table__
+    for tenant_id in sorted(deltas):
+        values = {name: table.c[name] + delta for name, delta in deltas[tenant_id].items() if delta}
+        if values:
+            connection.execute(table.update().where(table.c.tenant_id == tenant_id).values(values))
+
+
+def _default_status(obj: Any) -> Any:
+    default = type(obj).__table__.c.status.default
+    return default.arg if default is not None else None
+
+
+@event.listens_for(Session, "before_flush")
+def _track_counter_changes(session: Session, flush_context, instances):
+    deltas: Deltas = defaultdict(lambda: defaultdict(int))
+    for obj in session.new:
+        if isinstance(obj, TRACKED_MODELS):
+            status = obj.status if obj.status is not None else _default_status(obj)
+            _add(deltas, obj.tenant_id, transition_deltas(type(obj), None, status, created=True))
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED_MODELS):
+            _add(deltas, obj.tenant_id, transition_deltas(type(obj), obj.status, None, deleted=True))
+    for obj in session.dirty:
+        if isinstance(obj, TRACKED_MODELS):
+            history = inspect(obj).attrs.status.history
+            if history.added and history.deleted:
+                _add(deltas, obj.tenant_id, transition_deltas(type(obj), history.deleted[0], history.added[0]))
+    if deltas:
+        record_counter_deltas(session, deltas)
+
+
+def record_counter_deltas(session: Session, deltas: Deltas) -> None:
+    """
+    Apply deltas in the session's transaction and publish them to `on_commit`
+    listeners once it commits. For Core writes; ORM flushes do this themselves.
+    """
+    apply_counter_deltas(session.connection(), deltas)
+    pending = session.info.setdefault("tenant_counter_deltas", defaultdict(lambda: defaultdict(int)))
+    for tenant_id, changes in deltas.items():
+        for name, delta in changes.items():
+            pending[tenant_id][name] += delta
+
+
+def on_commit(listener: Callable[[Deltas], None]) -> None:
+    """Call listener with the counter deltas of every committed transaction."""
+    _commit_listeners.append(listener)
+
+
+def _notify(deltas: Deltas) -> None:
+    if not deltas:
+        return
+    for listener in _commit_listeners:
+        listener(deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_deltas(session: Session):
+    _notify(session.info.pop("tenant_counter_deltas", None))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_deltas(session: Session):
+    session.info.pop("tenant_counter_deltas", None)
+
+
+def _load_prior_status(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history makes a status assignment load the previous value first, so the
+# flush above always knows which counter a row is leaving.
+for _model in TRACKED_MODELS:
+    event.listen(_model.status, "set", _load_prior_status, active_history=True)
+
+
+def _filter(statuses: Set[Any]) -> str:
+    values = ", ".join(f"'{s.value}'" for s in statuses)
+    return f"count(*) FILTER (WHERE lower(status::text) IN ({values}))"
+
+
+ENSURE_ROW = text(
+    "INSERT INTO tenant_counters (tenant_id, visitors_total, visitors_active, visitors_pending, "
+    "incidents_open, bills_pending, tickets_open) VALUES (:tenant_id, 0, 0, 0, 0, 0, 0) "
+    "ON CONFLICT (tenant_id) DO NOTHING"
+)
+
+_COLUMNS = ", ".join(COUNTERS)
+
+LOCK_ROW = text(f"SELECT {_COLUMNS} FROM tenant_counters WHERE tenant_id = :tenant_id FOR UPDATE")
+
+RECOUNT = text(f"""
+    UPDATE tenant_counters SET
+        visitors_total = v.total,
+        visitors_active = v.active,
+        visitors_pending = v.pending,
+        incidents_open = i.open,
+        bills_pending = b.pending,
+        tickets_open = t.open,
+        reconciled_at = now()
+    FROM
+        (SELECT count(*) AS total,
+                {_filter(COUNTERS["visitors_active"][1])} AS active,
+                {_filter(COUNTERS["visitors_pending"][1])} AS pending
+         FROM visitors WHERE tenant_id = :tenant_id) AS v,
+        (SELECT {_filter(COUNTERS["incidents_open"][1])} AS open
+         FROM incidents WHERE tenant_id = :tenant_id) AS i,
+        (SELECT {_filter(COUNTERS["bills_pending"][1])} AS pending
+         FROM bills WHERE tenant_id = :tenant_id) AS b,
+        (SELECT {_filter(COUNTERS["tickets_open"][1])} AS open
+         FROM tickets WHERE tenant_id = :tenant_id) AS t
+    WHERE tenant_counters.tenant_id = :tenant_id
+    RETURNING {_COLUMNS}
+""")
+
+
+def _corrections(tenant_id: int, before, after) -> Deltas:
+    changes = {name: after[name] - before[name] for name in COUNTERS if after[name] != before[name]}
+    return {tenant_id: changes} if changes else {}
+
+
+def reconcile_tenant(db: Session, tenant_id: int) -> None:
+    """
+    Recount one tenant. The row is created and committed first so concurrent
+    writers start adjusting it; the recount then runs under the row lock, after
+    every writer that already touched it has committed. Any correction goes to
+    the `on_commit` listeners like an ordinary change.
+    """
+    params = {"tenant_id": tenant_id}
+    db.execute(ENSURE_ROW, params)
+    db.commit()
+    before = db.execute(LOCK_ROW, params).mappings().one()
+    after = db.execute(RECOUNT, params).mappings().one()
+    db.commit()
+    _notify(_corrections(tenant_id, before, after))
+
+
+async def reconcile_tenant_async(db: AsyncSession, tenant_id: int) -> None:
+    params = {"tenant_id": tenant_id}
+    await db.execute(ENSURE_ROW, params)
+    await db.commit()
+    before = (await db.execute(LOCK_ROW, params)).mappings().one()
+    after = (await db.execute(RECOUNT, params)).mappings().one()
+    await db.commit()
+    _notify(_corrections(tenant_id, before, after))
+
+
+def reconcile_all(db: Session) -> int:
+    """Recount every tenant, one short transaction each. Returns the number of tenants."""
+    tenant_ids: List[int] = db.execute(select(Tenant.id).order_by(Tenant.id)).scalars().all()
+    for tenant_id in tenant_ids:
+        reconcile_tenant(db, tenant_id)
+    return len(tenant_ids)
+
+
+def as_dashboard(counts: Dict[str, int]) -> Dict[str, Any]:
+    """Shape counter values (or deltas) like the /stats/dashboard response."""
+    dashboard: Dict[str, Any] = {}
+    for name, value in counts.items():
+        section, key = DASHBOARD_KEYS[name]
+        dashboard.setdefault(section, {})[key] = value
+    return dashboard
+
+
+def counter_values(counter: TenantCounter) -> Dict[str, int]:
+    return {name: getattr(counter, name) for name in DASHBOARD_KEYS}
+
+
+async def get_counters_async(db: AsyncSession, tenant_ids: List[int]) -> List[TenantCounter]:
+    """Existing counter rows of these tenants, in one query."""
+    query = select(TenantCounter).where(TenantCounter.tenant_id.in_(tenant_ids))
+    return (await db.execute(query)).scalars().all()
+
+
+async def get_counter_async(db: AsyncSession, tenant_id: int) -> TenantCounter:
+    query = select(TenantCounter).where(TenantCounter.tenant_id == tenant_id)
+    counter = (await db.execute(query)).scalars().first()
+    if counter is None:
+        await reconcile_tenant_async(db, tenant_id)
+        counter = (await db.execute(query)).scalars().first()
+    return counter
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Ticket, TicketStatus
 from app.schemas import ticket as schemas
 
@@ -25,6 +26,7 @@ def get_tickets(
     tenant_id: int,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     created_by_id: Optional[int] = None,
     assigned_to_id: Optional[int] = None
 ) -> List[Ticket]:
@@ -33,7 +35,7 @@ def get_tickets(
         query = query.filter(Ticket.created_by_id == created_by_id)
     if assigned_to_id:
         query = query.filter(Ticket.assigned_to_id == assigned_to_id)
-    return query.order_by(Ticket.created_at.desc()).offset(skip).limit(limit).all()
+    return paginate(query, [Ticket.created_at, Ticket.id], skip=skip, limit=limit, cursor=cursor)
 
 def get_ticket(db: Session, ticket_id: int, tenant_id: int) -> Optional[Ticket]:
     return db.query(Ticket).filter(Ticket.id == ticket_id, Ticket.tenant_id == tenant_id).first()
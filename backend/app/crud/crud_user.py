@@ -1,6 +1,8 @@
 from typing import Optional, List, Union, Dict, Any
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.core.security import get_password_hash, verify_password
+from app.core.principal_cache import principal_cache
 from app.models.all_models import User
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -10,13 +12,13 @@ def get_by_email(db: Session, email: str) -> Optional[User]:
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
-def get_multi(db: Session, skip: int = 0, limit: int = 100, role: Optional[str] = None, tenant_id: Optional[int] = None) -> List[User]:
+def get_multi(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, role: Optional[str] = None, tenant_id: Optional[int] = None) -> List[User]:
     query = db.query(User)
     if role:
         query = query.filter(User.role == role)
     if tenant_id is not None:
         query = query.filter(User.tenant_id == tenant_id)
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, [User.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 def create(db: Session, obj_in: UserCreate) -> User:
     db_obj = User(
@@ -51,6 +53,7 @@ def update(db: Session, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]])
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    principal_cache.invalidate(db_obj.id)
     return db_obj
 
 def authenticate(db: Session, email: str, password: str) -> Optional[User]:
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import paginate
 from app.models.all_models import Vehicle
 from app.schemas import vehicle as schemas
 
@@ -18,11 +19,11 @@ def create_vehicle(db: Session, vehicle: schemas.VehicleCreate, user_id: int, te
     db.refresh(db_vehicle)
     return db_vehicle
 
-def get_vehicles(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, user_id: Optional[int] = None) -> List[Vehicle]:
+def get_vehicles(db: Session, tenant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, user_id: Optional[int] = None) -> List[Vehicle]:
     query = db.query(Vehicle).filter(Vehicle.tenant_id == tenant_id)
     if user_id:
         query = query.filter(Vehicle.user_id == user_id)
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, [Vehicle.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 def get_vehicle_by_plate(db: Session, license_plate: str) -> Optional[Vehicle]:
     return db.query(Vehicle).filter(Vehicle.license_plate == license_plate).first()
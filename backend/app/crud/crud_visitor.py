@@ -1,20 +1,24 @@
-from typing import Optional
+from typing import Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert
+from app.core.code_allocator import VISITOR_ACCESS_CODE, code_allocator
+from app.crud.crud_tenant_counter import record_counter_deltas, transition_deltas
+from app.crud.pagination import paginate
 from app.models.all_models import Visitor, VisitorStatus, User
 from app.schemas.visitor import VisitorCreate, VisitorUpdate
-import uuid
 
 def get_visitor(db: Session, visitor_id: int):
     return db.query(Visitor).filter(Visitor.id == visitor_id).first()
 
-def get_visitors_by_host(db: Session, host_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Visitor).filter(Visitor.host_id == host_id).offset(skip).limit(limit).all()
+def get_visitors_by_host(db: Session, host_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    query = db.query(Visitor).filter(Visitor.host_id == host_id)
+    return paginate(query, [Visitor.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 def get_all_visitors(
     db: Session, 
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -35,14 +39,14 @@ def get_all_visitors(
     if tenant_id is not None:
         query = query.filter(Visitor.tenant_id == tenant_id)
         
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, [Visitor.id], skip=skip, limit=limit, cursor=cursor, descending=False)
 
 def get_visitor_by_access_code(db: Session, access_code: str):
     return db.query(Visitor).filter(Visitor.access_code == access_code).first()
 
 def create_visitor(db: Session, visitor: VisitorCreate, tenant_id: int):
-    # Generate a unique access code (e.g., for QR)
-    access_code = str(uuid.uuid4())[:8].upper()
+    # Unique, non-guessable access code (e.g., for QR)
+    access_code = code_allocator.allocate_one(db, VISITOR_ACCESS_CODE)
     
     db_visitor = Visitor(
         full_name=visitor.full_name,
@@ -60,6 +64,31 @@ def create_visitor(db: Session, visitor: VisitorCreate, tenant_id: int):
     db.refresh(db_visitor)
     return db_visitor
 
+def create_visitors_bulk(db: Session, visitors: Sequence[VisitorCreate], tenant_id: int, access_codes: Sequence[str]):
+    """
+    Insert pre-registered visitors with one multi-row INSERT ... RETURNING and
+    record their counter deltas. Returns (id, access_code, created_at) rows in the
+    order given; the caller commits.
+    """
+    if not visitors:
+        return []
+    rows = [
+        {
+            **visitor.model_dump(),
+            "tenant_id": tenant_id,
+            "access_code": access_code,
+            "status": VisitorStatus.EXPECTED,
+        }
+        for visitor, access_code in zip(visitors, access_codes)
+    ]
+    stmt = insert(Visitor).returning(
+        Visitor.id, Visitor.access_code, Visitor.created_at, sort_by_parameter_order=True
+    )
+    created = db.execute(stmt, rows).all()
+    deltas = transition_deltas(Visitor, None, VisitorStatus.EXPECTED, created=True)
+    record_counter_deltas(db, {tenant_id: {name: delta * len(created) for name, delta in deltas.items()}})
+    return created
+
 def update_visitor(db: Session, db_visitor: Visitor, visitor_update: VisitorUpdate, tenant_id: int = None):
     # Optional tenant verification if provided
     if tenant_id and db_visitor.tenant_id != tenant_id:
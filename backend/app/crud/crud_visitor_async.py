@@ -0,0 +1,102 @@
+from typing import List, Optional
+from sqlalchemy import func, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.pagination import paginate_async
+from app.crud.transitions import transition_async
+from app.models.all_models import Visitor, VisitorStatus
+
+async def get_visitor(db: AsyncSession, visitor_id: int) -> Optional[Visitor]:
+    return await db.get(Visitor, visitor_id)
+
+async def get_visitors_by_host(
+    db: AsyncSession, host_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Visitor]:
+    return await paginate_async(
+        db, select(Visitor).where(Visitor.host_id == host_id), [Visitor.id],
+        skip=skip, limit=limit, cursor=cursor, descending=False,
+    )
+
+async def get_all_visitors(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    tenant_id: Optional[int] = None,
+) -> List[Visitor]:
+    query = select(Visitor)
+
+    if status:
+        query = query.where(Visitor.status == status)
+
+    if start_date:
+        query = query.where(Visitor.created_at >= start_date)
+
+    if end_date:
+        query = query.where(Visitor.created_at <= end_date)
+
+    # Enforce tenant isolation via tenant_id directly
+    if tenant_id is not None:
+        query = query.where(Visitor.tenant_id == tenant_id)
+
+    return await paginate_async(db, query, [Visitor.id], skip=skip, limit=limit, cursor=cursor, descending=False)
+
+async def get_visitor_by_access_code(db: AsyncSession, access_code: str) -> Optional[Visitor]:
+    result = await db.execute(select(Visitor).where(Visitor.access_code == access_code))
+    return result.scalars().first()
+
+# Check-in/out refuse only a repeat of the same move, as before
+CHECK_IN_FROM = [None] + [status for status in VisitorStatus if status != VisitorStatus.CHECKED_IN]
+CHECK_OUT_FROM = [None] + [status for status in VisitorStatus if status != VisitorStatus.CHECKED_OUT]
+
+async def check_in(
+    db: AsyncSession, where, tenant_id: Optional[int] = None, items_carried_in: Optional[str] = None
+) -> Optional[Row]:
+    """
+    Check in the visitor matching `where` in one statement. Returns the updated
+    row, or None if there is no such visitor; raises TransitionRejected if the
+    access code has expired and StateConflict if already checked in. The caller
+    commits.
+    """
+    return await transition_async(
+        db, Visitor, where,
+        {
+            "status": VisitorStatus.CHECKED_IN,
+            "check_in_time": func.now(),
+            "items_carried_in": func.coalesce(items_carried_in, Visitor.items_carried_in),
+        },
+        allowed=CHECK_IN_FROM,
+        tenant_id=tenant_id,
+        guards=[(or_(Visitor.valid_until.is_(None), Visitor.valid_until >= func.now()), "Access code has expired")],
+        conflict="Visitor already checked in",
+    )
+
+async def check_in_visitor(
+    db: AsyncSession, visitor_id: int, tenant_id: Optional[int] = None, items_carried_in: Optional[str] = None
+) -> Optional[Row]:
+    return await check_in(db, Visitor.id == visitor_id, tenant_id, items_carried_in)
+
+async def admit_by_access_code(
+    db: AsyncSession, access_code: str, tenant_id: int, items_carried_in: Optional[str] = None
+) -> Optional[Row]:
+    """Look up, check and check in a visitor by access code in one statement."""
+    return await check_in(db, Visitor.access_code == access_code, tenant_id, items_carried_in)
+
+async def check_out_visitor(
+    db: AsyncSession, visitor_id: int, tenant_id: Optional[int] = None, items_carried_out: Optional[str] = None
+) -> Optional[Row]:
+    """As `check_in`, for check-out; raises StateConflict if already checked out."""
+    return await transition_async(
+        db, Visitor, Visitor.id == visitor_id,
+        {
+            "status": VisitorStatus.CHECKED_OUT,
+            "check_out_time": func.now(),
+            "items_carried_out": func.coalesce(items_carried_out, Visitor.items_carried_out),
+        },
+        allowed=CHECK_OUT_FROM,
+        tenant_id=tenant_id,
+        conflict="Visitor already checked out",
+    )
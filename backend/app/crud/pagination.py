@@ -0,0 +1,108 @@
+"""
+Keyset (cursor) pagination shared by CRUDBase and the function-style CRUD modules.
+
+A list is ordered by a sort key that ends in a unique column, e.g.
+(created_at, id). The cursor is the opaque, URL-safe encoding of the last row's
+key; the next page is `WHERE (created_at, id) < (:created_at, :id)`, which a
+matching composite index serves directly however deep the page. Without a
+cursor, `skip` still works as a plain OFFSET for existing clients.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(list):
+    """A list of rows that also carries the cursor of the following page, if any."""
+
+    def __init__(self, items: Sequence[Any] = (), next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_json_value(v) for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: Sequence[Any]) -> List[Any]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(order_by):
+            raise ValueError("wrong number of values")
+        values = []
+        for column, value in zip(order_by, raw):
+            python_type = column.type.python_type
+            if value is None:
+                values.append(None)
+            elif python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                values.append(date.fromisoformat(value))
+            elif python_type is Decimal:
+                values.append(Decimal(str(value)))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, NotImplementedError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+def keyset(
+    query: Any,
+    order_by: Sequence[Any],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> Any:
+    """
+    Order a Query or select() by `order_by` and restrict it to the page after
+    `cursor` (or from `skip`). Fetches one extra row to detect a further page;
+    pass the rows to `to_page`.
+    """
+    if cursor:
+        key = tuple_(*order_by)
+        values = tuple_(*(literal(v, column.type) for column, v in zip(order_by, decode_cursor(cursor, order_by))))
+        query = query.filter(key < values if descending else key > values)
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in order_by))
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def to_page(rows: Sequence[Any], order_by: Sequence[Any], limit: int) -> Page:
+    if len(rows) <= limit:
+        return Page(rows)
+    last = rows[limit - 1]
+    return Page(rows[:limit], encode_cursor([getattr(last, column.key) for column in order_by]))
+
+
+def paginate(query: Any, order_by: Sequence[Any], **kwargs: Any) -> Page:
+    """Run a legacy Query one page at a time. Keyword arguments as for `keyset`."""
+    limit = kwargs.get("limit", 100)
+    return to_page(keyset(query, order_by, **kwargs).all(), order_by, limit)
+
+
+async def paginate_async(db: AsyncSession, stmt: Any, order_by: Sequence[Any], **kwargs: Any) -> Page:
+    limit = kwargs.get("limit", 100)
+    result = await db.execute(keyset(stmt, order_by, **kwargs))
+    return to_page(result.scalars().all(), order_by, limit)
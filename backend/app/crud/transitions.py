@@ -0,0 +1,121 @@
+"""
+Status transitions as single conditional statements.
+
+A transition locks the target row, checks its current status and any guards,
+applies the update and returns the updated row, all in one
+`WITH target AS (SELECT ... FOR UPDATE), changed AS (UPDATE ... RETURNING)`
+round-trip. Two concurrent requests for the same transition cannot both win:
+the second waits on the row lock, then sees the new status and gets a
+StateConflict (409). Dashboard counters are adjusted for tracked models, since
+Core updates skip the flush hook that normally does it; the caller commits.
+"""
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.crud_tenant_counter import TRACKED_MODELS, record_counter_deltas, transition_deltas
+
+# (condition on the current row, detail returned with a 400 when it is false)
+Guard = Tuple[Any, str]
+
+
+class TransitionRejected(Exception):
+    status_code = 400
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class StateConflict(TransitionRejected):
+    """The row is not in a status the transition can start from."""
+    status_code = 409
+
+
+def _statement(model: type, where: Any, values: Dict[str, Any], allowed: Iterable[Any], tenant_id: Optional[int], guards: Sequence[Guard]):
+    allowed = list(allowed)
+    conditions = [where] if tenant_id is None else [where, model.tenant_id == tenant_id]
+    target = (
+        select(
+            model.id,
+            model.status.label("previous_status"),
+            *(condition.label(f"guard_{i}") for i, (condition, _) in enumerate(guards)),
+        )
+        .where(*conditions)
+        .with_for_update(of=model)
+        .cte("target")
+    )
+    status_allowed = model.status.in_([status for status in allowed if status is not None])
+    if None in allowed:
+        status_allowed = or_(model.status.is_(None), status_allowed)
+    changed = (
+        update(model)
+        .where(model.id == target.c.id, status_allowed, *(target.c[f"guard_{i}"] for i in range(len(guards))))
+        .values(values)
+        .returning(*model.__table__.c)
+        .cte("changed")
+    )
+    return select(
+        target.c.previous_status,
+        *(target.c[f"guard_{i}"] for i in range(len(guards))),
+        changed,
+    ).select_from(target.outerjoin(changed, changed.c.id == target.c.id))
+
+
+def _outcome(model: type, row: Optional[Row], guards: Sequence[Guard], conflict: Optional[str]) -> Optional[Dict[int, Dict[str, int]]]:
+    """Raise for a refused transition; otherwise the counter deltas to record, if any."""
+    if row is None or row.id is not None:
+        if row is None or model not in TRACKED_MODELS:
+            return None
+        return {row.tenant_id: transition_deltas(model, row.previous_status, row.status)}
+    for i, (_, detail) in enumerate(guards):
+        if not row._mapping[f"guard_{i}"]:
+            raise TransitionRejected(detail)
+    previous = getattr(row.previous_status, "value", row.previous_status)
+    raise StateConflict(conflict or f"{model.__name__} is {previous}")
+
+
+def transition(
+    db: Session,
+    model: type,
+    where: Any,
+    values: Dict[str, Any],
+    *,
+    allowed: Iterable[Any],
+    tenant_id: Optional[int] = None,
+    guards: Sequence[Guard] = (),
+    conflict: Optional[str] = None,
+) -> Optional[Row]:
+    """
+    Update the row matching `where` (and tenant_id) with `values` if its status is
+    in `allowed` and every guard holds. Returns the updated row, None if no row
+    matches, and raises TransitionRejected for a failed guard or StateConflict
+    (with `conflict` as the detail) for a disallowed status.
+    """
+    row = db.execute(_statement(model, where, values, allowed, tenant_id, guards)).first()
+    deltas = _outcome(model, row, guards, conflict)
+    if deltas:
+        record_counter_deltas(db, deltas)
+    return row
+
+
+async def transition_async(
+    db: AsyncSession,
+    model: type,
+    where: Any,
+    values: Dict[str, Any],
+    *,
+    allowed: Iterable[Any],
+    tenant_id: Optional[int] = None,
+    guards: Sequence[Guard] = (),
+    conflict: Optional[str] = None,
+) -> Optional[Row]:
+    """As `transition`, on an AsyncSession."""
+    row = (await db.execute(_statement(model, where, values, allowed, tenant_id, guards))).first()
+    deltas = _outcome(model, row, guards, conflict)
+    if deltas:
+        await db.run_sync(lambda session: record_counter_deltas(session, deltas))
+    return row
@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+
+class PoolMetrics:
+    """
+    Checkout wait time and in-use counts for one engine's connection pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def _checked_out(self, *args) -> None:
+        with self._lock:
+            self.in_use += 1
+
+    def _checked_in(self, *args) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def bind(self, engine: Engine) -> None:
+        event.listen(engine, "checkout", self._checked_out)
+        event.listen(engine, "checkin", self._checked_in)
+
+    def snapshot(self, pool: Pool) -> Dict[str, float]:
+        with self._lock:
+            data = {
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": (self.wait_seconds_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "wait_ms_max": self.wait_seconds_max * 1000,
+            }
+        if hasattr(pool, "size"):
+            data["pool_size"] = pool.size()
+            data["overflow"] = pool.overflow()
+            data["idle"] = pool.checkedin()
+        return data
+
+
+def timed_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Subclass `base` so every checkout records how long it waited for a connection.
+    A subclass (rather than an attribute on the pool) survives Pool.recreate().
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
@@ -1,10 +1,51 @@
+import uuid
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.core.config import settings
+from app.db.pool_metrics import async_pool_metrics, sync_pool_metrics, timed_pool_class
 
-engine = create_engine(settings.DATABASE_URL)
+def _engine_options(queue_pool, metrics) -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer owns pooling; each checkout is a fresh (cheap) PgBouncer connection
+        return {"poolclass": timed_pool_class(NullPool, metrics)}
+    return {
+        "poolclass": timed_pool_class(queue_pool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _async_connect_args() -> dict:
+    if settings.DB_PGBOUNCER_MODE and settings.ASYNC_DATABASE_URL.startswith("postgresql+asyncpg"):
+        # Transaction pooling hands each transaction a different server connection,
+        # so asyncpg must not cache or reuse named prepared statements.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {}
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(QueuePool, sync_pool_metrics))
+sync_pool_metrics.bind(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async stack for endpoints that run on the event loop instead of the threadpool.
+# expire_on_commit=False so committed objects can still be serialized without lazy IO.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args(),
+    **_engine_options(AsyncAdaptedQueuePool, async_pool_metrics),
+)
+async_pool_metrics.bind(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
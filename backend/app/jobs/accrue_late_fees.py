@@ -0,0 +1,75 @@
+"""
+Charge late fees to residents with overdue bills.
+
+A fee definition with late_fee_after_days set is a late fee: once a month, each
+resident of its tenant with an UNPAID, PARTIAL or OVERDUE bill more than that
+many days past due gets one bill for it. The period's unique key makes a rerun
+in the same month a no-op, so the job can run nightly. Residents are taken in
+keyset chunks of LATE_FEE_CHUNK_SIZE, each charged with one INSERT and committed
+on its own, so no transaction stays open for a whole tenant.
+
+Runs periodically in the app (LATE_FEE_INTERVAL_SECONDS), or once:
+    python -m app.jobs.accrue_late_fees
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.core.analytics_cache import financial_analytics_cache
+from app.core.config import settings
+from app.crud import crud_financial
+from app.db.session import SessionLocal
+from app.jobs.generate_bills import current_period
+from app.jobs.scheduler import run_exclusive
+from app.models.all_models import FeeDefinition
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "accrue_late_fees"
+
+
+def accrue_late_fees(today: Optional[date] = None) -> int:
+    """Charge every active late fee for the current month; returns how many bills were created."""
+    period = current_period(today)
+    now = datetime.now(timezone.utc)
+    due_date = now + timedelta(days=settings.LATE_FEE_DUE_DAYS)
+    chunk_size = settings.LATE_FEE_CHUNK_SIZE
+    db = SessionLocal()
+    try:
+        fees = db.execute(
+            select(FeeDefinition.id, FeeDefinition.tenant_id, FeeDefinition.name,
+                   FeeDefinition.amount, FeeDefinition.late_fee_after_days)
+            .where(
+                FeeDefinition.is_active == True,
+                FeeDefinition.tenant_id.is_not(None),
+                FeeDefinition.late_fee_after_days.is_not(None),
+            )
+            .order_by(FeeDefinition.tenant_id, FeeDefinition.id)
+        ).all()
+        total = 0
+        for fee in fees:
+            due_before = now - timedelta(days=fee.late_fee_after_days)
+            created = 0
+            after_resident_id = 0
+            while True:
+                resident_ids = crud_financial.get_overdue_resident_ids(
+                    db, fee.tenant_id, due_before, after_resident_id, chunk_size
+                )
+                created += len(crud_financial.create_late_fee_bills(db, fee, resident_ids, period, due_date))
+                db.commit()
+                if len(resident_ids) < chunk_size:
+                    break
+                after_resident_id = resident_ids[-1]
+            if created:
+                financial_analytics_cache.invalidate_tenant(fee.tenant_id)
+                logger.info(f"Charged late fee {fee.id} to {created} residents of tenant {fee.tenant_id}")
+            total += created
+        return total
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_exclusive(JOB_NAME, accrue_late_fees)
@@ -0,0 +1,110 @@
+"""
+Generate a period's bills and email the billed residents.
+
+A BillingRun records the progress: it moves from queued to running to completed
+(or failed), with bills_created set once the single INSERT ... SELECT has run
+and notifications_sent advancing one batch at a time.
+
+POST /financial/bills/generate-monthly starts a run for one tenant. Scheduled
+(BILLING_RUN_INTERVAL_SECONDS), or once:
+    python -m app.jobs.generate_bills
+it starts a run for the current month for every tenant that has no run for it yet.
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import exists, func, select
+
+from app.core.analytics_cache import financial_analytics_cache
+from app.core.communications import communication_service
+from app.core.config import settings
+from app.crud import crud_financial
+from app.db.session import SessionLocal
+from app.jobs.scheduler import run_exclusive
+from app.models.all_models import BillingRun, FeeDefinition, User
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "generate_bills"
+
+
+def current_period(today: Optional[date] = None) -> date:
+    return (today or date.today()).replace(day=1)
+
+
+def run_billing(run_id: int) -> None:
+    db = SessionLocal()
+    try:
+        run = db.get(BillingRun, run_id)
+        run.status = "running"
+        db.commit()
+        try:
+            created = crud_financial.generate_period_bills(db, run.tenant_id, run.period)
+            run.bills_created = len(created)
+            db.commit()
+            financial_analytics_cache.invalidate_tenant(run.tenant_id)
+
+            bills_by_resident = defaultdict(list)
+            for bill in created:
+                bills_by_resident[bill.resident_id].append(bill)
+            recipients = db.execute(
+                select(User.id, User.email, User.full_name)
+                .where(User.id.in_(bills_by_resident), User.email.is_not(None))
+            ).all() if bills_by_resident else []
+            run.notifications_total = len(recipients)
+            db.commit()
+
+            label = run.period.strftime("%B %Y")
+            batch_size = settings.BILLING_NOTIFICATION_BATCH_SIZE
+            for start in range(0, len(recipients), batch_size):
+                for recipient in recipients[start:start + batch_size]:
+                    lines = "\n".join(
+                        f"- {bill.description}: ${bill.amount / 100:.2f}" for bill in bills_by_resident[recipient.id]
+                    )
+                    communication_service.send_email(
+                        recipient.email,
+                        "New Bill Generated",
+                        f"Dear {recipient.full_name}, your bills for {label} have been generated:\n{lines}\n"
+                        f"Please view them in your dashboard.",
+                    )
+                run.notifications_sent += len(recipients[start:start + batch_size])
+                db.commit()
+
+            run.status = "completed"
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"Billing run {run_id} failed")
+            run.status = "failed"
+            run.error = str(e)[:500]
+        run.finished_at = func.now()
+        db.commit()
+    finally:
+        db.close()
+
+
+def generate_bills(period: Optional[date] = None) -> int:
+    """Start and run a billing run for every tenant with active fees and no run for the period."""
+    period = period or current_period()
+    db = SessionLocal()
+    try:
+        tenant_ids = db.execute(
+            select(FeeDefinition.tenant_id)
+            .where(
+                FeeDefinition.is_active == True,
+                FeeDefinition.tenant_id.is_not(None),
+                ~exists().where(BillingRun.tenant_id == FeeDefinition.tenant_id, BillingRun.period == period),
+            )
+            .distinct()
+        ).scalars().all()
+        run_ids = [crud_financial.create_billing_run(db, tenant_id, period).id for tenant_id in tenant_ids]
+    finally:
+        db.close()
+    for run_id in run_ids:
+        run_billing(run_id)
+    return len(run_ids)
+
+
+if __name__ == "__main__":
+    run_exclusive(JOB_NAME, generate_bills)
@@ -0,0 +1,23 @@
+"""
+Delete expired Idempotency-Key responses.
+
+Runs periodically in the app (IDEMPOTENCY_PURGE_INTERVAL_SECONDS), or once:
+    python -m app.jobs.purge_idempotency_keys
+"""
+from app.crud import crud_idempotency_key
+from app.db.session import SessionLocal
+from app.jobs.scheduler import run_exclusive
+
+JOB_NAME = "purge_idempotency_keys"
+
+
+def purge_idempotency_keys() -> int:
+    db = SessionLocal()
+    try:
+        return crud_idempotency_key.purge_expired(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_exclusive(JOB_NAME, purge_idempotency_keys)
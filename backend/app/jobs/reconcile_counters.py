@@ -0,0 +1,23 @@
+"""
+Recompute every tenant's dashboard counters from the source tables.
+
+Runs periodically in the app (COUNTER_RECONCILE_INTERVAL_SECONDS), or once:
+    python -m app.jobs.reconcile_counters
+"""
+from app.crud import crud_tenant_counter
+from app.db.session import SessionLocal
+from app.jobs.scheduler import run_exclusive
+
+JOB_NAME = "reconcile_tenant_counters"
+
+
+def reconcile_counters() -> int:
+    db = SessionLocal()
+    try:
+        return crud_tenant_counter.reconcile_all(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_exclusive(JOB_NAME, reconcile_counters)
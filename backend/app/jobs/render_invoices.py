@@ -0,0 +1,118 @@
+"""
+Pre-render a month's invoices into the document cache.
+
+Covers the bills of the period: generated bills for it and manual bills
+created during that month. Bills are read in keyset chunks of
+INVOICE_RENDER_CHUNK_SIZE and rendered in the document renderer's process
+pool; invoices whose current state is already stored are skipped, so reruns
+only render what changed.
+
+POST /financial/bills/render-invoices starts a run for one tenant as a task
+on the event loop (render_period_invoices_async). Scheduled
+(INVOICE_RENDER_INTERVAL_SECONDS), or once:
+    python -m app.jobs.render_invoices
+it renders the current month for every tenant.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.core.config import settings
+from app.core.financial_documents import INVOICE, document_renderer, document_state, invoice_query
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.jobs.generate_bills import current_period
+from app.jobs.scheduler import run_exclusive
+from app.models.all_models import Bill
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "render_invoices"
+
+
+def _period_query(tenant_id: Optional[int], period: date, after_id: int):
+    start = datetime.combine(period, time())
+    end = datetime.combine(date(period.year + period.month // 12, period.month % 12 + 1, 1), time())
+    in_period = or_(
+        Bill.period == period,
+        and_(Bill.period.is_(None), Bill.created_at >= start, Bill.created_at < end),
+    )
+    query = invoice_query().where(in_period, Bill.id > after_id)
+    if tenant_id is not None:
+        query = query.where(Bill.tenant_id == tenant_id)
+    return query.order_by(Bill.id).limit(settings.INVOICE_RENDER_CHUNK_SIZE)
+
+
+def render_period_invoices(tenant_id: Optional[int] = None, period: Optional[date] = None) -> int:
+    """Render the period's invoices (of one tenant, or all); returns how many were rendered."""
+    period = period or current_period()
+    db = SessionLocal()
+    try:
+        rendered = 0
+        after_id = 0
+        while True:
+            rows = db.execute(_period_query(tenant_id, period, after_id)).all()
+            db.rollback()  # end the read transaction while the chunk renders
+            if not rows:
+                break
+            rendered += document_renderer.render_many(INVOICE, [document_state(row) for row in rows])
+            after_id = rows[-1].id
+        logger.info(f"Rendered {rendered} invoices for {period:%B %Y}")
+        return rendered
+    finally:
+        db.close()
+
+
+async def render_period_invoices_async(tenant_id: Optional[int] = None, period: Optional[date] = None) -> int:
+    """`render_period_invoices` on the event loop, awaiting the renderer's process pool."""
+    period = period or current_period()
+    rendered = 0
+    after_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(_period_query(tenant_id, period, after_id))).all()
+            await db.rollback()
+            if not rows:
+                break
+            rendered += await document_renderer.render_many_async(INVOICE, [document_state(row) for row in rows])
+            after_id = rows[-1].id
+    logger.info(f"Rendered {rendered} invoices for {period:%B %Y}")
+    return rendered
+
+
+# Runs started from the API by (tenant, period), held until done so they
+# aren't garbage-collected and a repeated request doesn't start a second one
+_running: Dict[Tuple[int, date], asyncio.Task] = {}
+
+
+def _finished(run: Tuple[int, date], task: asyncio.Task) -> None:
+    _running.pop(run, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Invoice render failed: {task.exception()!r}")
+
+
+def start_period_render(tenant_id: int, period: date) -> bool:
+    """
+    Render one tenant's period in a task on the running event loop. Returns
+    False without starting one if that period is already being rendered.
+    """
+    run = (tenant_id, period)
+    if run in _running:
+        return False
+    task = asyncio.create_task(render_period_invoices_async(tenant_id, period))
+    _running[run] = task
+    task.add_done_callback(lambda done: _finished(run, done))
+    return True
+
+
+def render_invoices() -> int:
+    return render_period_invoices()
+
+
+if __name__ == "__main__":
+    try:
+        run_exclusive(JOB_NAME, render_invoices)
+    finally:
+        document_renderer.shutdown()
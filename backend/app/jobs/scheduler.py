@@ -0,0 +1,75 @@
+"""
+In-process periodic jobs, started from the app lifespan in every worker.
+
+Every worker wakes once per interval, so a run is claimed in job_runs first: a
+single statement records the start unless the job already started less than an
+interval ago, and only the worker that records it does the work. The claim
+commits at once, so it holds with a transaction-pooling PgBouncer too.
+
+A Postgres advisory lock named after the job also keeps runs from overlapping
+when one outlasts its interval, or a manual run meets a scheduled one. It is a
+session lock, so behind a transaction-pooling PgBouncer (DB_PGBOUNCER_MODE) it
+may be taken and released on different server connections and does not protect
+anything; there, runs rely on the claim alone and should stay shorter than
+their interval.
+"""
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+CLAIM_RUN = text(
+    "INSERT INTO job_runs (name, last_started_at) VALUES (:name, now()) "
+    "ON CONFLICT (name) DO UPDATE SET last_started_at = now() "
+    "WHERE job_runs.last_started_at <= now() - make_interval(secs => :interval_seconds) "
+    "RETURNING name"
+)
+
+
+@contextmanager
+def single_runner(name: str) -> Iterator[bool]:
+    """Yield True if this process holds the job's advisory lock for the duration."""
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": name}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": name})
+            conn.commit()
+
+
+def claim_run(name: str, interval_seconds: float) -> bool:
+    """Record that the job starts now, unless it started less than interval_seconds ago."""
+    with engine.begin() as conn:
+        params = {"name": name, "interval_seconds": interval_seconds}
+        return conn.execute(CLAIM_RUN, params).first() is not None
+
+
+def run_exclusive(name: str, job: Callable[[], object], interval_seconds: float = 0) -> None:
+    with single_runner(name) as acquired:
+        if not acquired:
+            logger.debug(f"Job {name} is running in another worker; skipping")
+            return
+        if not claim_run(name, interval_seconds):
+            logger.debug(f"Job {name} already ran in the last {interval_seconds}s; skipping")
+            return
+        result = job()
+        logger.info(f"Job {name} finished: {result}")
+
+
+async def run_periodic(name: str, interval_seconds: float, job: Callable[[], object]) -> None:
+    """Run a blocking job in the threadpool once per interval_seconds across all workers, until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(run_exclusive, name, job, interval_seconds)
+        except Exception:
+            logger.exception(f"Job {name} failed")
@@ -1,13 +1,52 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.code_allocator import CodeSpaceExhausted
+from app.core.financial_documents import document_renderer
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.crud.pagination import InvalidCursor
+from app.crud.transitions import TransitionRejected
+from app.api.v1.endpoints.websockets import dashboard_deltas, manager, publish_dashboard_counts
+from app.jobs.accrue_late_fees import JOB_NAME as ACCRUE_LATE_FEES, accrue_late_fees
+from app.jobs.generate_bills import JOB_NAME as GENERATE_BILLS, generate_bills
+from app.jobs.purge_idempotency_keys import JOB_NAME as PURGE_IDEMPOTENCY_KEYS, purge_idempotency_keys
+from app.jobs.reconcile_counters import JOB_NAME as RECONCILE_COUNTERS, reconcile_counters
+from app.jobs.render_invoices import JOB_NAME as RENDER_INVOICES, render_invoices
+from app.jobs.scheduler import run_periodic
+import asyncio
 import os
 
+# (advisory lock name, seconds between runs, blocking job); 0 disables a job
+PERIODIC_JOBS = [
+    (RECONCILE_COUNTERS, settings.COUNTER_RECONCILE_INTERVAL_SECONDS, reconcile_counters),
+    (PURGE_IDEMPOTENCY_KEYS, settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS, purge_idempotency_keys),
+    (GENERATE_BILLS, settings.BILLING_RUN_INTERVAL_SECONDS, generate_bills),
+    (ACCRUE_LATE_FEES, settings.LATE_FEE_INTERVAL_SECONDS, accrue_late_fees),
+    (RENDER_INVOICES, settings.INVOICE_RENDER_INTERVAL_SECONDS, render_invoices),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await manager.start()
+    jobs = [
+        asyncio.create_task(run_periodic(name, interval, job))
+        for name, interval, job in PERIODIC_JOBS if interval
+    ]
+    jobs.append(asyncio.create_task(dashboard_deltas.run(publish_dashboard_counts)))
+    yield
+    for job in jobs:
+        job.cancel()
+    document_renderer.shutdown()
+    await manager.stop()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Mount static files
@@ -15,6 +54,14 @@ if not os.path.exists("static"):
     os.makedirs("static")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Inside CORS, so replayed responses get CORS headers too
+app.add_middleware(
+    IdempotencyMiddleware,
+    ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+    max_body_bytes=settings.IDEMPOTENCY_MAX_BODY_BYTES,
+)
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -23,8 +70,22 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", REPLAYED_HEADER],
     )
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(TransitionRejected)
+async def transition_rejected_handler(request: Request, exc: TransitionRejected):
+    # StateConflict (status already changed) is a 409; failed guards are 400s
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+@app.exception_handler(CodeSpaceExhausted)
+async def code_space_exhausted_handler(request: Request, exc: CodeSpaceExhausted):
+    return JSONResponse(status_code=503, content={"detail": f"Cannot issue a code: {exc}"})
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
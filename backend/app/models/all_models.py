@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Enum, Float, JSON, func
+from sqlalchemy import BigInteger, Boolean, Column, Computed, Date, ForeignKey, Index, Integer, LargeBinary, Sequence, String, DateTime, Enum, Float, JSON, UniqueConstraint, func, text
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 import enum
@@ -40,8 +40,8 @@ class PaymentMethod(str, enum.Enum):
 
 class PaymentStatus(str, enum.Enum):
     PENDING = "pending"
-    COMPLETED = "completed"
-    FAILED = "failed"
+    VERIFIED = "verified"
+    REJECTED = "rejected"
 
 class IncidentStatus(str, enum.Enum):
     OPEN = "open"
@@ -179,6 +179,9 @@ class Tenant(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_tenant_id_role", "tenant_id", "role"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -201,6 +204,9 @@ class User(Base):
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        Index("ix_properties_tenant_id_id", "tenant_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -212,6 +218,9 @@ class Property(Base):
 
 class Blacklist(Base):
     __tablename__ = "blacklist"
+    __table_args__ = (
+        Index("ix_blacklist_tenant_id_id", "tenant_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -228,6 +237,9 @@ class Blacklist(Base):
 
 class PatrolLog(Base):
     __tablename__ = "patrol_logs"
+    __table_args__ = (
+        Index("ix_patrol_logs_tenant_id_timestamp_id", "tenant_id", "timestamp", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -242,6 +254,10 @@ class PatrolLog(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_id_is_read", "user_id", "is_read"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -255,6 +271,9 @@ class Notification(Base):
 
 class MarketplaceItem(Base):
     __tablename__ = "marketplace_items"
+    __table_args__ = (
+        Index("ix_marketplace_items_tenant_id_status_created_at_id", "tenant_id", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -274,6 +293,11 @@ class MarketplaceItem(Base):
 
 class Visitor(Base):
     __tablename__ = "visitors"
+    __table_args__ = (
+        Index("ix_visitors_tenant_id_id", "tenant_id", "id"),
+        Index("ix_visitors_tenant_id_status", "tenant_id", "status"),
+        Index("ix_visitors_host_id_id", "host_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -303,9 +327,14 @@ class Visitor(Base):
     host = relationship("User", backref="visitors")
     tenant = relationship("Tenant", backref="visitors")
 
+# Feeds app.core.code_allocator; codes are permutations of its values
+visitor_access_code_seq = Sequence("visitor_access_code_seq", metadata=Base.metadata)
 
 class FeeDefinition(Base):
     __tablename__ = "fee_definitions"
+    __table_args__ = (
+        Index("ix_fee_definitions_tenant_id_id", "tenant_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -313,17 +342,38 @@ class FeeDefinition(Base):
     description = Column(String, nullable=True)
     amount = Column(Integer, nullable=False) # In cents
     is_active = Column(Boolean, default=True)
+    # Set for a late fee: charged monthly to residents with a bill this many days
+    # past due, instead of being billed to everyone by generate_period_bills
+    late_fee_after_days = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     tenant = relationship("Tenant", backref="fee_definitions")
 
 class Bill(Base):
     __tablename__ = "bills"
+    __table_args__ = (
+        Index("ix_bills_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_bills_resident_id_created_at_id", "resident_id", "created_at", "id"),
+        Index("ix_bills_tenant_id_status", "tenant_id", "status"),
+        # Financial analytics: collection rate by due month, and aging/debtors over open bills only
+        Index("ix_bills_tenant_id_due_date", "tenant_id", "due_date", postgresql_include=["amount", "paid_total"]),
+        Index(
+            "ix_bills_tenant_id_due_date_open", "tenant_id", "due_date",
+            postgresql_include=["resident_id", "outstanding"], postgresql_where=text("outstanding > 0"),
+        ),
+        # One bill per resident, fee and period for generated bills; manual bills leave both null
+        UniqueConstraint("tenant_id", "resident_id", "fee_id", "period", name="uq_bills_tenant_resident_fee_period"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
     resident_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    fee_id = Column(Integer, ForeignKey("fee_definitions.id", ondelete="SET NULL"), nullable=True)
+    period = Column(Date, nullable=True)  # first day of the billed month
     amount = Column(Integer, nullable=False)
+    # Sum of verified payments, maintained by crud_financial.set_payment_statuses
+    paid_total = Column(Integer, nullable=False, default=0, server_default="0")
+    outstanding = Column(Integer, Computed("amount - paid_total", persisted=True))
     description = Column(String, nullable=False)
     due_date = Column(DateTime(timezone=True), nullable=False)
     status = Column(Enum(BillStatus), default=BillStatus.UNPAID)
@@ -334,6 +384,11 @@ class Bill(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_payments_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_payments_bill_id", "bill_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -344,6 +399,7 @@ class Payment(Base):
     reference = Column(String, nullable=True)
     status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
     notes = Column(String, nullable=True)
+    paid_on = Column(Date, nullable=True)  # value date of a payment imported from a bank statement
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -353,6 +409,11 @@ class Payment(Base):
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        Index("ix_incidents_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_incidents_reporter_id_created_at_id", "reporter_id", "created_at", "id"),
+        Index("ix_incidents_tenant_id_status", "tenant_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -370,6 +431,9 @@ class Incident(Base):
 
 class Notice(Base):
     __tablename__ = "notices"
+    __table_args__ = (
+        Index("ix_notices_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -385,6 +449,12 @@ class Notice(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_tickets_created_by_id_created_at_id", "created_by_id", "created_at", "id"),
+        Index("ix_tickets_assigned_to_id_created_at_id", "assigned_to_id", "created_at", "id"),
+        Index("ix_tickets_tenant_id_status", "tenant_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -408,6 +478,9 @@ class Ticket(Base):
 
 class Amenity(Base):
     __tablename__ = "amenities"
+    __table_args__ = (
+        Index("ix_amenities_tenant_id_id", "tenant_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -425,6 +498,11 @@ class Amenity(Base):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_tenant_id_start_time_id", "tenant_id", "start_time", "id"),
+        Index("ix_bookings_user_id_start_time_id", "user_id", "start_time", "id"),
+        Index("ix_bookings_amenity_id_start_time", "amenity_id", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -443,6 +521,10 @@ class Booking(Base):
 
 class Staff(Base):
     __tablename__ = "staff"
+    __table_args__ = (
+        Index("ix_staff_tenant_id_status", "tenant_id", "status"),
+        Index("ix_staff_employer_id", "employer_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -460,8 +542,13 @@ class Staff(Base):
     employer = relationship("User", backref="staff")
     tenant = relationship("Tenant", backref="staff_members")
 
+staff_access_code_seq = Sequence("staff_access_code_seq", metadata=Base.metadata)
+
 class StaffAttendance(Base):
     __tablename__ = "staff_attendance"
+    __table_args__ = (
+        Index("ix_staff_attendance_staff_id_check_in", "staff_id", "check_in"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
@@ -472,6 +559,9 @@ class StaffAttendance(Base):
 
 class AccessLog(Base):
     __tablename__ = "access_logs"
+    __table_args__ = (
+        Index("ix_access_logs_user_id_timestamp_id", "user_id", "timestamp", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -489,6 +579,10 @@ class AccessLog(Base):
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    __table_args__ = (
+        Index("ix_vehicles_tenant_id_id", "tenant_id", "id"),
+        Index("ix_vehicles_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -508,6 +602,10 @@ class Vehicle(Base):
 
 class Parcel(Base):
     __tablename__ = "parcels"
+    __table_args__ = (
+        Index("ix_parcels_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_parcels_recipient_id_created_at_id", "recipient_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -524,8 +622,13 @@ class Parcel(Base):
     recipient = relationship("User", backref="parcels")
     tenant = relationship("Tenant", backref="parcels")
 
+parcel_pickup_code_seq = Sequence("parcel_pickup_code_seq", metadata=Base.metadata)
+
 class Poll(Base):
     __tablename__ = "polls"
+    __table_args__ = (
+        Index("ix_polls_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -544,6 +647,9 @@ class Poll(Base):
 
 class PollOption(Base):
     __tablename__ = "poll_options"
+    __table_args__ = (
+        Index("ix_poll_options_poll_id", "poll_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     poll_id = Column(Integer, ForeignKey("polls.id"), nullable=False)
@@ -552,6 +658,9 @@ class PollOption(Base):
 
 class PollVote(Base):
     __tablename__ = "poll_votes"
+    __table_args__ = (
+        Index("ix_poll_votes_poll_id_user_id", "poll_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     poll_id = Column(Integer, ForeignKey("polls.id"), nullable=False)
@@ -561,6 +670,9 @@ class PollVote(Base):
 
 class CommunityDocument(Base):
     __tablename__ = "community_documents"
+    __table_args__ = (
+        Index("ix_community_documents_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
@@ -574,3 +686,72 @@ class CommunityDocument(Base):
 
     uploaded_by = relationship("User", backref="documents_uploaded")
     tenant = relationship("Tenant", backref="community_documents")
+
+class WebSocketSequence(Base):
+    """Last broadcast sequence number handed out per tenant (shared by all workers)."""
+    __tablename__ = "ws_tenant_sequences"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+
+class TenantCounter(Base):
+    """
+    Dashboard counters per tenant, kept in step with visitor, incident, bill and
+    ticket writes (see crud_tenant_counter) and periodically reconciled.
+    """
+    __tablename__ = "tenant_counters"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    visitors_total = Column(Integer, nullable=False, default=0)
+    visitors_active = Column(Integer, nullable=False, default=0)
+    visitors_pending = Column(Integer, nullable=False, default=0)
+    incidents_open = Column(Integer, nullable=False, default=0)
+    bills_pending = Column(Integer, nullable=False, default=0)
+    tickets_open = Column(Integer, nullable=False, default=0)
+    reconciled_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class JobRun(Base):
+    """When each periodic job last started, so workers run it once per interval (see app.jobs.scheduler)."""
+    __tablename__ = "job_runs"
+
+    name = Column(String, primary_key=True)
+    last_started_at = Column(DateTime(timezone=True), nullable=False)
+
+class BillingRun(Base):
+    """One generation of a period's bills for a tenant, with its progress (see app.jobs.generate_bills)."""
+    __tablename__ = "billing_runs"
+    __table_args__ = (
+        Index("ix_billing_runs_tenant_id_id", "tenant_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    period = Column(Date, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    bills_created = Column(Integer, nullable=False, default=0)
+    notifications_total = Column(Integer, nullable=False, default=0)
+    notifications_sent = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class IdempotencyKey(Base):
+    """
+    Response stored for a POST/PATCH sent with an Idempotency-Key header, replayed
+    for retries until expires_at (see app.core.idempotency). While the first
+    request runs, expires_at is its short lease, renewed until it finishes.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    claim_id = Column(String(32), nullable=False)  # random per claim; only its holder may store or release
+    request_hash = Column(LargeBinary, nullable=False)  # sha256 of method, path, query and body
+    status_code = Column(Integer, nullable=True)  # null while the first request is in progress
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,6 +1,6 @@
 from typing import Optional, List
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import date, datetime
+from pydantic import BaseModel, Field
 from app.models.all_models import BillStatus, PaymentMethod, PaymentStatus
 
 # FeeDefinition Schemas
@@ -9,6 +9,7 @@ class FeeDefinitionBase(BaseModel):
     description: Optional[str] = None
     amount: int
     is_active: bool = True
+    late_fee_after_days: Optional[int] = Field(None, ge=0)  # set for a late fee
 
 class FeeDefinitionCreate(FeeDefinitionBase):
     pass
@@ -18,6 +19,7 @@ class FeeDefinitionUpdate(BaseModel):
     description: Optional[str] = None
     amount: Optional[int] = None
     is_active: Optional[bool] = None
+    late_fee_after_days: Optional[int] = Field(None, ge=0)
 
 class FeeDefinition(FeeDefinitionBase):
     id: int
@@ -45,11 +47,42 @@ class Payment(PaymentBase):
     user_id: int
     bill_id: Optional[int] = None
     status: PaymentStatus
+    paid_on: Optional[date] = None
     created_at: datetime
 
     class Config:
         orm_mode = True
 
+class PaymentBulkStatusUpdate(BaseModel):
+    payment_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: PaymentStatus
+
+class PaymentStatusConflict(BaseModel):
+    id: int
+    status: Optional[PaymentStatus] = None
+
+class PaymentBulkStatusResult(BaseModel):
+    updated: List[Payment]
+    conflicts: List[PaymentStatusConflict]
+    not_found: List[int]
+
+# Outcome of one bank-statement line (1-based, after the header)
+class BankImportRowResult(BaseModel):
+    row: int
+    status: str  # "matched" or "unmatched"
+    amount: Optional[int] = None
+    reference: Optional[str] = None
+    payer: Optional[str] = None
+    paid_on: Optional[date] = None
+    bill_id: Optional[int] = None
+    payment_id: Optional[int] = None
+    reason: Optional[str] = None
+
+class BankImportResult(BaseModel):
+    matched: int
+    unmatched: int
+    results: List[BankImportRowResult]
+
 # Bill Schemas
 class BillBase(BaseModel):
     amount: int
@@ -68,8 +101,58 @@ class BillUpdate(BaseModel):
 class Bill(BillBase):
     id: int
     resident_id: int
+    fee_id: Optional[int] = None
+    period: Optional[date] = None
+    paid_total: int = 0
+    outstanding: Optional[int] = None
     created_at: datetime
     payments: List[Payment] = []
 
     class Config:
         orm_mode = True
+
+# Billing run (bill generation progress)
+class BillingRun(BaseModel):
+    id: int
+    period: date
+    status: str
+    bills_created: int
+    notifications_total: int
+    notifications_sent: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+# Analytics
+class ReceivablesAging(BaseModel):
+    current: int
+    days_1_30: int = Field(..., alias="1-30")
+    days_31_60: int = Field(..., alias="31-60")
+    days_61_90: int = Field(..., alias="61-90")
+    days_90_plus: int = Field(..., alias="90+")
+    total: int
+    open_bills: int
+
+class MonthlyCollection(BaseModel):
+    month: date
+    bills: int
+    billed: int
+    collected: int
+    collection_rate: float
+
+class Debtor(BaseModel):
+    resident_id: int
+    resident_name: Optional[str] = None
+    house_address: Optional[str] = None
+    outstanding: int
+    open_bills: int
+    oldest_due_date: datetime
+
+class FinancialAnalytics(BaseModel):
+    as_of: datetime
+    aging: ReceivablesAging
+    collection: List[MonthlyCollection]
+    top_debtors: List[Debtor]
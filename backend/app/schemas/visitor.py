@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from app.models.all_models import VisitorStatus, VisitorType
@@ -24,6 +24,27 @@ class VisitorCreateRequest(VisitorBase):
 class VisitorCreate(VisitorBase):
     host_id: int
 
+# One guest in a bulk pre-registration; host_id defaults to the uploader
+class VisitorBulkItem(VisitorBase):
+    host_id: Optional[int] = None
+
+# Entries are validated one by one as VisitorBulkItem so bad rows are reported, not fatal
+class VisitorBulkCreate(BaseModel):
+    visitors: List[Dict[str, Any]]
+
+# Outcome of one submitted row (1-based, in submission order)
+class VisitorBulkRowResult(BaseModel):
+    row: int
+    status: str  # "created" or "rejected"
+    visitor_id: Optional[int] = None
+    access_code: Optional[str] = None
+    errors: List[str] = []
+
+class VisitorBulkResult(BaseModel):
+    created: int
+    rejected: int
+    results: List[VisitorBulkRowResult]
+
 # Properties to receive on update (e.g. check-in)
 class VisitorUpdate(BaseModel):
     status: Optional[VisitorStatus] = None
@@ -34,6 +55,11 @@ class VisitorUpdate(BaseModel):
     items_carried_in: Optional[str] = None
     items_carried_out: Optional[str] = None
 
+# Properties to receive at the gate (scan and admit in one call)
+class VisitorAdmit(BaseModel):
+    access_code: str
+    items_carried_in: Optional[str] = None
+
 # Properties to return via API
 class Visitor(VisitorBase):
     id: int
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.blacklist_index import BlacklistIndex, normalize_id_number, normalize_phone
+
+
+@pytest.mark.parametrize(
+    "phone",
+    ["+263 77 123 4567", "00263771234567", "077-123-4567", "0771234567", "771234567", "77 123 4567", "263771234567"],
+)
+def test_normalize_phone_to_international_digits(phone: str) -> None:
+    assert normalize_phone(phone) == "263771234567"
+
+
+@pytest.mark.parametrize(
+    "phone, normalized",
+    [
+        ("+27 82 123 4567", "27821234567"),
+        ("0027821234567", "27821234567"),
+        ("27821234567", "27821234567"),
+        ("", None),
+        (None, None),
+        ("ext.", None),
+    ],
+)
+def test_normalize_phone_leaves_other_numbers(phone: str, normalized: str) -> None:
+    assert normalize_phone(phone) == normalized
+
+
+def test_normalize_phone_uses_given_country() -> None:
+    assert normalize_phone("0821234567", country_code="27") == "27821234567"
+    assert normalize_phone("821234567", country_code="27") == "27821234567"
+
+
+def test_normalize_id_number() -> None:
+    assert normalize_id_number("63-123456 a 42") == "63123456A42"
+    assert normalize_id_number(" - ") is None
+
+
+class Session:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def test_index_matches_any_spelling_of_a_blacklisted_number() -> None:
+    index = BlacklistIndex(ttl_seconds=60, max_tenants=10)
+    db = Session([("0771234567", None), (None, "63-123456 A 42")])
+    assert index.contains(db, 1, phone_number="771234567")
+    assert index.contains(db, 1, phone_number="+263 77 123 4567")
+    assert index.contains(db, 1, id_number="63123456a42")
+    assert not index.contains(db, 1, phone_number="0772222222")
+    assert db.queries == 1
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.code_allocator import CodeAllocator, CodeSpace, CodeSpaceExhausted, permute
+from app.models.all_models import Visitor, visitor_access_code_seq
+
+KEY = b"test-key"
+
+
+def _space(alphabet: str, length: int) -> CodeSpace:
+    return CodeSpace("test_code", Visitor.access_code, visitor_access_code_seq, alphabet, length)
+
+
+@pytest.mark.parametrize(
+    "alphabet, length",
+    [("0123456789", 2), ("01234", 4), ("0123456789", 3), ("01", 5), ("0123456789ABCDEF", 1)],
+)
+def test_permute_is_a_bijection(alphabet: str, length: int) -> None:
+    space = _space(alphabet, length)
+    codes = [permute(space, index, KEY) for index in range(space.size)]
+    assert sorted(codes) == sorted(
+        "".join(alphabet[(index // len(alphabet) ** power) % len(alphabet)] for power in reversed(range(length)))
+        for index in range(space.size)
+    )
+
+
+def test_permute_depends_on_key() -> None:
+    space = _space("0123456789", 4)
+    assert [permute(space, index, KEY) for index in range(20)] != [permute(space, index, b"other") for index in range(20)]
+
+
+@pytest.mark.parametrize("length", [2, 3])
+def test_permute_refuses_indexes_outside_the_space(length: int) -> None:
+    space = _space("0123456789", length)
+    permute(space, 0, KEY)
+    permute(space, space.size - 1, KEY)
+    for index in (-1, space.size):
+        with pytest.raises(CodeSpaceExhausted, match="test_code has no codes left"):
+            permute(space, index, KEY)
+
+
+class Scalars(list):
+    def all(self) -> list:
+        return list(self)
+
+
+class Session:
+    """Answers the allocator's two queries: sequence values, then codes already in use."""
+
+    def __init__(self, in_use=()) -> None:
+        self.next_value = 1
+        self.in_use = set(in_use)
+        self.reserved = []
+
+    def execute(self, statement):
+        if "generate_series" in str(statement):
+            count = statement.compile().params["generate_series_2"]
+            values = list(range(self.next_value, self.next_value + count))
+            self.next_value += count
+            self.reserved.append(values)
+        else:
+            values = [code for code in statement.compile().params["access_code_1"] if code in self.in_use]
+        return SimpleNamespace(scalars=lambda: Scalars(values))
+
+
+def test_allocate_serves_from_pool_and_refills_in_blocks() -> None:
+    space = _space("0123456789", 4)
+    allocator = CodeAllocator(key="test-key", block_size=4)
+    db = Session()
+    first = allocator.allocate(db, space, 3)
+    second = allocator.allocate(db, space, 2)
+    assert first + second == [permute(space, index, KEY) for index in range(5)]
+    assert db.reserved == [[1, 2, 3, 4], [5, 6, 7, 8]]
+    assert allocator.stats()["pooled"] == {"test_code": 3}
+
+
+def test_refill_skips_codes_already_in_use() -> None:
+    space = _space("0123456789", 4)
+    allocator = CodeAllocator(key="test-key", block_size=4)
+    taken = {permute(space, 0, KEY), permute(space, 2, KEY)}
+    codes = allocator.allocate(Session(in_use=taken), space, 4)
+    assert len(set(codes)) == 4
+    assert not taken & set(codes)
+    assert codes == [permute(space, index, KEY) for index in (1, 3, 4, 5)]
+    assert allocator.stats()["skipped"] == 2
+
+
+def test_allocate_raises_once_the_sequence_passes_the_space() -> None:
+    space = _space("0123456789", 1)
+    allocator = CodeAllocator(key="test-key", block_size=4)
+    db = Session()
+    assert len(allocator.allocate(db, space, 8)) == 8
+    with pytest.raises(CodeSpaceExhausted):
+        allocator.allocate(db, space, 3)
@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import idempotency
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.security import create_access_token
+
+
+class KeyStore:
+    """In-memory stand-in for crud_idempotency_key with the same claim-token rules."""
+
+    def __init__(self) -> None:
+        self.rows = {}
+        self.claim_ids = (f"claim-{n}" for n in itertools.count(1))
+
+    async def claim(self, user_id, key, request_hash, lease_seconds):
+        row = self.rows.get((user_id, key))
+        if row is not None and row.expires_at >= time.monotonic():
+            return None, row
+        claim_id = next(self.claim_ids)
+        self.rows[(user_id, key)] = SimpleNamespace(
+            claim_id=claim_id, request_hash=request_hash, status_code=None, headers=None, body=None,
+            expires_at=time.monotonic() + lease_seconds,
+        )
+        return claim_id, None
+
+    def _owned(self, user_id, key, claim_id):
+        row = self.rows.get((user_id, key))
+        return row if row is not None and row.claim_id == claim_id else None
+
+    async def renew(self, user_id, key, claim_id, lease_seconds):
+        row = self._owned(user_id, key, claim_id)
+        if row is None or row.status_code is not None:
+            return False
+        row.expires_at = time.monotonic() + lease_seconds
+        return True
+
+    async def store(self, user_id, key, claim_id, status_code, headers, body, ttl_seconds):
+        row = self._owned(user_id, key, claim_id)
+        if row is not None:
+            row.status_code, row.headers, row.body = status_code, headers, body
+            row.expires_at = time.monotonic() + ttl_seconds
+
+    async def release(self, user_id, key, claim_id):
+        if self._owned(user_id, key, claim_id) is not None:
+            del self.rows[(user_id, key)]
+
+
+@pytest.fixture
+def keys(monkeypatch) -> KeyStore:
+    store = KeyStore()
+    for name in ("claim", "renew", "store", "release"):
+        monkeypatch.setattr(idempotency.crud_idempotency_key, name, getattr(store, name))
+    return store
+
+
+def _handler(seconds: float, calls: list):
+    """An ASGI app that takes `seconds` to answer with its call number."""
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        number = len(calls)
+        await asyncio.sleep(seconds)
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": str(number).encode()})
+
+    return app
+
+
+async def _post(app, key: str = "import-1") -> tuple:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/financial/payments/import",
+        "query_string": b"",
+        "headers": [
+            (b"authorization", f"Bearer {create_access_token(7)}".encode()),
+            (b"idempotency-key", key.encode()),
+        ],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"csv", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def test_lease_is_renewed_while_a_long_request_runs(keys: KeyStore) -> None:
+    calls = []
+    app = IdempotencyMiddleware(_handler(0.8, calls), ttl_seconds=60, lease_seconds=0.3, max_body_bytes=1000)
+
+    async def scenario():
+        first = asyncio.create_task(_post(app))
+        await asyncio.sleep(0.5)
+        retry = await _post(app)
+        return await first, retry, await _post(app)
+
+    first, retry, replay = asyncio.run(scenario())
+    assert first == (201, b"1")
+    assert retry[0] == 409
+    assert replay == (201, b"1")
+    assert len(calls) == 1
+
+
+def test_request_that_lost_its_lease_cannot_settle_the_new_claim(keys: KeyStore, monkeypatch) -> None:
+    async def no_heartbeat(self, user_id, key, claim_id):
+        return None
+
+    monkeypatch.setattr(IdempotencyMiddleware, "_renew_lease", no_heartbeat)
+    calls = []
+    app = IdempotencyMiddleware(_handler(0.4, calls), ttl_seconds=60, lease_seconds=0.1, max_body_bytes=1000)
+
+    async def scenario():
+        first = asyncio.create_task(_post(app))
+        await asyncio.sleep(0.2)
+        second = asyncio.create_task(_post(app))
+        first_result = await first
+        row = keys.rows[(7, "import-1")]
+        in_progress = (row.claim_id, row.status_code)
+        return first_result, in_progress, await second
+
+    first, in_progress, second = asyncio.run(scenario())
+    assert first == (201, b"1")
+    assert in_progress == ("claim-2", None)
+    assert second == (201, b"2")
+    assert keys.rows[(7, "import-1")].body == b"2"
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Date, DateTime, Integer, Numeric, String, column, select
+from sqlalchemy.dialects import postgresql
+
+from app.crud.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset, to_page
+from app.models.all_models import Visitor
+
+ORDER_BY = [Visitor.created_at, Visitor.id]
+
+
+@pytest.mark.parametrize(
+    "values, order_by",
+    [
+        ([datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc), 42], ORDER_BY),
+        ([datetime(2026, 3, 1, 9, 30, 15, 250000), 7], ORDER_BY),
+        ([date(2026, 3, 1), 7], [column("due_date", Date()), column("id", Integer())]),
+        ([Decimal("1250.50"), 7], [column("amount", Numeric(10, 2)), column("id", Integer())]),
+        ([None, 7], ORDER_BY),
+        (["Doe, Jane", 7], [column("full_name", String()), column("id", Integer())]),
+    ],
+)
+def test_cursor_round_trip(values: list, order_by: list) -> None:
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, order_by) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor([1]),  # one value for a two-column key
+        encode_cursor(["yesterday", 1]),
+        encode_cursor(["2026-03-01T09:30:00", "forty-two"]),
+        "eyJjcmVhdGVkX2F0IjogMX0",  # a JSON object, not a list
+    ],
+)
+def test_decode_rejects_bad_cursors(cursor: str) -> None:
+    with pytest.raises(InvalidCursor, match="Invalid cursor"):
+        decode_cursor(cursor, ORDER_BY)
+
+
+def test_bad_cursor_fails_before_querying() -> None:
+    # InvalidCursor is answered with a 400 by the handler in app.main
+    with pytest.raises(InvalidCursor):
+        keyset(select(Visitor), ORDER_BY, cursor="garbage")
+
+
+def _rows(*keys) -> list:
+    return [SimpleNamespace(created_at=created_at, id=id) for created_at, id in keys]
+
+
+def test_exactly_limit_rows_is_the_last_page() -> None:
+    rows = _rows((datetime(2026, 3, 2), 2), (datetime(2026, 3, 1), 1))
+    page = to_page(rows, ORDER_BY, limit=2)
+    assert page == rows
+    assert page.next_cursor is None
+
+
+def test_extra_row_yields_cursor_of_last_returned_row() -> None:
+    rows = _rows((datetime(2026, 3, 3), 3), (datetime(2026, 3, 2), 2), (datetime(2026, 3, 1), 1))
+    page = to_page(rows, ORDER_BY, limit=2)
+    assert page == rows[:2]
+    assert decode_cursor(page.next_cursor, ORDER_BY) == [datetime(2026, 3, 2), 2]
+
+
+def test_ties_on_created_at_are_broken_by_id() -> None:
+    same_time = datetime(2026, 3, 1, 9, 30)
+    page = to_page(_rows((same_time, 9), (same_time, 8), (same_time, 7)), ORDER_BY, limit=2)
+    assert decode_cursor(page.next_cursor, ORDER_BY) == [same_time, 8]
+
+    compiled = keyset(select(Visitor), ORDER_BY, limit=2, cursor=page.next_cursor).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "WHERE (visitors.created_at, visitors.id) < (%(param_1)s" in sql
+    assert "ORDER BY visitors.created_at DESC, visitors.id DESC" in sql
+    assert (compiled.params["param_1"], compiled.params["param_2"]) == (same_time, 8)
+    assert compiled.params["param_3"] == 3  # limit + 1 to detect a further page
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.core.payment_matching import OpenBill, PaymentMatcher, StatementLine, parse_amount
+
+
+@pytest.mark.parametrize(
+    "value, cents",
+    [
+        ("1,250.50", 125050),
+        ("40", 4000),
+        ("$12.00", 1200),
+        ("-50.00", -5000),
+        ("(50.00)", -5000),
+        ("50.00 DR", -5000),
+        ("50.00dr", -5000),
+        ("50.00 CR", 5000),
+    ],
+)
+def test_parse_amount(value: str, cents: int) -> None:
+    assert parse_amount(value) == cents
+
+
+@pytest.mark.parametrize("value", ["", "abc", "12.50 USD", "1.2.3", "(-50.00)", "50 OK", "12,34.00"])
+def test_parse_amount_rejects_other_text(value: str) -> None:
+    with pytest.raises(ValueError):
+        parse_amount(value)
+
+
+def _matcher(*bills: OpenBill) -> PaymentMatcher:
+    matcher = PaymentMatcher()
+    for bill in bills:
+        matcher._add_bill(bill)
+    matcher.residents_by_key["JANE DOE"].add(1)
+    matcher.residents_by_key["JOHN ROE"].add(2)
+    return matcher
+
+
+def _line(reference: str, amount: int, payer: str = None) -> StatementLine:
+    return StatementLine(row=1, reference=reference, payer=payer, amount=amount, paid_on=date(2026, 3, 1))
+
+
+def test_match_by_bill_number() -> None:
+    matcher = _matcher(OpenBill(10, 1, 5000, datetime(2026, 3, 5)))
+    match, reason = matcher.match(_line("INV-10", 5000))
+    assert reason == ""
+    assert match.bill.id == 10
+    assert matcher.bills[10].remaining == 0
+
+
+def test_match_by_payer_name_and_amount() -> None:
+    matcher = _matcher(OpenBill(10, 1, 5000, datetime(2026, 3, 5)), OpenBill(11, 1, 2500, datetime(2026, 4, 5)))
+    match, _ = matcher.match(_line("LEVY", 2500, payer="Jane Doe"))
+    assert match.bill.id == 11
+
+
+def test_match_rejects_debits_and_overpayments() -> None:
+    matcher = _matcher(OpenBill(10, 1, 5000, datetime(2026, 3, 5)))
+    assert matcher.match(_line("INV-10", -5000)) == (None, "Not a credit")
+    match, reason = matcher.match(_line("INV-10", 6000))
+    assert match is None
+    assert "exceeds" in reason
+
+
+def test_match_dedupes_per_resident() -> None:
+    matcher = _matcher(
+        OpenBill(10, 1, 5000, datetime(2026, 3, 5)),
+        OpenBill(11, 1, 5000, datetime(2026, 4, 5)),
+        OpenBill(20, 2, 5000, datetime(2026, 3, 5)),
+    )
+    first, _ = matcher.match(_line("LEVY", 5000, payer="Jane Doe"))
+    repeat, reason = matcher.match(_line("LEVY", 5000, payer="Jane Doe"))
+    other, _ = matcher.match(_line("LEVY", 5000, payer="John Roe"))
+    assert first.bill.id == 10
+    assert (repeat, reason) == (None, "Already imported")
+    assert other.bill.id == 20
+
+
+def test_match_skips_payments_already_recorded() -> None:
+    matcher = _matcher(OpenBill(10, 1, 5000, datetime(2026, 3, 5)))
+    matcher.imported.add(("INV-10", 5000, date(2026, 3, 1), 1))
+    assert matcher.match(_line("INV-10", 5000)) == (None, "Already imported")
@@ -0,0 +1,110 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, literal, select, update
+from sqlalchemy.dialects import postgresql
+
+from app.crud import crud_financial
+from app.crud.crud_financial import (
+    _payment_status_statement, _settled_bill_values, _verified_change, set_payment_statuses,
+)
+from app.models.all_models import Bill, BillStatus, Payment, PaymentStatus
+
+
+@pytest.fixture
+def bills():
+    engine = create_engine("sqlite://")
+    Bill.__table__.create(engine)
+    with engine.begin() as conn:
+        yield conn
+
+
+def _settle(conn, amount: int, paid_total: int, status: BillStatus, delta: int) -> tuple:
+    conn.execute(Bill.__table__.delete())
+    conn.execute(Bill.__table__.insert().values(
+        id=1, resident_id=1, amount=amount, paid_total=paid_total, status=status,
+        description="Levy", due_date=datetime(2026, 3, 31),
+    ))
+    conn.execute(update(Bill).where(Bill.id == 1).values(**_settled_bill_values(delta)))
+    return tuple(conn.execute(select(Bill.paid_total, Bill.status)).one())
+
+
+@pytest.mark.parametrize(
+    "previous, status, change",
+    [
+        (PaymentStatus.PENDING, PaymentStatus.VERIFIED, 5000),
+        (PaymentStatus.VERIFIED, PaymentStatus.REJECTED, -5000),
+        (PaymentStatus.PENDING, PaymentStatus.REJECTED, 0),
+    ],
+)
+def test_verified_change(bills, previous: PaymentStatus, status: PaymentStatus, change: int) -> None:
+    expression = _verified_change(literal(5000), literal(previous, Payment.status.type), status)
+    assert bills.execute(select(expression)).scalar() == change
+
+
+@pytest.mark.parametrize(
+    "paid_total, status, delta, settled",
+    [
+        (0, BillStatus.UNPAID, 10000, (10000, BillStatus.PAID)),
+        (0, BillStatus.UNPAID, 4000, (4000, BillStatus.PARTIAL)),
+        # a verified payment rejected after the bill was paid, e.g. a bounced transfer
+        (10000, BillStatus.PAID, -6000, (4000, BillStatus.PARTIAL)),
+        (10000, BillStatus.PAID, -10000, (0, BillStatus.UNPAID)),
+        (4000, BillStatus.PARTIAL, -4000, (0, BillStatus.UNPAID)),
+        (4000, BillStatus.OVERDUE, -4000, (0, BillStatus.OVERDUE)),
+    ],
+)
+def test_bill_status_follows_paid_total(bills, paid_total: int, status: BillStatus, delta: int, settled: tuple) -> None:
+    assert _settle(bills, 10000, paid_total, status, delta) == settled
+
+
+def test_statement_sums_payments_per_bill_under_row_locks() -> None:
+    sql = str(_payment_status_statement([1, 2, 3], PaymentStatus.REJECTED, 7).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE OF payments" in sql
+    assert "FOR UPDATE OF bills" in sql
+    assert "GROUP BY changed.bill_id" in sql
+    assert "paid_total=(bills.paid_total + totals.delta)" in sql
+
+
+def _result(requested_id, previous_status, payment_id=None, bill_id=None, bill=None):
+    bill_previous_status, bill_status = bill or (None, None)
+    return SimpleNamespace(
+        requested_id=requested_id, previous_status=previous_status, id=payment_id, bill_id=bill_id,
+        bill_previous_status=bill_previous_status, bill_status=bill_status,
+        bill_tenant_id=7 if bill_status else None,
+    )
+
+
+class Session:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def execute(self, statement):
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def test_set_payment_statuses_reports_updates_conflicts_and_missing(monkeypatch) -> None:
+    recorded = []
+    monkeypatch.setattr(crud_financial, "record_counter_deltas", lambda db, deltas: recorded.append(deltas))
+    # Payments 1 and 2 reverse the same paid bill; 3 is already rejected; 4 is not found
+    reversed_bill = (BillStatus.PAID, BillStatus.UNPAID)
+    rows = [
+        _result(1, PaymentStatus.VERIFIED, payment_id=1, bill_id=10, bill=reversed_bill),
+        _result(2, PaymentStatus.VERIFIED, payment_id=2, bill_id=10, bill=reversed_bill),
+        _result(3, PaymentStatus.REJECTED),
+    ]
+    updated, conflicts, not_found = set_payment_statuses(Session(rows), [1, 2, 3, 4, 4], PaymentStatus.REJECTED, 7)
+    assert [row.id for row in updated] == [1, 2]
+    assert conflicts == {3: PaymentStatus.REJECTED}
+    assert not_found == [4]
+    assert recorded == [{7: {"bills_pending": 1}}]
+
+
+def test_set_payment_statuses_without_bill_changes_records_nothing(monkeypatch) -> None:
+    recorded = []
+    monkeypatch.setattr(crud_financial, "record_counter_deltas", lambda db, deltas: recorded.append(deltas))
+    rows = [_result(1, PaymentStatus.PENDING, payment_id=1, bill_id=10)]
+    updated, conflicts, not_found = set_payment_statuses(Session(rows), [1], PaymentStatus.REJECTED, 7)
+    assert ([row.id for row in updated], conflicts, not_found) == ([1], {}, [])
+    assert recorded == []
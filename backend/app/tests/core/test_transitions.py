@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.crud import transitions
+from app.crud.transitions import StateConflict, TransitionRejected, transition, transition_async
+from app.models.all_models import Parcel, ParcelStatus, Visitor, VisitorStatus
+
+EXPIRED = "Access code has expired"
+
+
+def _row(**fields) -> SimpleNamespace:
+    """A result row as `_statement` returns it: id is None unless the update matched."""
+    fields.setdefault("guard_0", True)
+    return SimpleNamespace(_mapping=fields, **fields)
+
+
+class Session:
+    """Records the statement and hands back a canned row."""
+
+    def __init__(self, row) -> None:
+        self.row = row
+        self.statement = None
+
+    def execute(self, statement):
+        self.statement = statement
+        return SimpleNamespace(first=lambda: self.row)
+
+
+class AsyncSession(Session):
+    async def execute(self, statement):
+        return Session.execute(self, statement)
+
+    async def run_sync(self, fn):
+        return fn(self)
+
+
+@pytest.fixture
+def recorded(monkeypatch) -> list:
+    deltas = []
+    monkeypatch.setattr(transitions, "record_counter_deltas", lambda session, changes: deltas.append(changes))
+    return deltas
+
+
+def _check_in(db, tenant_id=5, **kwargs):
+    return transition(
+        db, Visitor, Visitor.id == 1, {"status": VisitorStatus.CHECKED_IN},
+        allowed=kwargs.pop("allowed", [None, VisitorStatus.EXPECTED]),
+        tenant_id=tenant_id,
+        guards=[(Visitor.valid_until.is_(None), EXPIRED)],
+        **kwargs,
+    )
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_success_returns_row_and_records_counter_deltas(recorded: list) -> None:
+    row = _row(id=1, tenant_id=5, previous_status=VisitorStatus.EXPECTED, status=VisitorStatus.CHECKED_IN)
+    assert _check_in(Session(row)) is row
+    assert recorded == [{5: {"visitors_active": 1, "visitors_pending": -1}}]
+
+
+def test_untracked_model_records_no_deltas(recorded: list) -> None:
+    row = _row(id=1, tenant_id=5, previous_status=ParcelStatus.AT_GATE, status=ParcelStatus.COLLECTED)
+    db = Session(row)
+    assert transition(db, Parcel, Parcel.id == 1, {"status": ParcelStatus.COLLECTED}, allowed=[ParcelStatus.AT_GATE]) is row
+    assert recorded == []
+
+
+def test_missing_or_other_tenant_row_returns_none(recorded: list) -> None:
+    db = Session(None)
+    assert _check_in(db) is None
+    assert recorded == []
+    compiled = db.statement.compile(dialect=postgresql.dialect())
+    assert "visitors.tenant_id = %(tenant_id_1)s" in str(compiled)
+    assert compiled.params["tenant_id_1"] == 5
+
+
+def test_lost_race_is_a_409(recorded: list) -> None:
+    row = _row(id=None, previous_status=VisitorStatus.CHECKED_IN)
+    with pytest.raises(StateConflict) as raised:
+        _check_in(Session(row), conflict="Visitor already checked in")
+    assert (raised.value.status_code, raised.value.detail) == (409, "Visitor already checked in")
+    assert recorded == []
+
+
+def test_conflict_detail_defaults_to_current_status() -> None:
+    with pytest.raises(StateConflict, match="Visitor is checked_in"):
+        _check_in(Session(_row(id=None, previous_status=VisitorStatus.CHECKED_IN)))
+
+
+def test_failed_guard_is_a_400() -> None:
+    row = _row(id=None, previous_status=VisitorStatus.EXPECTED, guard_0=False)
+    with pytest.raises(TransitionRejected) as raised:
+        _check_in(Session(row))
+    assert not isinstance(raised.value, StateConflict)
+    assert (raised.value.status_code, raised.value.detail) == (400, EXPIRED)
+
+
+def test_statement_locks_the_target_row() -> None:
+    db = Session(None)
+    _check_in(db)
+    sql = _sql(db.statement)
+    assert "FOR UPDATE OF visitors" in sql
+    assert "RETURNING" in sql
+
+
+def test_allowed_none_also_matches_rows_without_a_status() -> None:
+    with_none, without_none = Session(None), Session(None)
+    _check_in(with_none)
+    _check_in(without_none, allowed=[VisitorStatus.EXPECTED])
+    assert "(visitors.status IS NULL OR visitors.status IN" in _sql(with_none.statement)
+    assert "visitors.status IS NULL" not in _sql(without_none.statement)
+
+
+def test_transition_async_records_deltas_through_run_sync(recorded: list) -> None:
+    row = _row(id=1, tenant_id=5, previous_status=VisitorStatus.CHECKED_IN, status=VisitorStatus.CHECKED_OUT)
+    result = asyncio.run(transition_async(
+        AsyncSession(row), Visitor, Visitor.id == 1, {"status": VisitorStatus.CHECKED_OUT},
+        allowed=[None, VisitorStatus.CHECKED_IN],
+    ))
+    assert result is row
+    assert recorded == [{5: {"visitors_active": -1}}]
@@ -0,0 +1,96 @@
+"""
+Compare requests/sec of the sync (psycopg2 + threadpool) and async (asyncpg + event loop)
+database stacks on the guard's hottest read: visitor lookup by access code.
+
+Both routes run in-process behind the real ASGI stack, so the sync route is subject to
+Starlette's threadpool limit exactly like production endpoints. Needs a reachable
+DATABASE_URL; the access code does not have to exist.
+
+Usage (from backend/):
+    python -m benchmarks.bench_db_stacks --requests 5000 --concurrency 200
+    python -m benchmarks.bench_db_stacks --db-latency-ms 5   # emulate a remote DB
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_async_db, get_db
+from app.models.all_models import Visitor
+
+
+def build_app(db_latency_ms: float) -> FastAPI:
+    bench = FastAPI()
+    sleep = text("SELECT pg_sleep(:s)")
+    seconds = db_latency_ms / 1000.0
+
+    @bench.get("/sync/{access_code}")
+    def sync_lookup(access_code: str, db: Session = Depends(get_db)):
+        if seconds:
+            db.execute(sleep, {"s": seconds})
+        visitor = db.query(Visitor).filter(Visitor.access_code == access_code).first()
+        return {"found": visitor is not None}
+
+    @bench.get("/async/{access_code}")
+    async def async_lookup(access_code: str, db: AsyncSession = Depends(get_async_db)):
+        if seconds:
+            await db.execute(sleep, {"s": seconds})
+        result = await db.execute(select(Visitor).where(Visitor.access_code == access_code))
+        return {"found": result.scalars().first() is not None}
+
+    return bench
+
+
+async def run(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    # Warm pools before timing
+    await asyncio.gather(*(one() for _ in range(min(concurrency, total))))
+    latencies.clear()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--access-code", default="BENCH000")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=build_app(args.db_latency_ms))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for stack in ("sync", "async"):
+            result = await run(client, f"/{stack}/{args.access_code}", args.requests, args.concurrency)
+            print(
+                f"{stack:>5}: {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
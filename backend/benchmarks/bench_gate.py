@@ -0,0 +1,130 @@
+"""
+Compare the guard's scan-and-admit latency through the two-call flow
+(GET /visitors/code/{code} then POST /visitors/{id}/check-in) with the single
+POST /gate/verify-and-admit.
+
+Runs the real application in-process behind httpx's ASGI transport, with the
+guard's authentication overridden so only the gate work is timed. Seeds
+--visitors expected visitors in a scratch tenant, admits each once through one
+path, resets them and repeats through the other, then deletes the tenant's rows.
+Needs a reachable Postgres in DATABASE_URL.
+
+Usage (from backend/):
+    python -m benchmarks.bench_gate --visitors 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+from sqlalchemy import delete, update
+
+from app.api import deps
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.all_models import Tenant, TenantCounter, User, UserRole, Visitor, VisitorStatus
+
+
+def seed(total: int):
+    with SessionLocal() as db:
+        tag = uuid.uuid4().hex[:8]
+        tenant = Tenant(name=f"Gate bench {tag}", slug=f"gate-bench-{tag}")
+        db.add(tenant)
+        db.flush()
+        host = User(email=f"host-{tag}@example.com", hashed_password="x", tenant_id=tenant.id, role=UserRole.RESIDENT)
+        db.add(host)
+        db.flush()
+        db.add_all(
+            Visitor(
+                full_name=f"Visitor {i}", phone_number=f"07{i:08d}", host_id=host.id,
+                tenant_id=tenant.id, access_code=f"G{tag}{i:06d}", status=VisitorStatus.EXPECTED,
+            )
+            for i in range(total)
+        )
+        db.commit()
+        codes = [code for (code,) in db.query(Visitor.access_code).filter(Visitor.tenant_id == tenant.id)]
+        return tenant.id, host.id, codes
+
+
+def reset(tenant_id: int) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(Visitor).where(Visitor.tenant_id == tenant_id)
+            .values(status=VisitorStatus.EXPECTED, check_in_time=None)
+        )
+        db.commit()
+
+
+def cleanup(tenant_id: int, host_id: int) -> None:
+    with SessionLocal() as db:
+        db.execute(delete(Visitor).where(Visitor.tenant_id == tenant_id))
+        db.execute(delete(TenantCounter).where(TenantCounter.tenant_id == tenant_id))
+        db.execute(delete(User).where(User.id == host_id))
+        db.execute(delete(Tenant).where(Tenant.id == tenant_id))
+        db.commit()
+
+
+async def two_calls(client: httpx.AsyncClient, code: str) -> None:
+    response = await client.get(f"/api/v1/visitors/code/{code}")
+    response.raise_for_status()
+    response = await client.post(f"/api/v1/visitors/{response.json()['id']}/check-in")
+    response.raise_for_status()
+
+
+async def single_call(client: httpx.AsyncClient, code: str) -> None:
+    response = await client.post("/api/v1/gate/verify-and-admit", json={"access_code": code})
+    response.raise_for_status()
+
+
+async def run(client: httpx.AsyncClient, admit, codes, concurrency: int) -> dict:
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(code):
+        async with gate:
+            start = time.perf_counter()
+            await admit(client, code)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(code) for code in codes))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(codes) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--visitors", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    tenant_id, host_id, codes = seed(args.visitors)
+    guard = SimpleNamespace(id=host_id, tenant_id=tenant_id, role=UserRole.GUARD, is_active=True, full_name="Bench Guard")
+    app.dependency_overrides[deps.get_current_active_user] = lambda: guard
+    app.dependency_overrides[deps.get_current_active_user_async] = lambda: guard
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, admit in (("two calls", two_calls), ("verify-and-admit", single_call)):
+                reset(tenant_id)
+                result = await run(client, admit, codes, args.concurrency)
+                print(
+                    f"{name:>16}: {result['rps']:8.1f} admits/s  "
+                    f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+                )
+    finally:
+        app.dependency_overrides.clear()
+        cleanup(tenant_id, host_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+Compare the hot list/lookup queries with and without the tenant-scoped composite
+indexes from migration a4d2e8f6c1b3.
+
+Builds the schema from the models in a scratch Postgres schema (bench_indexes),
+drops the migration's indexes, seeds it with generate_series, then for each query
+prints the top of its EXPLAIN (ANALYZE, BUFFERS) plan and the median latency over
+--repeat runs. The indexes are then built exactly as the migration does and
+everything is measured again. Queries are built with the same filters and
+keyset helper as app/crud, so the plans are the ones production sees.
+
+Needs a Postgres in DATABASE_URL; the scratch schema is dropped afterwards
+unless --keep is given.
+
+Usage (from backend/):
+    python -m benchmarks.bench_indexes --tenants 50 --visitors 2000000 --repeat 20 --plans
+"""
+import argparse
+import importlib.util
+import pathlib
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, select, text
+
+from app.core.config import settings
+from app.crud.pagination import keyset
+from app.db.base import Base
+from app.models.all_models import (
+    AccessLog, Bill, Incident, Notification, Payment, PollVote, Ticket, Visitor, VisitorStatus,
+)
+
+SCHEMA = "bench_indexes"
+MIGRATION = pathlib.Path(__file__).resolve().parent.parent / "alembic" / "versions" / "a4d2e8f6c1b3_add_tenant_scoped_composite_indexes.py"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("index_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed(conn, tenants: int, visitors: int) -> None:
+    """Scale every table off --visitors; users are spread evenly across tenants."""
+    users = max(visitors // 20, tenants)
+    bills = visitors // 2
+    params = {"tenants": tenants, "users": users, "visitors": visitors, "bills": bills}
+    statements = [
+        "INSERT INTO tenants (id, name, slug) SELECT g, 'Estate ' || g, 'estate-' || g FROM generate_series(1, :tenants) g",
+        "INSERT INTO users (id, tenant_id, email, hashed_password, role, is_active) "
+        "SELECT g, 1 + g % :tenants, 'user' || g || '@example.com', 'x', "
+        "(enum_range(NULL::userrole))[1 + g % 5], true FROM generate_series(1, :users) g",
+        "INSERT INTO visitors (tenant_id, full_name, phone_number, host_id, access_code, status, created_at) "
+        "SELECT 1 + h % :tenants, 'Visitor ' || g, '07' || g, h, md5(g::text), "
+        "(enum_range(NULL::visitorstatus))[1 + g % 5], now() - g * interval '1 minute' "
+        "FROM generate_series(1, :visitors) g, LATERAL (SELECT 1 + (g * 7919) % :users AS h) u",
+        "INSERT INTO bills (tenant_id, resident_id, amount, description, due_date, status, created_at) "
+        "SELECT 1 + r % :tenants, r, 5000, 'Levy', now(), (enum_range(NULL::billstatus))[1 + g % 3], "
+        "now() - g * interval '2 minutes' "
+        "FROM generate_series(1, :bills) g, LATERAL (SELECT 1 + (g * 104729) % :users AS r) u",
+        "INSERT INTO payments (tenant_id, user_id, bill_id, amount, method, status, created_at) "
+        "SELECT tenant_id, resident_id, id, amount, (enum_range(NULL::paymentmethod))[1], "
+        "(enum_range(NULL::paymentstatus))[1 + id % 3], created_at FROM bills WHERE id % 2 = 0",
+        "INSERT INTO incidents (tenant_id, title, description, reporter_id, status, created_at) "
+        "SELECT 1 + r % :tenants, 'Incident', 'x', r, (enum_range(NULL::incidentstatus))[1 + g % 3], "
+        "now() - g * interval '5 minutes' "
+        "FROM generate_series(1, :visitors / 10) g, LATERAL (SELECT 1 + (g * 31) % :users AS r) u",
+        "INSERT INTO tickets (tenant_id, title, description, created_by_id, status, created_at) "
+        "SELECT 1 + r % :tenants, 'Ticket', 'x', r, (enum_range(NULL::ticketstatus))[1 + g % 4], "
+        "now() - g * interval '5 minutes' "
+        "FROM generate_series(1, :visitors / 10) g, LATERAL (SELECT 1 + (g * 37) % :users AS r) u",
+        "INSERT INTO notifications (user_id, title, message, type, is_read, created_at) "
+        "SELECT 1 + (g * 13) % :users, 'n', 'm', (enum_range(NULL::notificationtype))[1], g % 3 = 0, "
+        "now() - g * interval '1 minute' "
+        "FROM generate_series(1, :visitors) g",
+        "INSERT INTO access_logs (tenant_id, user_id, direction, method, timestamp) "
+        "SELECT 1 + u % :tenants, u, 'entry', 'digital_id', now() - g * interval '30 seconds' "
+        "FROM generate_series(1, :visitors) g, LATERAL (SELECT 1 + (g * 17) % :users AS u) x",
+        "INSERT INTO polls (id, tenant_id, question, created_by_id, status) "
+        "SELECT g, 1 + g % :tenants, 'Q', 1, (enum_range(NULL::pollstatus))[1] FROM generate_series(1, :tenants * 20) g",
+        "INSERT INTO poll_options (id, poll_id, text) SELECT g, 1 + g % (:tenants * 20), 'A' "
+        "FROM generate_series(1, :tenants * 40) g",
+        "INSERT INTO poll_votes (poll_id, option_id, user_id) "
+        "SELECT o.poll_id, o.id, 1 + (o.id * 101 + g) % :users "
+        "FROM poll_options o, generate_series(1, :visitors / (:tenants * 40)) g",
+    ]
+    for statement in statements:
+        conn.execute(text(statement), params)
+    for table in ("tenants", "users", "polls", "poll_options"):
+        conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+
+
+def cases(conn):
+    """(name, statement) pairs shaped like the app/crud queries, for a mid-sized tenant and user."""
+    tenant_id = 7
+    user_id = conn.execute(select(Bill.resident_id).where(Bill.tenant_id == tenant_id).limit(1)).scalar_one()
+    host_id = conn.execute(select(Visitor.host_id).where(Visitor.tenant_id == tenant_id).limit(1)).scalar_one()
+    bill_id = conn.execute(select(Payment.bill_id).order_by(Payment.id.desc()).limit(1)).scalar_one()
+    poll_id = conn.execute(select(PollVote.poll_id).limit(1)).scalar_one()
+
+    def page(stmt, order_by, **kwargs):
+        return keyset(stmt, order_by, limit=100, **kwargs)
+
+    return [
+        ("visitors by tenant", page(select(Visitor).where(Visitor.tenant_id == tenant_id), [Visitor.id], descending=False)),
+        ("visitors by tenant, skip 5000", page(select(Visitor).where(Visitor.tenant_id == tenant_id), [Visitor.id], skip=5000, descending=False)),
+        ("visitors by host", page(select(Visitor).where(Visitor.host_id == host_id), [Visitor.id], descending=False)),
+        ("active visitors count", select(func.count(Visitor.id)).where(Visitor.tenant_id == tenant_id, Visitor.status == VisitorStatus.CHECKED_IN)),
+        ("bills by tenant", page(select(Bill).where(Bill.tenant_id == tenant_id), [Bill.created_at, Bill.id])),
+        ("bills by resident", page(select(Bill).where(Bill.tenant_id == tenant_id, Bill.resident_id == user_id), [Bill.created_at, Bill.id])),
+        ("payments for bill", select(Payment).where(Payment.bill_id == bill_id)),
+        ("payments by user", page(select(Payment).where(Payment.tenant_id == tenant_id, Payment.user_id == user_id), [Payment.created_at, Payment.id])),
+        ("incidents by tenant", page(select(Incident).where(Incident.tenant_id == tenant_id), [Incident.created_at, Incident.id])),
+        ("tickets by tenant", page(select(Ticket).where(Ticket.tenant_id == tenant_id), [Ticket.created_at, Ticket.id])),
+        ("notifications by user", page(select(Notification).where(Notification.user_id == user_id), [Notification.created_at, Notification.id])),
+        ("unread notifications", select(func.count(Notification.id)).where(Notification.user_id == user_id, Notification.is_read == False)),  # noqa: E712
+        ("access logs by user", page(select(AccessLog).where(AccessLog.user_id == user_id, AccessLog.tenant_id == tenant_id), [AccessLog.timestamp, AccessLog.id])),
+        ("poll vote lookup", select(PollVote).where(PollVote.poll_id == poll_id, PollVote.user_id == user_id).limit(1)),
+    ]
+
+
+def measure(conn, stmt, repeat: int):
+    compiled = stmt.compile(dialect=conn.dialect)
+    sql, params = str(compiled), compiled.params
+    plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.exec_driver_sql(sql, params).fetchall()
+        timings.append(time.perf_counter() - started)
+    return plan, statistics.median(timings) * 1000
+
+
+def run_all(conn, queries, repeat: int, show_plans: bool):
+    results = {}
+    for name, stmt in queries:
+        plan, latency = measure(conn, stmt, repeat)
+        results[name] = (plan, latency)
+        if show_plans:
+            print(f"\n-- {name}\n" + "\n".join(plan))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--visitors", type=int, default=1_000_000, help="row count the other tables scale from")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="print full EXPLAIN ANALYZE output")
+    parser.add_argument("--keep", action="store_true", help="keep the bench_indexes schema")
+    args = parser.parse_args()
+
+    migration = load_migration()
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"options": f"-csearch_path={SCHEMA}"},
+        isolation_level="AUTOCOMMIT",
+    )
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        Base.metadata.create_all(conn)
+        for table, columns in migration.INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {migration.index_name(table, columns)}"))
+
+        started = time.perf_counter()
+        seed(conn, args.tenants, args.visitors)
+        conn.execute(text("ANALYZE"))
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+        queries = cases(conn)
+        if args.plans:
+            print("\n== before")
+        before = run_all(conn, queries, args.repeat, args.plans)
+
+        started = time.perf_counter()
+        for table, columns in migration.INDEXES:
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {migration.index_name(table, columns)} "
+                f"ON {table} ({', '.join(columns)})"
+            ))
+        conn.execute(text("ANALYZE"))
+        print(f"\nbuilt {len(migration.INDEXES)} indexes in {time.perf_counter() - started:.1f}s")
+        if args.plans:
+            print("\n== after")
+        after = run_all(conn, queries, args.repeat, args.plans)
+
+        print(f"\n{'query':<32} {'before ms':>10} {'after ms':>10} {'speedup':>8}   plan before -> after")
+        for name, _ in queries:
+            (plan_before, ms_before), (plan_after, ms_after) = before[name], after[name]
+            print(
+                f"{name:<32} {ms_before:10.3f} {ms_after:10.3f} {ms_before / ms_after:7.1f}x   "
+                f"{top_node(plan_before)} -> {top_node(plan_after)}"
+            )
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+def top_node(plan) -> str:
+    """The first scan node of a plan, e.g. 'Index Scan using ix_bills_...'."""
+    for line in plan:
+        node = line.strip().lstrip("-> ").split("  (")[0]
+        if "Scan" in node:
+            return node
+    return plan[0].split("  (")[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measure the latency and throughput the Postgres LISTEN/NOTIFY broadcast backend
+adds on top of in-process delivery.
+
+Spawns --workers listener processes, each running PostgresBroadcast the way a
+uvicorn worker does, then publishes --messages envelopes from the parent through
+the application's async engine. Each listener reports publish-to-delivery
+latency; the in-memory backend is timed on the same envelopes for reference.
+Needs a reachable Postgres in DATABASE_URL (LISTEN cannot go through PgBouncer).
+
+Usage (from backend/):
+    python -m benchmarks.bench_ws_bus --workers 4 --messages 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+CHANNEL = "ws_broadcast_bench"
+
+
+def summarize(latencies) -> str:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    return f"p50 {p50:7.3f} ms  p99 {p99:7.3f} ms"
+
+
+def listener(expected: int, ready, results) -> None:
+    from app.core.broadcast import PostgresBroadcast, _listen_dsn
+
+    async def run():
+        latencies = []
+        done = asyncio.Event()
+
+        def handler(envelope):
+            latencies.append(time.time() - envelope["message"]["sent_at"])
+            if len(latencies) >= expected:
+                done.set()
+
+        async def never_publish(channel, payload):
+            raise RuntimeError("listener only")
+
+        backend = PostgresBroadcast(_listen_dsn(), CHANNEL, never_publish)
+        backend.bind(handler)
+        await backend.start()
+        ready.release()
+        await asyncio.wait_for(done.wait(), timeout=120)
+        await backend.stop()
+        results.put(latencies)
+
+    asyncio.run(run())
+
+
+async def publish_all(total: int, concurrency: int) -> float:
+    from app.core.broadcast import PostgresBroadcast, _listen_dsn, _notify_via_engine
+
+    backend = PostgresBroadcast(_listen_dsn(), CHANNEL, _notify_via_engine)
+    backend.bind(lambda envelope: None)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with gate:
+            await backend.publish({
+                "scope": "role",
+                "tenant_id": 1,
+                "roles": ["guard"],
+                "message": {"type": "panic_alert", "seq": i, "sent_at": time.time()},
+            })
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - started
+
+
+async def in_memory(total: int) -> list:
+    from app.core.broadcast import InMemoryBroadcast
+
+    latencies = []
+    backend = InMemoryBroadcast()
+    backend.bind(lambda envelope: latencies.append(time.time() - envelope["message"]["sent_at"]))
+    for i in range(total):
+        await backend.publish({"scope": "role", "tenant_id": 1, "message": {"sent_at": time.time()}})
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Semaphore(0)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=listener, args=(args.messages, ready, results)) for _ in range(args.workers)]
+    for proc in procs:
+        proc.start()
+    for _ in procs:
+        ready.acquire()
+
+    elapsed = asyncio.run(publish_all(args.messages, args.concurrency))
+    per_worker = [results.get(timeout=180) for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    print(f"publish: {args.messages / elapsed:8.1f} msg/s with concurrency {args.concurrency}")
+    print(f" memory: {summarize(asyncio.run(in_memory(args.messages)))}")
+    print(f" notify: {summarize([l for worker in per_worker for l in worker])}  across {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
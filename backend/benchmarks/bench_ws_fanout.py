@@ -0,0 +1,90 @@
+"""
+Measure SOS fan-out latency through websockets.ConnectionManager as the number of
+connected guards grows, with a share of them on stalled links.
+
+Sockets are in-process fakes: fast ones record when a frame arrives, slow ones
+sleep on every send. The reported latency is the time from broadcast_to_role until
+the last fast guard has the frame, compared with awaiting send_json one socket at
+a time (the previous behaviour).
+
+Usage (from backend/):
+    python -m benchmarks.bench_ws_fanout --connections 100 1000 5000 --slow 0.05
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.api.v1.endpoints.websockets import ConnectionManager
+from app.models.all_models import UserRole
+
+TENANT_ID = 1
+
+
+class FakeSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.set()
+
+    async def send_json(self, message: dict):
+        await self.send_text("")
+
+
+def make_sockets(total: int, slow_share: float, slow_delay: float):
+    slow = int(total * slow_share)
+    return [FakeSocket(slow_delay if i < slow else 0.0) for i in range(total)]
+
+
+async def sequential(sockets) -> float:
+    fast = [s for s in sockets if not s.delay]
+    started = time.perf_counter()
+    for sock in sockets:
+        await sock.send_json({"type": "panic_alert"})
+    await asyncio.gather(*(s.received.wait() for s in fast))
+    return time.perf_counter() - started
+
+
+async def indexed(sockets) -> float:
+    manager = ConnectionManager()
+    for i, sock in enumerate(sockets):
+        user = SimpleNamespace(id=i, role=UserRole.GUARD, tenant_id=TENANT_ID)
+        await manager.connect(sock, user)
+    fast = [s for s in sockets if not s.delay]
+    started = time.perf_counter()
+    await manager.broadcast_to_role(
+        {"type": "panic_alert"}, tenant_id=TENANT_ID, roles=[UserRole.ADMIN, UserRole.GUARD]
+    )
+    await asyncio.gather(*(s.received.wait() for s in fast))
+    elapsed = time.perf_counter() - started
+    for sock in sockets:
+        manager.disconnect(sock)
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--slow", type=float, default=0.05, help="share of stalled sockets")
+    parser.add_argument("--slow-delay-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    for total in args.connections:
+        delay = args.slow_delay_ms / 1000.0
+        before = await sequential(make_sockets(total, args.slow, delay))
+        after = await indexed(make_sockets(total, args.slow, delay))
+        print(f"{total:>6} conns: sequential {before * 1000:9.2f} ms   indexed {after * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
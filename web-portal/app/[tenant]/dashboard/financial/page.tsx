@@ -67,9 +67,15 @@ export default function FinancialPage() {
     }))) return;
     setIsSubmitting(true);
     try {
-        await financialService.generateMonthlyBills();
+        // Generation runs in the background; poll the run until it finishes
+        let run = await financialService.generateMonthlyBills();
+        while (run.status === "queued" || run.status === "running") {
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            run = await financialService.getBillingRun(run.id);
+        }
+        if (run.status === "failed") throw new Error(run.error || "Failed to generate bills");
         await loadData();
-        showToast("Monthly bills generated successfully", "success");
+        showToast(`${run.bills_created} bills generated`, "success");
     } catch (err: any) {
         showToast(err.message || "Failed to generate bills", "error");
     } finally {
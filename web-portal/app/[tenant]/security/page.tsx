@@ -191,9 +191,9 @@ export default function SecurityGuardPage() {
     setActionLoading(true);
     try {
       if (visitor) {
-        await visitorService.checkInVisitor(visitor.id, itemsCarriedIn);
+        const admitted = await visitorService.verifyAndAdmit(visitor.access_code, itemsCarriedIn);
         toast.success(`Visitor ${visitor.full_name} checked in`);
-        setVisitor({ ...visitor, status: 'checked_in', check_in_time: new Date().toISOString() });
+        setVisitor(admitted);
       } else if (staff) {
         await staffService.checkInStaff(staff.id);
         toast.success(`Staff ${staff.full_name} checked in`);
@@ -54,9 +54,7 @@ export default function FinancialSection() {
 
   const openPaymentForBill = (bill: Bill) => {
     setSelectedBill(bill);
-    // Calculate remaining amount
-    const paidAmount = bill.payments?.reduce((acc, p) => acc + (p.status === 'verified' ? p.amount : 0), 0) || 0;
-    const remaining = Math.max(0, bill.amount - paidAmount);
+    const remaining = Math.max(0, bill.outstanding);
     
     setPaymentForm({
       amount: remaining.toString(),
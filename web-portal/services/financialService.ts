@@ -7,6 +7,7 @@ export interface FeeDefinition {
   description?: string;
   amount: number;
   is_active: boolean;
+  late_fee_after_days?: number | null;
   created_at: string;
 }
 
@@ -27,6 +28,18 @@ export interface Payment {
   bill?: Bill;
 }
 
+export interface BillingRun {
+  id: number;
+  period: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  bills_created: number;
+  notifications_total: number;
+  notifications_sent: number;
+  error?: string;
+  created_at: string;
+  finished_at?: string;
+}
+
 export interface Bill {
   id: number;
   resident_id: number;
@@ -34,6 +47,8 @@ export interface Bill {
   description: string;
   due_date: string;
   status: 'unpaid' | 'partial' | 'paid' | 'overdue';
+  paid_total: number;
+  outstanding: number;
   created_at: string;
   payments?: Payment[];
   resident?: {
@@ -117,7 +132,7 @@ export const financialService = {
     return response.json();
   },
 
-  async generateMonthlyBills(): Promise<Bill[]> {
+  async generateMonthlyBills(): Promise<BillingRun> {
     const token = authService.getToken();
     if (!token) throw new Error('No authentication token');
 
@@ -131,6 +146,17 @@ export const financialService = {
     }
     return response.json();
   },
+
+  async getBillingRun(id: number): Promise<BillingRun> {
+    const token = authService.getToken();
+    if (!token) throw new Error('No authentication token');
+
+    const response = await fetch(`${API_CONFIG.BASE_URL}/financial/bills/billing-runs/${id}`, {
+        headers: { 'Authorization': `Bearer ${token}` },
+    });
+    if (!response.ok) throw new Error('Failed to fetch billing run');
+    return response.json();
+  },
   // Payments
   async getPayments(params?: { startDate?: string; endDate?: string }): Promise<Payment[]> {
       const token = authService.getToken();
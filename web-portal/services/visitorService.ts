@@ -140,6 +140,19 @@ export const visitorService = {
     return response.json();
   },
 
+  async verifyAndAdmit(accessCode: string, itemsCarriedIn?: string): Promise<Visitor> {
+    const response = await fetch(`${API_CONFIG.BASE_URL}/gate/verify-and-admit`, {
+      method: 'POST',
+      headers: getHeaders(),
+      body: JSON.stringify({ access_code: accessCode, items_carried_in: itemsCarriedIn }),
+    });
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'Failed to check in visitor');
+    }
+    return response.json();
+  },
+
   async checkOutVisitor(visitorId: number, itemsCarriedOut?: string): Promise<Visitor> {
     const response = await fetch(`${API_CONFIG.BASE_URL}/visitors/${visitorId}/check-out`, {
       method: 'POST',